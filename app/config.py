@@ -1,3 +1,4 @@
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import model_validator
 
@@ -15,10 +16,59 @@ class Settings(BaseSettings):
     ADMIN_EMAIL: str
     TELEGRAM_BOT_TOKEN: str
     GEMINI_API_KEY: str
+    GEMINI_BASE_URL: Optional[str] = None  # Другой адрес API Gemini (прокси или локальный фейковый сервер для тестов)
     CHANNEL_ID: int
     GITHUB_TOKEN: str
     GITHUB_USER: str
     ADMIN_TELEGRAM_ID: int
+    API_PAGE_SIZE: int = 100  # Размер страницы списковых эндпоинтов по умолчанию
+    API_MAX_PAGE_SIZE: int = 1000  # Максимальный limit, который можно запросить
+    DAO_CACHE_ENABLED: bool = True  # Read-through кэш чтений портфолио в DAO
+    DAO_CACHE_BACKEND: str = "memory"  # memory (LRU в процессе) или redis (общий для API и бота)
+    DAO_CACHE_TTL: int = 300  # Время жизни записи кэша DAO, сек (граница устаревания между процессами)
+    DAO_CACHE_MAX_SIZE: int = 2048  # Максимум ключей в памяти процесса
+    DAO_CACHE_REDIS_URL: str = "redis://localhost:6379/0"  # Адрес Redis для DAO_CACHE_BACKEND=redis
+    EXPORT_BATCH_SIZE: int = 1000  # Сколько строк экспорт забирает из серверного курсора за раз
+    EXPORT_CHUNK_BYTES: int = 65536  # Размер куска ответа, которым экспорт отдаёт данные клиенту
+    RAG_INDEX_PATH: str = "data/rag_index"  # Каталог, где хранится FAISS-индекс RAG
+    RAG_VECTOR_STORE: str = "faiss"  # Векторное хранилище RAG: faiss или numpy (компактная матрица для малых корпусов)
+    RAG_VECTOR_QUANTIZE: bool = False  # Хранить векторы numpy-хранилища в int8 (в 4 раза меньше памяти)
+    RAG_USE_MMR: bool = False  # Отбирать кандидатов векторного поиска через MMR (разнообразие вместо дублей)
+    RAG_INDEX_REFRESH_INTERVAL: int = 300  # Период полной досинхронизации индекса в API и в боте, сек; правки из API бот видит только через неё
+    RAG_EMBEDDING_CACHE_PATH: str = "data/embedding_cache"  # Кэш эмбеддингов документов на диске
+    RAG_EMBEDDING_PROVIDER: str = "google"  # Провайдер эмбеддингов: google или local (без сети)
+    RAG_LOCAL_EMBEDDING_DIM: int = 512  # Размерность локальных хэшированных эмбеддингов
+    RAG_ANSWER_CACHE_THRESHOLD: float = 0.92  # Минимальная косинусная близость вопроса для ответа из кэша
+    RAG_ANSWER_CACHE_TTL: int = 3600  # Время жизни закэшированного ответа, сек
+    RAG_ANSWER_CACHE_SIZE: int = 256  # Максимум ответов в кэше (LRU)
+    RAG_QUERY_EMBEDDING_CACHE_SIZE: int = 1024  # Сколько эмбеддингов вопросов держать в памяти (LRU)
+    RAG_FAQ_QUESTIONS: List[str] = [  # Частые вопросы, ответы на которые прогреваются при старте бота
+        "Расскажи о себе",
+        "Какие у тебя проекты?",
+        "Какой у тебя опыт работы?",
+        "Какие технологии ты знаешь?",
+        "Где ты учился?",
+        "Как с тобой связаться?",
+    ]
+    RAG_FAQ_WARM_UP_DELAY: float = 60.0  # Задержка прогрева FAQ после изменения базы знаний: серия правок даёт один прогрев, сек
+    RAG_STREAM_EDIT_INTERVAL: float = 1.0  # Минимальный интервал между правками потокового ответа в Telegram, сек
+    LLM_MAX_CONCURRENCY: int = 4  # Одновременных вызовов Gemini
+    LLM_MAX_QUEUE: int = 16  # Сколько запросов может ждать свободный слот, остальным сразу "занято"
+    LLM_QUEUE_TIMEOUT: float = 10.0  # Максимальное ожидание слота, сек
+    LLM_DEADLINE: float = 20.0  # Дедлайн генерации ответа; после него отдаём ответ только по найденным документам, сек
+    LLM_HEDGE_ENABLED: bool = True  # Дублировать медленный запрос к Gemini вторым, побеждает первый ответ
+    LLM_HEDGE_DELAY: float = 4.0  # Задержка перед дублем, пока не набралось LLM_HEDGE_MIN_SAMPLES замеров, сек
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # Сколько замеров латентности нужно, чтобы брать задержку дубля по p95
+    RAG_LOG_BATCH_SIZE: int = 50  # Размер пакета записи вопросов/ответов RAG в БД
+    RAG_LOG_FLUSH_INTERVAL: float = 5.0  # Максимальная задержка записи пакета, сек
+    RAG_LOG_MAX_PENDING: int = 5000  # Предел буфера записи при недоступной БД; старые записи вытесняются
+    RAG_CHUNK_TOKENS: int = 300  # Документы длиннее режутся на чанки такого размера (в токенах)
+    RAG_CHUNK_OVERLAP_TOKENS: int = 50  # Перекрытие соседних чанков
+    RAG_RETRIEVAL_K: int = 8  # Сколько кандидатов достаёт ретривер
+    RAG_CONTEXT_TOKEN_BUDGET: int = 1500  # Бюджет токенов на контекст в промпте
+    RAG_REINDEX_DEBOUNCE: float = 2.0  # Пауза в потоке изменений БД, после которой запускается переиндексация, сек
+    RAG_REINDEX_MAX_DELAY: float = 30.0  # Максимальная задержка переиндексации при непрерывных изменениях, сек
+    RAG_STORE_TIMINGS: bool = False  # Сохранять тайминги стадий RAG в mlpredictions.timings
 
     @model_validator(mode='after')
     def get_database_url(self):
@@ -1,46 +1,218 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import select, insert
+from sqlalchemy.sql import delete, insert, select, update
 from fastapi import HTTPException
-from typing import Any, List, TypeVar, Generic
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, TypeVar, Generic
 import datetime
+from .cache import dao_cache
+from .uow import commit, current_unit_of_work, notify
+from .pagination import decode_cursor, encode_cursor
 
 T = TypeVar("T")
 
+# asyncpg ограничивает запрос 32767 параметрами; многострочные вставки режем на пачки с запасом
+MAX_INSERT_PARAMS = 30000
+
 class BaseDAO(Generic[T]):
     model = None
+    cached = False  # Читать get_all/get_by_id/get_by_user_id и первую страницу get_page через dao_cache (см. app.dao.cache)
 
     @classmethod
-    async def create(cls, db: AsyncSession, data: dict, set_timestamps: bool = False) -> T:
+    async def _cached(cls, db: AsyncSession, key: str, loader):
+        # Внутри transaction(db) чтение видит незакоммиченные записи, а их события ещё не ушли:
+        # при откате такие строки остались бы в кэше до TTL
+        if not cls.cached or current_unit_of_work(db) is not None:
+            return await loader()
+        return await dao_cache.get_or_load(cls.model.__tablename__, key, loader)
+
+    @classmethod
+    def notify_change(cls, action: str, rows: Iterable, db: Optional[AsyncSession] = None) -> None:
+        """Публикует событие изменения строк модели (см. app.dao.events).
+
+        Вызывать после commit. Если передана сессия и она в transaction(), событие
+        уйдёт после общего commit.
+        """
+        notify(db, cls.model.__tablename__, action, rows)
+
+    @classmethod
+    def prepare_data(cls, data: dict, set_timestamps: bool = False) -> dict:
+        """Заполняет серверные поля перед вставкой. Наследники дополняют своими (дата отправки и т.п.)."""
         if set_timestamps:
             data.update({
                 "created_at": datetime.datetime.utcnow(),
                 "updated_at": datetime.datetime.utcnow()
             })
-        query = insert(cls.model.__table__).values(**data)
-        result = await db.execute(query)
-        await db.commit()
-        item_id = result.inserted_primary_key[0]
-        query = select(cls.model.__table__).where(cls.model.id == item_id)
-        result = await db.execute(query)
-        return result.first()
+        return data
 
     @classmethod
-    async def get_by_id(cls, db: AsyncSession, item_id: int) -> T:
-        query = select(cls.model.__table__).where(cls.model.id == item_id)
+    async def create(cls, db: AsyncSession, data: dict, set_timestamps: bool = False) -> T:
+        # INSERT ... RETURNING: созданная строка приходит в том же запросе, без повторного SELECT
+        query = insert(cls.model.__table__).values(**cls.prepare_data(data, set_timestamps)).returning(cls.model.__table__)
         result = await db.execute(query)
         item = result.first()
+        await commit(db)
+        if item is None:
+            raise HTTPException(status_code=404, detail=f"{cls.model.__name__} not found after creation")
+        cls.notify_change("create", [item], db=db)
+        return item
+
+    @classmethod
+    async def create_many(cls, db: AsyncSession, items: List[dict], set_timestamps: bool = False) -> List[T]:
+        """Массовая вставка многострочными INSERT ... RETURNING в одной транзакции.
+
+        У всех словарей должен быть одинаковый набор ключей. Возвращает созданные строки
+        в порядке items.
+        """
+        if not items:
+            return []
+        rows = [cls.prepare_data(dict(data), set_timestamps) for data in items]
+        batch_size = max(1, MAX_INSERT_PARAMS // max(1, len(rows[0])))
+        created = []
+        for start in range(0, len(rows), batch_size):
+            query = insert(cls.model.__table__).values(rows[start:start + batch_size]).returning(cls.model.__table__)
+            result = await db.execute(query)
+            created.extend(result.fetchall())
+        await commit(db)
+        cls.notify_change("create", created, db=db)
+        return created
+
+    @classmethod
+    async def update(cls, db: AsyncSession, item_id: int, values: dict) -> T:
+        """UPDATE ... RETURNING по id одним запросом; нет строки — 404."""
+        values = dict(values)
+        if not values:
+            # Наследники (BlogPostDAO) возвращают из get_by_id None вместо 404
+            item = await cls.get_by_id(db, item_id)
+            if item is None:
+                raise HTTPException(status_code=404, detail=f"{cls.model.__name__} not found")
+            return item
+        if "updated_at" in cls.model.__table__.c:
+            values.setdefault("updated_at", datetime.datetime.utcnow())
+        query = update(cls.model.__table__).where(cls.model.id == item_id).values(**values).returning(cls.model.__table__)
+        item = (await db.execute(query)).first()
+        if item is None:
+            raise HTTPException(status_code=404, detail=f"{cls.model.__name__} not found")
+        await commit(db)
+        cls.notify_change("update", [item], db=db)
+        return item
+
+    @classmethod
+    async def delete(cls, db: AsyncSession, item_id: int) -> T:
+        """DELETE ... RETURNING по id одним запросом; нет строки — 404. Возвращает удалённую строку."""
+        return (await cls.delete_where(db, id=item_id))[0]
+
+    @classmethod
+    async def delete_where(cls, db: AsyncSession, **filters) -> List[T]:
+        """DELETE ... RETURNING по равенству колонок (составные ключи связей и т.п.)."""
+        if not filters:
+            raise ValueError("delete_where requires at least one filter")
+        query = (
+            delete(cls.model.__table__)
+            .where(*(getattr(cls.model, name) == value for name, value in filters.items()))
+            .returning(cls.model.__table__)
+        )
+        items = (await db.execute(query)).fetchall()
+        if not items:
+            raise HTTPException(status_code=404, detail=f"{cls.model.__name__} not found")
+        await commit(db)
+        cls.notify_change("delete", items, db=db)
+        return items
+
+    @classmethod
+    def _projection(cls, fields: List[str]):
+        """Колонки для fields= в порядке таблицы; id нужен курсору и отдаётся всегда."""
+        table = cls.model.__table__
+        unknown = [name for name in fields if name not in table.c]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        requested = set(fields) | {"id"}
+        return select(*(column for column in table.c if column.key in requested))
+
+    @classmethod
+    def _select(cls, fields: Optional[List[str]] = None):
+        """Базовый запрос чтения; fields сужает его до нужных колонок, наследники могут сузить по умолчанию."""
+        if fields:
+            return cls._projection(fields)
+        return select(cls.model.__table__)
+
+    @classmethod
+    def _filtered(cls, fields: Optional[List[str]] = None, **filters):
+        return cls._select(fields).where(*(getattr(cls.model, name) == value for name, value in filters.items()))
+
+    @classmethod
+    async def get_page(
+        cls,
+        db: AsyncSession,
+        limit: int,
+        after: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        **filters
+    ) -> Tuple[List[T], Optional[str]]:
+        """Keyset-пагинация по id: строки с id больше курсора after, не больше limit штук.
+
+        Возвращает (строки, курсор следующей страницы или None, если страница последняя).
+        В отличие от OFFSET, стоимость не растёт с номером страницы. fields — список
+        колонок для выборки (см. _projection). Первая страница (без after) читается
+        через dao_cache: её запрашивают чаще всего.
+        """
+        query = cls._filtered(fields, **filters)
+        if after is not None:
+            last_id = decode_cursor(after)
+            if not isinstance(last_id, int):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.where(cls.model.id > last_id)
+
+        async def load():
+            # Берём на одну строку больше, чтобы без COUNT узнать, есть ли следующая страница
+            result = await db.execute(query.order_by(cls.model.id).limit(limit + 1))
+            items = result.fetchall()
+            if len(items) <= limit:
+                return items, None
+            items = items[:limit]
+            return items, encode_cursor(items[-1].id)
+
+        if after is not None:
+            return await load()
+        key = ":".join([
+            "page", str(limit), ",".join(fields) if fields else "*",
+            ",".join(f"{name}={value}" for name, value in sorted(filters.items()))
+        ])
+        items, next_cursor = await cls._cached(db, key, load)
+        return list(items), next_cursor
+
+    @classmethod
+    async def stream(cls, db: AsyncSession, *conditions, batch_size: int = 500, **filters) -> AsyncIterator[T]:
+        """Итерирует строки через серверный курсор, держа в памяти не больше batch_size строк.
+
+        Кроме фильтров на равенство принимает произвольные SQL-условия (диапазоны дат и т.п.).
+        """
+        query = cls._filtered(**filters).where(*conditions).order_by(cls.model.id).execution_options(yield_per=batch_size)
+        result = await db.stream(query)
+        async for item in result:
+            yield item
+
+    @classmethod
+    async def get_by_id(cls, db: AsyncSession, item_id: int) -> T:
+        async def load():
+            result = await db.execute(select(cls.model.__table__).where(cls.model.id == item_id))
+            return result.first()
+
+        item = await cls._cached(db, f"id:{item_id}", load)
         if item is None:
             raise HTTPException(status_code=404, detail=f"{cls.model.__name__} not found")
         return item
 
     @classmethod
     async def get_by_user_id(cls, db: AsyncSession, user_id: int) -> List[T]:
-        query = select(cls.model.__table__).where(cls.model.user_id == user_id)
-        result = await db.execute(query)
-        return result.fetchall()
+        async def load():
+            result = await db.execute(select(cls.model.__table__).where(cls.model.user_id == user_id))
+            return result.fetchall()
+
+        return list(await cls._cached(db, f"user:{user_id}", load))
 
     @classmethod
     async def get_all(cls, db: AsyncSession) -> List[T]:
-        query = select(cls.model.__table__)
-        result = await db.execute(query)
-        return result.fetchall()
\ No newline at end of file
+        async def load():
+            result = await db.execute(select(cls.model.__table__))
+            return result.fetchall()
+
+        return list(await cls._cached(db, "all", load))
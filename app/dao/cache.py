@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import pickle
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+
+from ..config import settings
+from .events import add_change_listener
+
+logger = logging.getLogger(__name__)
+
+_MISS = object()
+
+
+class MemoryCacheBackend:
+    """LRU с TTL в памяти процесса."""
+
+    def __init__(self, ttl: int, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    async def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISS
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return _MISS
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, keys: List[str], prefixes: List[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+        if prefixes:
+            for key in [key for key in self._entries if key.startswith(tuple(prefixes))]:
+                del self._entries[key]
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "max_size": self.max_size, "evictions": self.evictions}
+
+
+class RedisCacheBackend:
+    """Общий для API и бота кэш в Redis. Значения — pickle строк SQLAlchemy.
+
+    Требует пакет redis (redis.asyncio). Ошибки Redis не ломают чтение:
+    запрос просто уходит в Postgres.
+    """
+
+    def __init__(self, url: str, ttl: int, namespace: str = "dao:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("DAO_CACHE_BACKEND=redis requires the 'redis' package")
+        self.ttl = ttl
+        self.namespace = namespace
+        self.errors = 0
+        self._client = redis.from_url(url)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def get(self, key: str) -> Any:
+        try:
+            data = await self._client.get(self.namespace + key)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"DAO cache get failed for {key}: {str(e)}")
+            return _MISS
+        return _MISS if data is None else pickle.loads(data)
+
+    async def set(self, key: str, value: Any) -> None:
+        try:
+            await self._client.set(self.namespace + key, pickle.dumps(value), ex=self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"DAO cache set failed for {key}: {str(e)}")
+
+    def invalidate(self, keys: List[str], prefixes: List[str]) -> None:
+        # Подписчики событий синхронные, поэтому удаление из Redis уходит в фоновую задачу
+        task = asyncio.get_running_loop().create_task(self._invalidate(keys, prefixes))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _invalidate(self, keys: List[str], prefixes: List[str]) -> None:
+        try:
+            names = [self.namespace + key for key in keys]
+            for prefix in prefixes:
+                names.extend([name async for name in self._client.scan_iter(match=self.namespace + prefix + "*")])
+            if names:
+                await self._client.unlink(*names)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"DAO cache invalidation failed for {keys + prefixes}: {str(e)}")
+
+    async def close(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        return {"errors": self.errors}
+
+
+class DAOCache:
+    """Read-through кэш чтений DAO (get_all/get_by_id/get_by_user_id, первая страница get_page).
+
+    Ключи имеют вид "<таблица>:id:<id>", "<таблица>:all", "<таблица>:user:<user_id>"
+    и "<таблица>:page:<limit>:<fields>:<фильтры>".
+    Инвалидация идёт по событиям app.dao.events: запись удаляет ключи затронутых id
+    и все списки своей таблицы. Счётчик версий таблицы не даёт положить в кэш результат
+    чтения, которое началось до записи и закончилось после инвалидации. Промахи (None)
+    не кэшируются: запись с новым id не инвалидирует ключ, по которому его раньше не нашли.
+    """
+
+    def __init__(self, backend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+        self._versions: Dict[str, int] = defaultdict(int)
+
+    async def get_or_load(self, table: str, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await loader()
+        full_key = f"{table}:{key}"
+        value = await self.backend.get(full_key)
+        if value is not _MISS:
+            self.hits[table] += 1
+            return value
+        self.misses[table] += 1
+        version = self._versions[table]
+        value = await loader()
+        if value is not None and self._versions[table] == version:
+            await self.backend.set(full_key, value)
+        return value
+
+    def on_change(self, table: str, action: str, rows: List[dict]) -> None:
+        if not self.enabled:
+            return
+        self._versions[table] += 1
+        keys = [f"{table}:id:{row['id']}" for row in rows if row.get("id") is not None]
+        self.backend.invalidate(keys, [f"{table}:all", f"{table}:user:", f"{table}:page:"])
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        tables = {}
+        for table in sorted(set(self.hits) | set(self.misses)):
+            hits, misses = self.hits[table], self.misses[table]
+            tables[table] = {"hits": hits, "misses": misses, "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0}
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            "enabled": self.enabled,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "tables": tables,
+            **self.backend.stats()
+        }
+
+
+def _create_backend():
+    if settings.DAO_CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.DAO_CACHE_REDIS_URL, ttl=settings.DAO_CACHE_TTL)
+    return MemoryCacheBackend(ttl=settings.DAO_CACHE_TTL, max_size=settings.DAO_CACHE_MAX_SIZE)
+
+
+dao_cache = DAOCache(_create_backend(), enabled=settings.DAO_CACHE_ENABLED)
+add_change_listener(dao_cache.on_change)
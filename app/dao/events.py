@@ -0,0 +1,46 @@
+import logging
+from typing import Callable, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# Подписчик получает имя таблицы, действие (create/update/delete/upsert) и затронутые строки как dict
+ChangeListener = Callable[[str, str, List[dict]], None]
+
+_listeners: List[ChangeListener] = []
+
+
+def add_change_listener(listener: ChangeListener) -> None:
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_change_listener(listener: ChangeListener) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def _as_dict(row) -> dict:
+    if hasattr(row, "_mapping"):
+        return dict(row._mapping)
+    if isinstance(row, dict):
+        return dict(row)
+    # ORM-объект
+    return {column.key: getattr(row, column.key) for column in row.__table__.columns}
+
+
+def emit_change(table: str, action: str, rows: Iterable) -> None:
+    """Сообщает подписчикам о записанных строках. Вызывается после commit.
+
+    Подписчики должны быть быстрыми (положить событие в очередь): они вызываются
+    синхронно в запросе, который сделал запись. Ошибка подписчика только логируется.
+    """
+    if not _listeners:
+        return
+    rows = [_as_dict(row) for row in rows if row is not None]
+    if not rows:
+        return
+    for listener in list(_listeners):
+        try:
+            listener(table, action, rows)
+        except Exception as e:
+            logger.error(f"Change listener failed for {action} on {table}: {str(e)}")
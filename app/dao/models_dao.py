@@ -1,15 +1,15 @@
-from typing import List
+from typing import Dict, List, Optional
 
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm.sync import update
-from sqlalchemy.sql import insert, select
-from fastapi import HTTPException
-from .base_dao import BaseDAO, T
+from sqlalchemy.sql import delete, literal_column, or_, select
+from .base_dao import MAX_INSERT_PARAMS, BaseDAO, T
+from .uow import commit
 from .. import models
 import datetime
 from aiogram import Bot
 
-from ..models import Project, BlogPost, ProjectTag, Tag
+from ..models import Project, ProjectTag, Tag
 
 
 class UserDAO(BaseDAO):
@@ -21,92 +21,77 @@ class UserDAO(BaseDAO):
         result = await db.execute(query)
         return result.scalar_one_or_none()
 
-    @classmethod
-    async def create(cls, db: AsyncSession, data: dict) -> T:
-        query = insert(cls.model.__table__).values(**data)
-        result = await db.execute(query)
-        await db.commit()
-        query = select(cls.model.__table__).where(cls.model.id == result.inserted_primary_key[0])
-        result = await db.execute(query)
-        item = result.fetchone()
-        if item is None:
-            raise HTTPException(status_code=404, detail="User not found after creation")
-        return item
-
 class ProfileDAO(BaseDAO):
     model = models.profile.Profile
+    cached = True
 
 class SkillDAO(BaseDAO):
     model = models.skills.Skill
-
-
-class ProjectDAO:
-    @staticmethod
-    async def create(db: AsyncSession, project_data: dict):
-        stmt = insert(Project).values(**project_data)
-        await db.execute(stmt)
-        await db.commit()
-
-    @staticmethod
-    async def get_all(db: AsyncSession):
-        result = await db.execute(select(Project))
-        return result.scalars().all()
-
-    @staticmethod
-    async def create_or_update(db: AsyncSession, project_data: dict):
-        result = await db.execute(
-            select(Project).filter_by(project_url=project_data["project_url"])
-        )
-        project = result.scalars().first()
-        if project:
-            await db.execute(
-                update(Project)
-                .where(Project.project_url == project_data["project_url"])
-                .values(**project_data)
-            )
-            await db.commit()
-            return project
-        else:
-            stmt = insert(Project).values(**project_data)
-            await db.execute(stmt)
-            await db.commit()
-            return (await db.execute(
-                select(Project).filter_by(project_url=project_data["project_url"])
-            )).scalars().first()
+    cached = True
+
+
+class ProjectDAO(BaseDAO):
+    model = Project
+    cached = True
+
+    @classmethod
+    async def upsert_many(cls, db: AsyncSession, items: List[dict]) -> Dict[str, int]:
+        """Синхронизация по project_url одним INSERT ... ON CONFLICT DO UPDATE на пачку.
+
+        Строки, у которых ни одна колонка не изменилась, UPDATE не трогает (WHERE
+        IS DISTINCT FROM), поэтому не создают новых версий строк и событий переиндексации.
+        Возвращает число вставленных, обновлённых и неизменных проектов.
+        """
+        # Дубли project_url в одной пачке ON CONFLICT не переживёт: оставляем последний
+        rows = list({data["project_url"]: data for data in items}.values())
+        if not rows:
+            return {"inserted": 0, "updated": 0, "unchanged": 0}
+        table = cls.model.__table__
+        columns = [name for name in rows[0] if name != "project_url"]
+        batch_size = max(1, MAX_INSERT_PARAMS // len(rows[0]))
+        inserted, updated = [], []
+        for start in range(0, len(rows), batch_size):
+            query = pg_insert(table).values(rows[start:start + batch_size])
+            query = query.on_conflict_do_update(
+                index_elements=[table.c.project_url],
+                set_={name: query.excluded[name] for name in columns},
+                where=or_(*(table.c[name].is_distinct_from(query.excluded[name]) for name in columns))
+            ).returning(table.c.id, literal_column("xmax = 0").label("inserted"))
+            # xmax = 0 только у только что вставленной версии строки
+            for row in (await db.execute(query)).fetchall():
+                (inserted if row.inserted else updated).append({"id": row.id})
+        await commit(db)
+        cls.notify_change("create", inserted, db=db)
+        cls.notify_change("update", updated, db=db)
+        return {"inserted": len(inserted), "updated": len(updated), "unchanged": len(rows) - len(inserted) - len(updated)}
 
 
 class BlogPostDAO(BaseDAO):
     model = models.BlogPost
 
     @classmethod
-    async def create(cls, db: AsyncSession, data: dict) -> T:
-        query = insert(cls.model.__table__).values(**data)
-        result = await db.execute(query)
-        await db.commit()
-        query = select(cls.model.__table__).where(cls.model.id == result.inserted_primary_key[0])
-        result = await db.execute(query)
-        item = result.fetchone()
-        if item is None:
-            raise HTTPException(status_code=404, detail="BlogPost not found after creation")
-        return item
+    def _select(cls, fields: Optional[List[str]] = None):
+        if fields:
+            return cls._projection(fields)
+        return select(cls.model.id, cls.model.user_id, cls.model.title, cls.model.content, cls.model.summary)
 
     @classmethod
     async def get_by_id(cls, db: AsyncSession, item_id: int) -> T | None:
-        query = select(cls.model.id, cls.model.user_id, cls.model.title, cls.model.content, cls.model.summary).where(cls.model.id == item_id)
+        query = cls._select().where(cls.model.id == item_id)
         result = await db.execute(query)
         return result.first()
 
     @classmethod
     async def get_all(cls, db: AsyncSession) -> List[T]:
-        query = select(cls.model.id, cls.model.user_id, cls.model.title, cls.model.content, cls.model.summary)
+        query = cls._select()
         result = await db.execute(query)
         return result.fetchall()
 
     @classmethod
-    async def create(cls, db: AsyncSession, data: dict) -> T:
+    def prepare_data(cls, data: dict, set_timestamps: bool = False) -> dict:
         if not data.get("date_published"):
             data["date_published"] = datetime.datetime.utcnow()
-        return await super(BlogPostDAO, cls).create(db, data)
+        return super().prepare_data(data, set_timestamps)
 
 class TagDAO(BaseDAO):
     model = models.tags.Tag
@@ -114,58 +99,44 @@ class TagDAO(BaseDAO):
 class PostTagDAO(BaseDAO):
     model = models.post_tags.PostTag
 
-    @classmethod
-    async def create(cls, db: AsyncSession, data: dict) -> T:
-        query = insert(cls.model.__table__).values(**data)
-        result = await db.execute(query)
-        await db.commit()
-        query = select(cls.model.__table__).where(
-            (cls.model.post_id == data["post_id"]) &
-            (cls.model.tag_id == data["tag_id"])
-        )
-        result = await db.execute(query)
-        item = result.first()
-        if item is None:
-            raise HTTPException(status_code=404, detail="PostTag not found after creation")
-        return item
-
 class ProjectTagDAO(BaseDAO):
     model = models.project_tags.ProjectTag
 
-    @classmethod
-    async def create(cls, db: AsyncSession, data: dict) -> T:
-        query = insert(cls.model.__table__).values(**data)
-        result = await db.execute(query)
-        await db.commit()
-        query = select(cls.model.__table__).where(
-            (cls.model.project_id == data["project_id"]) &
-            (cls.model.tag_id == data["tag_id"])
-        )
-        result = await db.execute(query)
-        item = result.first()
-        if item is None:
-            raise HTTPException(status_code=404, detail="ProjectTag not found after creation")
-        return item
-
     @classmethod
     async def get_all_with_tags(cls, db: AsyncSession) -> List[T]:
         query = select(ProjectTag.project_id, ProjectTag.tag_id, Tag.tag_name).join(Tag, ProjectTag.tag_id == Tag.id)
         result = await db.execute(query)
         return result.fetchall()
 
+    @classmethod
+    async def set_for_project(cls, db: AsyncSession, project_id: int, tag_ids: List[int]) -> Dict[str, int]:
+        """Приводит теги проекта к tag_ids: лишние связи удаляет, недостающие добавляет одной вставкой."""
+        table = cls.model.__table__
+        wanted = list(dict.fromkeys(tag_ids))
+        removed = (await db.execute(
+            delete(table).where(table.c.project_id == project_id, table.c.tag_id.not_in(wanted)).returning(table)
+        )).fetchall()
+        existing = set((await db.execute(select(table.c.tag_id).where(table.c.project_id == project_id))).scalars().all())
+        created = await cls.create_many(db, [{"project_id": project_id, "tag_id": tag_id} for tag_id in wanted if tag_id not in existing])
+        await commit(db)
+        cls.notify_change("delete", removed, db=db)
+        return {"added": len(created), "removed": len(removed)}
+
 class MessageDAO(BaseDAO):
     model = models.messages.Message
 
     @classmethod
-    async def create(cls, db: AsyncSession, data: dict) -> T:
+    def prepare_data(cls, data: dict, set_timestamps: bool = False) -> dict:
         data["date_sent"] = datetime.datetime.utcnow()
-        return await super(MessageDAO, cls).create(db, data)
+        return super().prepare_data(data, set_timestamps)
 
 class SocialMediaDAO(BaseDAO):
     model = models.social_media.SocialMedia
+    cached = True
 
 class TestimonialDAO(BaseDAO):
     model = models.testimonials.Testimonial
+    cached = True
 
 class TelegramSubscriberDAO(BaseDAO):
     model = models.telegram_subscribers.TelegramSubscriber
@@ -177,19 +148,9 @@ class TelegramSubscriberDAO(BaseDAO):
         return result.scalar_one_or_none()
 
     @classmethod
-    async def create(cls, db: AsyncSession, data: dict) -> T:
-        query = insert(cls.model.__table__).values(**data).returning(cls.model.__table__)
-        result = await db.execute(query)
-        await db.commit()
-        item = result.fetchone()
-        if item is None:
-            raise HTTPException(status_code=404, detail="Subscriber not found after creation")
-        return item
-
-    @classmethod
-    async def create(cls, db: AsyncSession, data: dict) -> T:
+    def prepare_data(cls, data: dict, set_timestamps: bool = False) -> dict:
         data["subscribed_at"] = datetime.datetime.utcnow()
-        return await super(TelegramSubscriberDAO, cls).create(db, data)
+        return super().prepare_data(data, set_timestamps)
 
 class SubscriberPreferenceDAO(BaseDAO):
     model = models.subscriber_preferences.SubscriberPreference
@@ -198,35 +159,37 @@ class PollDAO(BaseDAO):
     model = models.polls.Poll
 
     @classmethod
-    async def create(cls, db: AsyncSession, data: dict) -> T:
+    def prepare_data(cls, data: dict, set_timestamps: bool = False) -> dict:
         data["created_at"] = datetime.datetime.utcnow()
-        return await super(PollDAO, cls).create(db, data)
+        return super().prepare_data(data, set_timestamps)
 
 class EducationDAO(BaseDAO):
     model = models.education.Education
+    cached = True
 
 class WorkExperienceDAO(BaseDAO):
     model = models.work_experience.WorkExperience
+    cached = True
 
 class AnalyticsDAO(BaseDAO):
     model = models.analytics.Analytic
 
     @classmethod
-    async def create(cls, db: AsyncSession, data: dict) -> T:
+    def prepare_data(cls, data: dict, set_timestamps: bool = False) -> dict:
         data["visit_time"] = datetime.datetime.utcnow()
-        return await super(AnalyticsDAO, cls).create(db, data)
+        return super().prepare_data(data, set_timestamps)
 
 class TaskDAO(BaseDAO):
     model = models.tasks.Task
 
     @classmethod
-    async def create(cls, db: AsyncSession, data: dict) -> T:
-        return await super(TaskDAO, cls).create(db, data, set_timestamps=True)
+    def prepare_data(cls, data: dict, set_timestamps: bool = False) -> dict:
+        return super().prepare_data(data, set_timestamps=True)
 
 class MLPredictionDAO(BaseDAO):
     model = models.ml_predictions.MLPrediction
 
     @classmethod
-    async def create(cls, db: AsyncSession, data: dict) -> T:
+    def prepare_data(cls, data: dict, set_timestamps: bool = False) -> dict:
         data["created_at"] = datetime.datetime.utcnow()
-        return await super(MLPredictionDAO, cls).create(db, data)
\ No newline at end of file
+        return super().prepare_data(data, set_timestamps)
\ No newline at end of file
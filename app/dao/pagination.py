@@ -0,0 +1,26 @@
+import base64
+import json
+from typing import Any, Optional
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(value: Any) -> str:
+    """Непрозрачный курсор keyset-пагинации: ключ последней отданной строки."""
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Any:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def set_next_cursor(response: Response, cursor: Optional[str]) -> None:
+    """Отдаёт курсор следующей страницы в заголовке; на последней странице заголовка нет."""
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,79 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .events import emit_change
+
+_current: ContextVar[Optional["UnitOfWork"]] = ContextVar("dao_unit_of_work", default=None)
+
+
+class UnitOfWork:
+    """Транзакция, к которой присоединяются вызовы DAO на той же сессии.
+
+    Внутри transaction(db) методы DAO не коммитят сами, а события изменений
+    копятся и публикуются только после общего commit (при откате — пропадают).
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.events: List[Tuple[str, str, list]] = []
+
+    def publish(self) -> None:
+        events, self.events = self.events, []
+        for table, action, rows in events:
+            emit_change(table, action, rows)
+
+
+def current_unit_of_work(db: AsyncSession) -> Optional[UnitOfWork]:
+    uow = _current.get()
+    return uow if uow is not None and uow.db is db else None
+
+
+@asynccontextmanager
+async def transaction(db: AsyncSession) -> AsyncIterator[UnitOfWork]:
+    """Один commit на запрос или фоновую задачу.
+
+    Внешний блок коммитит при успешном выходе и откатывает при исключении.
+    Вложенный блок на той же сессии — это SAVEPOINT: его ошибку можно поймать
+    снаружи, откатится только он, а остальная работа попадёт в общий commit.
+    """
+    outer = current_unit_of_work(db)
+    if outer is not None:
+        mark = len(outer.events)
+        try:
+            async with db.begin_nested():
+                yield outer
+        except BaseException:
+            # События откатанного savepoint не должны уйти подписчикам
+            del outer.events[mark:]
+            raise
+        return
+
+    uow = UnitOfWork(db)
+    token = _current.set(uow)
+    try:
+        yield uow
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+    finally:
+        _current.reset(token)
+    uow.publish()
+
+
+async def commit(db: AsyncSession) -> None:
+    """commit для методов DAO: внутри transaction(db) откладывается до конца блока."""
+    if current_unit_of_work(db) is None:
+        await db.commit()
+
+
+def notify(db: Optional[AsyncSession], table: str, action: str, rows) -> None:
+    """Публикует событие сразу или, внутри transaction(db), после общего commit."""
+    uow = current_unit_of_work(db) if db is not None else None
+    if uow is None:
+        emit_change(table, action, rows)
+    else:
+        uow.events.append((table, action, list(rows)))
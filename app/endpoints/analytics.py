@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import analytics
 from ..dao import AnalyticsDAO
-from typing import List
+from ..config import settings
+from ..dao.pagination import set_next_cursor
+from ..schemas.fields import parse_fields, partial_model
+from typing import List, Optional
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
@@ -12,12 +15,24 @@ async def create_analytics(analytics_data: analytics.AnalyticsCreate, db: AsyncS
     """Создает новую запись аналитики."""
     return await AnalyticsDAO.create(db, analytics_data.dict())
 
-@router.get("/", response_model=List[analytics.AnalyticsResponse])
-async def get_analytics(db: AsyncSession = Depends(get_db)):
-    """Получает все записи аналитики."""
-    analytics_list = await AnalyticsDAO.get_all(db)
+@router.post("/bulk", response_model=List[analytics.AnalyticsResponse])
+async def create_analytics_bulk(analytics_data: List[analytics.AnalyticsCreate], db: AsyncSession = Depends(get_db)):
+    """Создает пачку записей аналитики одной многострочной вставкой."""
+    return await AnalyticsDAO.create_many(db, [item.dict() for item in analytics_data])
+
+@router.get("/", response_model=List[partial_model(analytics.AnalyticsResponse)], response_model_exclude_unset=True)
+async def get_analytics(
+    response: Response,
+    limit: int = Query(settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Колонки через запятую; id отдаётся всегда"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получает все записи аналитики постранично; курсор следующей страницы — в заголовке X-Next-Cursor."""
+    analytics_list, next_cursor = await AnalyticsDAO.get_page(db, limit, after, fields=parse_fields(fields, analytics.AnalyticsResponse))
     if not analytics_list:
         raise HTTPException(status_code=404, detail="Analytics records not found")
+    set_next_cursor(response, next_cursor)
     return analytics_list
 
 @router.get("/{analytics_id}", response_model=analytics.AnalyticsResponse)
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import blog_posts
 from ..dao import BlogPostDAO
-from typing import List
+from ..config import settings
+from ..dao.pagination import set_next_cursor
+from ..schemas.fields import parse_fields, partial_model
+from typing import List, Optional
 
 router = APIRouter(prefix="/blog_posts", tags=["blog_posts"])
 
@@ -12,40 +15,28 @@ async def create_blog_post(post_data: blog_posts.BlogPostCreate, db: AsyncSessio
     """Создает новый пост в блоге."""
     return await BlogPostDAO.create(db, post_data.dict())
 
-@router.get("/{user_id}", response_model=List[blog_posts.BlogPostResponse])
-async def get_blog_posts(user_id: int, db: AsyncSession = Depends(get_db)):
-    """Получает посты блога пользователя по его ID."""
-    posts = await BlogPostDAO.get_by_user_id(db, user_id)
+@router.get("/{user_id}", response_model=List[partial_model(blog_posts.BlogPostResponse)], response_model_exclude_unset=True)
+async def get_blog_posts(
+    user_id: int,
+    response: Response,
+    limit: int = Query(settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Колонки через запятую; id отдаётся всегда"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получает посты блога пользователя по его ID постранично; курсор следующей страницы — в заголовке X-Next-Cursor."""
+    posts, next_cursor = await BlogPostDAO.get_page(db, limit, after, fields=parse_fields(fields, blog_posts.BlogPostResponse), user_id=user_id)
     if not posts:
         raise HTTPException(status_code=404, detail="Blog posts not found")
+    set_next_cursor(response, next_cursor)
     return posts
 
 @router.put("/{post_id}", response_model=blog_posts.BlogPostResponse)
 async def update_blog_post(post_id: int, post_data: blog_posts.BlogPostUpdate, db: AsyncSession = Depends(get_db)):
     """Обновляет данные поста в блоге."""
-    post = await BlogPostDAO.get_by_id(db, post_id)
-    if not post:
-        raise HTTPException(status_code=404, detail="Blog post not found")
-    update_data = post_data.dict(exclude_unset=True)
-    query = (
-        blog_posts.BlogPost.__table__.update()
-        .where(blog_posts.BlogPost.id == post_id)
-        .values(**update_data)
-        .returning(blog_posts.BlogPost.__table__)
-    )
-    result = await db.execute(query)
-    await db.commit()
-    updated_post = result.first()
-    if not updated_post:
-        raise HTTPException(status_code=404, detail="Blog post not found after update")
-    return updated_post
+    return await BlogPostDAO.update(db, post_id, post_data.dict(exclude_unset=True))
 
 @router.delete("/{post_id}", status_code=204)
 async def delete_blog_post(post_id: int, db: AsyncSession = Depends(get_db)):
     """Удаляет пост блога по ID."""
-    post = await BlogPostDAO.get_by_id(db, post_id)
-    if not post:
-        raise HTTPException(status_code=404, detail="Blog post not found")
-    query = blog_posts.BlogPost.__table__.delete().where(blog_posts.BlogPost.id == post_id)
-    await db.execute(query)
-    await db.commit()
\ No newline at end of file
+    await BlogPostDAO.delete(db, post_id)
\ No newline at end of file
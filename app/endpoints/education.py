@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import education
 from ..dao import EducationDAO
-from typing import List
+from ..config import settings
+from ..dao.pagination import set_next_cursor
+from ..schemas.fields import parse_fields, partial_model
+from typing import List, Optional
 
 router = APIRouter(prefix="/education", tags=["education"])
 
@@ -12,40 +15,28 @@ async def create_education(edu_data: education.EducationCreate, db: AsyncSession
     """Создает новую запись об образовании."""
     return await EducationDAO.create(db, edu_data.dict())
 
-@router.get("/{user_id}", response_model=List[education.EducationResponse])
-async def get_education(user_id: int, db: AsyncSession = Depends(get_db)):
-    """Получает записи об образовании пользователя по его ID."""
-    education_list = await EducationDAO.get_by_user_id(db, user_id)
+@router.get("/{user_id}", response_model=List[partial_model(education.EducationResponse)], response_model_exclude_unset=True)
+async def get_education(
+    user_id: int,
+    response: Response,
+    limit: int = Query(settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Колонки через запятую; id отдаётся всегда"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получает записи об образовании пользователя по его ID постранично; курсор следующей страницы — в заголовке X-Next-Cursor."""
+    education_list, next_cursor = await EducationDAO.get_page(db, limit, after, fields=parse_fields(fields, education.EducationResponse), user_id=user_id)
     if not education_list:
         raise HTTPException(status_code=404, detail="Education records not found")
+    set_next_cursor(response, next_cursor)
     return education_list
 
 @router.put("/{education_id}", response_model=education.EducationResponse)
 async def update_education(education_id: int, edu_data: education.EducationUpdate, db: AsyncSession = Depends(get_db)):
     """Обновляет данные записи об образовании."""
-    education = await EducationDAO.get_by_id(db, education_id)
-    if not education:
-        raise HTTPException(status_code=404, detail="Education record not found")
-    update_data = edu_data.dict(exclude_unset=True)
-    query = (
-        education.Education.__table__.update()
-        .where(education.Education.id == education_id)
-        .values(**update_data)
-        .returning(education.Education.__table__)
-    )
-    result = await db.execute(query)
-    await db.commit()
-    updated_education = result.first()
-    if not updated_education:
-        raise HTTPException(status_code=404, detail="Education record not found after update")
-    return updated_education
+    return await EducationDAO.update(db, education_id, edu_data.dict(exclude_unset=True))
 
 @router.delete("/{education_id}", status_code=204)
 async def delete_education(education_id: int, db: AsyncSession = Depends(get_db)):
     """Удаляет запись об образовании по ID."""
-    education = await EducationDAO.get_by_id(db, education_id)
-    if not education:
-        raise HTTPException(status_code=404, detail="Education record not found")
-    query = education.Education.__table__.delete().where(education.Education.id == education_id)
-    await db.execute(query)
-    await db.commit()
\ No newline at end of file
+    await EducationDAO.delete(db, education_id)
\ No newline at end of file
@@ -0,0 +1,59 @@
+import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from ..config import settings
+from ..database import SessionLocal
+from ..dao import AnalyticsDAO, MessageDAO, MLPredictionDAO
+from ..services.export import EXPORT_FORMATS, MEDIA_TYPES, encode_rows, export_filename
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+# Набор выгружаемых таблиц: DAO и колонка времени для фильтра since/until
+EXPORT_DATASETS = {
+    "analytics": (AnalyticsDAO, "visit_time"),
+    "messages": (MessageDAO, "date_sent"),
+    "ml_predictions": (MLPredictionDAO, "created_at"),
+}
+
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = Query("ndjson", description="ndjson или csv"),
+    since: Optional[datetime.datetime] = Query(None, description="Нижняя граница времени, включительно"),
+    until: Optional[datetime.datetime] = Query(None, description="Верхняя граница времени, не включительно"),
+    gzip: bool = False
+):
+    """Потоково выгружает таблицу в NDJSON или CSV.
+
+    Строки читаются серверным курсором пачками по EXPORT_BATCH_SIZE и сразу кодируются,
+    поэтому память не зависит от размера таблицы. Сессия открывается внутри генератора
+    и живёт, пока клиент дочитывает ответ.
+    """
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown export dataset: {dataset}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    dao, time_field = EXPORT_DATASETS[dataset]
+    time_column = getattr(dao.model, time_field)
+    conditions = []
+    if since is not None:
+        conditions.append(time_column >= since)
+    if until is not None:
+        conditions.append(time_column < until)
+    columns = [column.key for column in dao.model.__table__.columns]
+
+    async def rows():
+        # async with закрывает сессию и при обрыве клиентом: генератор получает GeneratorExit
+        async with SessionLocal() as db:
+            async for row in dao.stream(db, *conditions, batch_size=settings.EXPORT_BATCH_SIZE):
+                yield row
+
+    headers = {"Content-Disposition": f'attachment; filename="{export_filename(dataset, format, gzip)}"'}
+    return StreamingResponse(
+        encode_rows(rows(), format, columns, gzip=gzip, chunk_bytes=settings.EXPORT_CHUNK_BYTES),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers=headers
+    )
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import messages
 from ..dao import MessageDAO
-from typing import List
+from ..config import settings
+from ..dao.pagination import set_next_cursor
+from ..schemas.fields import parse_fields, partial_model
+from typing import List, Optional
 
 router = APIRouter(prefix="/messages", tags=["messages"])
 
@@ -12,12 +15,19 @@ async def create_message(message_data: messages.MessageCreate, db: AsyncSession
     """Создает новое сообщение."""
     return await MessageDAO.create(db, message_data.dict())
 
-@router.get("/", response_model=List[messages.MessageResponse])
-async def get_messages(db: AsyncSession = Depends(get_db)):
-    """Получает все сообщения."""
-    messages_list = await MessageDAO.get_all(db)
+@router.get("/", response_model=List[partial_model(messages.MessageResponse)], response_model_exclude_unset=True)
+async def get_messages(
+    response: Response,
+    limit: int = Query(settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Колонки через запятую; id отдаётся всегда"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получает все сообщения постранично; курсор следующей страницы — в заголовке X-Next-Cursor."""
+    messages_list, next_cursor = await MessageDAO.get_page(db, limit, after, fields=parse_fields(fields, messages.MessageResponse))
     if not messages_list:
         raise HTTPException(status_code=404, detail="Messages not found")
+    set_next_cursor(response, next_cursor)
     return messages_list
 
 @router.get("/{message_id}", response_model=messages.MessageResponse)
@@ -31,9 +41,4 @@ async def get_message(message_id: int, db: AsyncSession = Depends(get_db)):
 @router.delete("/{message_id}", status_code=204)
 async def delete_message(message_id: int, db: AsyncSession = Depends(get_db)):
     """Удаляет сообщение по ID."""
-    message = await MessageDAO.get_by_id(db, message_id)
-    if not message:
-        raise HTTPException(status_code=404, detail="Message not found")
-    query = messages.Message.__table__.delete().where(messages.Message.id == message_id)
-    await db.execute(query)
-    await db.commit()
\ No newline at end of file
+    await MessageDAO.delete(db, message_id)
\ No newline at end of file
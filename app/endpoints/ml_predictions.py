@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import ml_predictions
 from ..dao import MLPredictionDAO
-from typing import List
+from ..config import settings
+from ..dao.pagination import set_next_cursor
+from ..schemas.fields import parse_fields, partial_model
+from typing import List, Optional
 
 router = APIRouter(prefix="/ml_predictions", tags=["ml_predictions"])
 
@@ -12,15 +15,18 @@ async def create_ml_prediction(prediction_data: ml_predictions.MLPredictionCreat
     """Создает новое предсказание машинного обучения."""
     return await MLPredictionDAO.create(db, prediction_data.dict())
 
-@router.get("/{message_id}", response_model=List[ml_predictions.MLPredictionResponse])
-async def get_ml_predictions(message_id: int, db: AsyncSession = Depends(get_db)):
-    """Получает предсказания ML по message_id."""
-    query = (
-        ml_predictions.MLPrediction.__table__.select()
-        .where(ml_predictions.MLPrediction.message_id == message_id)
-    )
-    result = await db.execute(query)
-    predictions = result.fetchall()
+@router.get("/{message_id}", response_model=List[partial_model(ml_predictions.MLPredictionResponse)], response_model_exclude_unset=True)
+async def get_ml_predictions(
+    message_id: int,
+    response: Response,
+    limit: int = Query(settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Колонки через запятую; id отдаётся всегда"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получает предсказания ML по message_id постранично; курсор следующей страницы — в заголовке X-Next-Cursor."""
+    predictions, next_cursor = await MLPredictionDAO.get_page(db, limit, after, fields=parse_fields(fields, ml_predictions.MLPredictionResponse), message_id=message_id)
     if not predictions:
         raise HTTPException(status_code=404, detail="ML predictions not found")
+    set_next_cursor(response, next_cursor)
     return predictions
\ No newline at end of file
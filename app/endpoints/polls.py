@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import polls
 from ..dao import PollDAO
-from typing import List
+from ..config import settings
+from ..dao.pagination import set_next_cursor
+from ..schemas.fields import parse_fields, partial_model
+from typing import List, Optional
 
 router = APIRouter(prefix="/polls", tags=["polls"])
 
@@ -12,45 +15,28 @@ async def create_poll(poll_data: polls.PollCreate, db: AsyncSession = Depends(ge
     """Создает новый опрос."""
     return await PollDAO.create(db, poll_data.dict())
 
-@router.get("/{telegram_user_id}", response_model=List[polls.PollResponse])
-async def get_polls(telegram_user_id: str, db: AsyncSession = Depends(get_db)):
-    """Получает опросы по telegram_user_id."""
-    query = (
-        polls.Poll.__table__.select()
-        .where(polls.Poll.telegram_user_id == telegram_user_id)
-    )
-    result = await db.execute(query)
-    polls_list = result.fetchall()
+@router.get("/{telegram_user_id}", response_model=List[partial_model(polls.PollResponse)], response_model_exclude_unset=True)
+async def get_polls(
+    telegram_user_id: str,
+    response: Response,
+    limit: int = Query(settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Колонки через запятую; id отдаётся всегда"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получает опросы по telegram_user_id постранично; курсор следующей страницы — в заголовке X-Next-Cursor."""
+    polls_list, next_cursor = await PollDAO.get_page(db, limit, after, fields=parse_fields(fields, polls.PollResponse), telegram_user_id=telegram_user_id)
     if not polls_list:
         raise HTTPException(status_code=404, detail="Polls not found")
+    set_next_cursor(response, next_cursor)
     return polls_list
 
 @router.put("/{poll_id}", response_model=polls.PollResponse)
 async def update_poll(poll_id: int, poll_data: polls.PollUpdate, db: AsyncSession = Depends(get_db)):
     """Обновляет данные опроса."""
-    poll = await PollDAO.get_by_id(db, poll_id)
-    if not poll:
-        raise HTTPException(status_code=404, detail="Poll not found")
-    update_data = poll_data.dict(exclude_unset=True)
-    query = (
-        polls.Poll.__table__.update()
-        .where(polls.Poll.id == poll_id)
-        .values(**update_data)
-        .returning(polls.Poll.__table__)
-    )
-    result = await db.execute(query)
-    await db.commit()
-    updated_poll = result.first()
-    if not updated_poll:
-        raise HTTPException(status_code=404, detail="Poll not found after update")
-    return updated_poll
+    return await PollDAO.update(db, poll_id, poll_data.dict(exclude_unset=True))
 
 @router.delete("/{poll_id}", status_code=204)
 async def delete_poll(poll_id: int, db: AsyncSession = Depends(get_db)):
     """Удаляет опрос по ID."""
-    poll = await PollDAO.get_by_id(db, poll_id)
-    if not poll:
-        raise HTTPException(status_code=404, detail="Poll not found")
-    query = polls.Poll.__table__.delete().where(polls.Poll.id == poll_id)
-    await db.execute(query)
-    await db.commit()
\ No newline at end of file
+    await PollDAO.delete(db, poll_id)
\ No newline at end of file
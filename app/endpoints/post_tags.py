@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import post_tags
 from ..dao import PostTagDAO
+from typing import List
 
 router = APIRouter(prefix="/post_tags", tags=["post_tags"])
 
@@ -11,15 +12,12 @@ async def create_post_tag(post_tag_data: post_tags.PostTagCreate, db: AsyncSessi
     """Создает связь между постом блога и тегом."""
     return await PostTagDAO.create(db, post_tag_data.dict())
 
+@router.post("/bulk", response_model=List[post_tags.PostTagResponse])
+async def create_post_tags_bulk(post_tags_data: List[post_tags.PostTagCreate], db: AsyncSession = Depends(get_db)):
+    """Создает несколько связей поста с тегами одной многострочной вставкой."""
+    return await PostTagDAO.create_many(db, [item.dict() for item in post_tags_data])
+
 @router.delete("/{post_id}/{tag_id}", status_code=204)
 async def delete_post_tag(post_id: int, tag_id: int, db: AsyncSession = Depends(get_db)):
     """Удаляет связь между постом блога и тегом."""
-    query = (
-        post_tags.PostTag.__table__.delete()
-        .where(post_tags.PostTag.post_id == post_id)
-        .where(post_tags.PostTag.tag_id == tag_id)
-    )
-    result = await db.execute(query)
-    await db.commit()
-    if result.rowcount == 0:
-        raise HTTPException(status_code=404, detail="PostTag not found")
\ No newline at end of file
+    await PostTagDAO.delete_where(db, post_id=post_id, tag_id=tag_id)
\ No newline at end of file
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import project_tags
 from ..dao import ProjectTagDAO
+from typing import List
 
 router = APIRouter(prefix="/project_tags", tags=["project_tags"])
 
@@ -11,15 +12,12 @@ async def create_project_tag(project_tag_data: project_tags.ProjectTagCreate, db
     """Создает связь между проектом и тегом."""
     return await ProjectTagDAO.create(db, project_tag_data.dict())
 
+@router.post("/bulk", response_model=List[project_tags.ProjectTagResponse])
+async def create_project_tags_bulk(project_tags_data: List[project_tags.ProjectTagCreate], db: AsyncSession = Depends(get_db)):
+    """Создает несколько связей проекта с тегами одной многострочной вставкой."""
+    return await ProjectTagDAO.create_many(db, [item.dict() for item in project_tags_data])
+
 @router.delete("/{project_id}/{tag_id}", status_code=204)
 async def delete_project_tag(project_id: int, tag_id: int, db: AsyncSession = Depends(get_db)):
     """Удаляет связь между проектом и тегом."""
-    query = (
-        project_tags.ProjectTag.__table__.delete()
-        .where(project_tags.ProjectTag.project_id == project_id)
-        .where(project_tags.ProjectTag.tag_id == tag_id)
-    )
-    result = await db.execute(query)
-    await db.commit()
-    if result.rowcount == 0:
-        raise HTTPException(status_code=404, detail="ProjectTag not found")
\ No newline at end of file
+    await ProjectTagDAO.delete_where(db, project_id=project_id, tag_id=tag_id)
\ No newline at end of file
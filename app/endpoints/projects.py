@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import projects
-from ..dao.models_dao import ProjectDAO
+from ..dao.models_dao import ProjectDAO, ProjectTagDAO
+from ..dao.uow import transaction
 from ..auth import get_current_user
+from ..telegram_bot.notifications import notify_subscribers_new_project
 from aiogram import Bot
 from ..config import settings
-from typing import List
+from ..dao.pagination import set_next_cursor
+from ..schemas.fields import parse_fields, partial_model
+from typing import List, Optional
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -16,18 +20,37 @@ bot = Bot(token=settings.TELEGRAM_BOT_TOKEN)
 @router.post("/", response_model=projects.ProjectResponse)
 async def create_project(
     project_data: projects.ProjectCreate,
+    background_tasks: BackgroundTasks,
     current_user=Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Создает новый проект пользователя."""
-    return await ProjectDAO.create(db, project_data.dict(), bot=bot)
+    """Создает новый проект пользователя и рассылает уведомление подписчикам после ответа.
 
-@router.get("/{user_id}", response_model=List[projects.ProjectResponse])
-async def get_projects(user_id: int, db: AsyncSession = Depends(get_db)):
-    """Получает проекты пользователя по его ID."""
-    projects_list = await ProjectDAO.get_by_user_id(db, user_id)
+    Проект и связи с тегами из tag_ids записываются одной транзакцией.
+    """
+    async with transaction(db):
+        project = await ProjectDAO.create(db, project_data.dict(exclude={"tag_ids"}))
+        if project_data.tag_ids:
+            await ProjectTagDAO.create_many(db, [
+                {"project_id": project.id, "tag_id": tag_id} for tag_id in dict.fromkeys(project_data.tag_ids)
+            ])
+    background_tasks.add_task(notify_subscribers_new_project, bot, project)
+    return project
+
+@router.get("/{user_id}", response_model=List[partial_model(projects.ProjectResponse)], response_model_exclude_unset=True)
+async def get_projects(
+    user_id: int,
+    response: Response,
+    limit: int = Query(settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Колонки через запятую; id отдаётся всегда"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получает проекты пользователя по его ID постранично; курсор следующей страницы — в заголовке X-Next-Cursor."""
+    projects_list, next_cursor = await ProjectDAO.get_page(db, limit, after, fields=parse_fields(fields, projects.ProjectResponse), user_id=user_id)
     if not projects_list:
         raise HTTPException(status_code=404, detail="Projects not found")
+    set_next_cursor(response, next_cursor)
     return projects_list
 
 @router.put("/{project_id}", response_model=projects.ProjectResponse)
@@ -37,15 +60,14 @@ async def update_project(
     current_user=Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Обновляет данные проекта."""
-    return await ProjectDAO.update(db, project_id, project_data.dict(exclude_unset=True), bot=bot)
+    """Обновляет данные проекта; переданный tag_ids заменяет теги в той же транзакции."""
+    async with transaction(db):
+        project = await ProjectDAO.update(db, project_id, project_data.dict(exclude_unset=True, exclude={"tag_ids"}))
+        if project_data.tag_ids is not None:
+            await ProjectTagDAO.set_for_project(db, project_id, project_data.tag_ids)
+    return project
 
 @router.delete("/{project_id}", status_code=204)
 async def delete_project(project_id: int, current_user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Удаляет проект по ID."""
-    project = await ProjectDAO.get_by_id(db, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    query = projects.Project.__table__.delete().where(projects.Project.id == project_id)
-    await db.execute(query)
-    await db.commit()
\ No newline at end of file
+    await ProjectDAO.delete(db, project_id)
\ No newline at end of file
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_db
-from app.services.rag import get_rag_response
+from app.database import SessionLocal, get_db
+from app.services.rag import get_rag_metrics, get_rag_response, get_rag_stats, stream_rag_response
+from app.services.reindex_queue import reindex_queue
 from pydantic import BaseModel
+import json
 
 router = APIRouter(prefix="/rag", tags=["rag"])
 
@@ -14,4 +17,31 @@ async def ask_question(request: QuestionRequest, db: AsyncSession = Depends(get_
     response = await get_rag_response(request.question, db)
     if "Произошла ошибка" in response:
         raise HTTPException(status_code=500, detail=response)
-    return {"answer": response}
\ No newline at end of file
+    return {"answer": response}
+
+@router.post("/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """Отдаёт ответ по мере генерации как Server-Sent Events."""
+    async def event_stream():
+        # Сессию открываем внутри генератора: она должна жить, пока идёт стрим,
+        # и закрыться, даже если клиент отключился посреди ответа
+        async with SessionLocal() as db:
+            async for chunk in stream_rag_response(request.question, db):
+                yield f"data: {json.dumps({'text': chunk}, ensure_ascii=False)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stats")
+async def rag_stats():
+    return {**get_rag_stats(), "reindex_queue": reindex_queue.stats()}
+
+
+@router.get("/metrics")
+async def rag_metrics():
+    """Перцентили латентности по стадиям RAG (p50/p95/p99, мс)."""
+    return get_rag_metrics()
\ No newline at end of file
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import skills
 from ..dao import SkillDAO
-from typing import List
+from ..config import settings
+from ..dao.pagination import set_next_cursor
+from ..schemas.fields import parse_fields, partial_model
+from typing import List, Optional
 
 router = APIRouter(prefix="/skills", tags=["skills"])
 
@@ -12,40 +15,28 @@ async def create_skill(skill_data: skills.SkillCreate, db: AsyncSession = Depend
     """Создает новый навык пользователя."""
     return await SkillDAO.create(db, skill_data.dict())
 
-@router.get("/{user_id}", response_model=List[skills.SkillResponse])
-async def get_skills(user_id: int, db: AsyncSession = Depends(get_db)):
-    """Получает навыки пользователя по его ID."""
-    skills_list = await SkillDAO.get_by_user_id(db, user_id)
+@router.get("/{user_id}", response_model=List[partial_model(skills.SkillResponse)], response_model_exclude_unset=True)
+async def get_skills(
+    user_id: int,
+    response: Response,
+    limit: int = Query(settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Колонки через запятую; id отдаётся всегда"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получает навыки пользователя по его ID постранично; курсор следующей страницы — в заголовке X-Next-Cursor."""
+    skills_list, next_cursor = await SkillDAO.get_page(db, limit, after, fields=parse_fields(fields, skills.SkillResponse), user_id=user_id)
     if not skills_list:
         raise HTTPException(status_code=404, detail="Skills not found")
+    set_next_cursor(response, next_cursor)
     return skills_list
 
 @router.put("/{skill_id}", response_model=skills.SkillResponse)
 async def update_skill(skill_id: int, skill_data: skills.SkillUpdate, db: AsyncSession = Depends(get_db)):
     """Обновляет данные навыка."""
-    skill = await SkillDAO.get_by_id(db, skill_id)
-    if not skill:
-        raise HTTPException(status_code=404, detail="Skill not found")
-    update_data = skill_data.dict(exclude_unset=True)
-    query = (
-        skills.Skill.__table__.update()
-        .where(skills.Skill.id == skill_id)
-        .values(**update_data)
-        .returning(skills.Skill.__table__)
-    )
-    result = await db.execute(query)
-    await db.commit()
-    updated_skill = result.first()
-    if not updated_skill:
-        raise HTTPException(status_code=404, detail="Skill not found after update")
-    return updated_skill
+    return await SkillDAO.update(db, skill_id, skill_data.dict(exclude_unset=True))
 
 @router.delete("/{skill_id}", status_code=204)
 async def delete_skill(skill_id: int, db: AsyncSession = Depends(get_db)):
     """Удаляет навык по ID."""
-    skill = await SkillDAO.get_by_id(db, skill_id)
-    if not skill:
-        raise HTTPException(status_code=404, detail="Skill not found")
-    query = skills.Skill.__table__.delete().where(skills.Skill.id == skill_id)
-    await db.execute(query)
-    await db.commit()
\ No newline at end of file
+    await SkillDAO.delete(db, skill_id)
\ No newline at end of file
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import social_media
 from ..dao import SocialMediaDAO
-from typing import List
+from ..config import settings
+from ..dao.pagination import set_next_cursor
+from ..schemas.fields import parse_fields, partial_model
+from typing import List, Optional
 
 router = APIRouter(prefix="/social_media", tags=["social_media"])
 
@@ -12,40 +15,28 @@ async def create_social_media(social_data: social_media.SocialMediaCreate, db: A
     """Создает новую запись о социальной сети."""
     return await SocialMediaDAO.create(db, social_data.dict())
 
-@router.get("/{user_id}", response_model=List[social_media.SocialMediaResponse])
-async def get_social_media(user_id: int, db: AsyncSession = Depends(get_db)):
-    """Получает записи о социальных сетях пользователя по его ID."""
-    social_media_list = await SocialMediaDAO.get_by_user_id(db, user_id)
+@router.get("/{user_id}", response_model=List[partial_model(social_media.SocialMediaResponse)], response_model_exclude_unset=True)
+async def get_social_media(
+    user_id: int,
+    response: Response,
+    limit: int = Query(settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Колонки через запятую; id отдаётся всегда"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получает записи о социальных сетях пользователя по его ID постранично; курсор следующей страницы — в заголовке X-Next-Cursor."""
+    social_media_list, next_cursor = await SocialMediaDAO.get_page(db, limit, after, fields=parse_fields(fields, social_media.SocialMediaResponse), user_id=user_id)
     if not social_media_list:
         raise HTTPException(status_code=404, detail="Social media not found")
+    set_next_cursor(response, next_cursor)
     return social_media_list
 
 @router.put("/{social_id}", response_model=social_media.SocialMediaResponse)
 async def update_social_media(social_id: int, social_data: social_media.SocialMediaUpdate, db: AsyncSession = Depends(get_db)):
     """Обновляет данные записи о социальной сети."""
-    social = await SocialMediaDAO.get_by_id(db, social_id)
-    if not social:
-        raise HTTPException(status_code=404, detail="Social media not found")
-    update_data = social_data.dict(exclude_unset=True)
-    query = (
-        social_media.SocialMedia.__table__.update()
-        .where(social_media.SocialMedia.id == social_id)
-        .values(**update_data)
-        .returning(social_media.SocialMedia.__table__)
-    )
-    result = await db.execute(query)
-    await db.commit()
-    updated_social = result.first()
-    if not updated_social:
-        raise HTTPException(status_code=404, detail="Social media not found after update")
-    return updated_social
+    return await SocialMediaDAO.update(db, social_id, social_data.dict(exclude_unset=True))
 
 @router.delete("/{social_id}", status_code=204)
 async def delete_social_media(social_id: int, db: AsyncSession = Depends(get_db)):
     """Удаляет запись о социальной сети по ID."""
-    social = await SocialMediaDAO.get_by_id(db, social_id)
-    if not social:
-        raise HTTPException(status_code=404, detail="Social media not found")
-    query = social_media.SocialMedia.__table__.delete().where(social_media.SocialMedia.id == social_id)
-    await db.execute(query)
-    await db.commit()
\ No newline at end of file
+    await SocialMediaDAO.delete(db, social_id)
\ No newline at end of file
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import subscriber_preferences
 from ..dao import SubscriberPreferenceDAO
-from typing import List
+from ..config import settings
+from ..dao.pagination import set_next_cursor
+from ..schemas.fields import parse_fields, partial_model
+from typing import List, Optional
 
 router = APIRouter(prefix="/subscriber_preferences", tags=["subscriber_preferences"])
 
@@ -12,45 +15,28 @@ async def create_subscriber_preference(pref_data: subscriber_preferences.Subscri
     """Создает новое предпочтение подписчика."""
     return await SubscriberPreferenceDAO.create(db, pref_data.dict())
 
-@router.get("/{telegram_user_id}", response_model=List[subscriber_preferences.SubscriberPreferenceResponse])
-async def get_subscriber_preferences(telegram_user_id: str, db: AsyncSession = Depends(get_db)):
-    """Получает предпочтения подписчика по telegram_user_id."""
-    query = (
-        subscriber_preferences.SubscriberPreference.__table__.select()
-        .where(subscriber_preferences.SubscriberPreference.telegram_user_id == telegram_user_id)
-    )
-    result = await db.execute(query)
-    preferences = result.fetchall()
+@router.get("/{telegram_user_id}", response_model=List[partial_model(subscriber_preferences.SubscriberPreferenceResponse)], response_model_exclude_unset=True)
+async def get_subscriber_preferences(
+    telegram_user_id: str,
+    response: Response,
+    limit: int = Query(settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Колонки через запятую; id отдаётся всегда"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получает предпочтения подписчика по telegram_user_id постранично; курсор следующей страницы — в заголовке X-Next-Cursor."""
+    preferences, next_cursor = await SubscriberPreferenceDAO.get_page(db, limit, after, fields=parse_fields(fields, subscriber_preferences.SubscriberPreferenceResponse), telegram_user_id=telegram_user_id)
     if not preferences:
         raise HTTPException(status_code=404, detail="Subscriber preferences not found")
+    set_next_cursor(response, next_cursor)
     return preferences
 
 @router.put("/{preference_id}", response_model=subscriber_preferences.SubscriberPreferenceResponse)
 async def update_subscriber_preference(preference_id: int, pref_data: subscriber_preferences.SubscriberPreferenceUpdate, db: AsyncSession = Depends(get_db)):
     """Обновляет данные предпочтения подписчика."""
-    preference = await SubscriberPreferenceDAO.get_by_id(db, preference_id)
-    if not preference:
-        raise HTTPException(status_code=404, detail="Subscriber preference not found")
-    update_data = pref_data.dict(exclude_unset=True)
-    query = (
-        subscriber_preferences.SubscriberPreference.__table__.update()
-        .where(subscriber_preferences.SubscriberPreference.id == preference_id)
-        .values(**update_data)
-        .returning(subscriber_preferences.SubscriberPreference.__table__)
-    )
-    result = await db.execute(query)
-    await db.commit()
-    updated_preference = result.first()
-    if not updated_preference:
-        raise HTTPException(status_code=404, detail="Subscriber preference not found after update")
-    return updated_preference
+    return await SubscriberPreferenceDAO.update(db, preference_id, pref_data.dict(exclude_unset=True))
 
 @router.delete("/{preference_id}", status_code=204)
 async def delete_subscriber_preference(preference_id: int, db: AsyncSession = Depends(get_db)):
     """Удаляет предпочтение подписчика по ID."""
-    preference = await SubscriberPreferenceDAO.get_by_id(db, preference_id)
-    if not preference:
-        raise HTTPException(status_code=404, detail="Subscriber preference not found")
-    query = subscriber_preferences.SubscriberPreference.__table__.delete().where(subscriber_preferences.SubscriberPreference.id == preference_id)
-    await db.execute(query)
-    await db.commit()
\ No newline at end of file
+    await SubscriberPreferenceDAO.delete(db, preference_id)
\ No newline at end of file
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import tags
 from ..dao import TagDAO
-from typing import List
+from ..config import settings
+from ..dao.pagination import set_next_cursor
+from ..schemas.fields import parse_fields, partial_model
+from typing import List, Optional
 
 router = APIRouter(prefix="/tags", tags=["tags"])
 
@@ -12,40 +15,27 @@ async def create_tag(tag_data: tags.TagCreate, db: AsyncSession = Depends(get_db
     """Создает новый тег."""
     return await TagDAO.create(db, tag_data.dict())
 
-@router.get("/", response_model=List[tags.TagResponse])
-async def get_tags(db: AsyncSession = Depends(get_db)):
-    """Получает все теги."""
-    tags_list = await TagDAO.get_all(db)
+@router.get("/", response_model=List[partial_model(tags.TagResponse)], response_model_exclude_unset=True)
+async def get_tags(
+    response: Response,
+    limit: int = Query(settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Колонки через запятую; id отдаётся всегда"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получает все теги постранично; курсор следующей страницы — в заголовке X-Next-Cursor."""
+    tags_list, next_cursor = await TagDAO.get_page(db, limit, after, fields=parse_fields(fields, tags.TagResponse))
     if not tags_list:
         raise HTTPException(status_code=404, detail="Tags not found")
+    set_next_cursor(response, next_cursor)
     return tags_list
 
 @router.put("/{tag_id}", response_model=tags.TagResponse)
 async def update_tag(tag_id: int, tag_data: tags.TagUpdate, db: AsyncSession = Depends(get_db)):
     """Обновляет данные тега."""
-    tag = await TagDAO.get_by_id(db, tag_id)
-    if not tag:
-        raise HTTPException(status_code=404, detail="Tag not found")
-    update_data = tag_data.dict(exclude_unset=True)
-    query = (
-        tags.Tag.__table__.update()
-        .where(tags.Tag.id == tag_id)
-        .values(**update_data)
-        .returning(tags.Tag.__table__)
-    )
-    result = await db.execute(query)
-    await db.commit()
-    updated_tag = result.first()
-    if not updated_tag:
-        raise HTTPException(status_code=404, detail="Tag not found after update")
-    return updated_tag
+    return await TagDAO.update(db, tag_id, tag_data.dict(exclude_unset=True))
 
 @router.delete("/{tag_id}", status_code=204)
 async def delete_tag(tag_id: int, db: AsyncSession = Depends(get_db)):
     """Удаляет тег по ID."""
-    tag = await TagDAO.get_by_id(db, tag_id)
-    if not tag:
-        raise HTTPException(status_code=404, detail="Tag not found")
-    query = tags.Tag.__table__.delete().where(tags.Tag.id == tag_id)
-    await db.execute(query)
-    await db.commit()
\ No newline at end of file
+    await TagDAO.delete(db, tag_id)
\ No newline at end of file
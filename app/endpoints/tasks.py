@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import tasks
 from ..dao import TaskDAO
-from typing import List
+from ..config import settings
+from ..dao.pagination import set_next_cursor
+from ..schemas.fields import parse_fields, partial_model
+from typing import List, Optional
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -12,12 +15,20 @@ async def create_task(task_data: tasks.TaskCreate, db: AsyncSession = Depends(ge
     """Создает новую задачу."""
     return await TaskDAO.create(db, task_data.dict())
 
-@router.get("/{user_id}", response_model=List[tasks.TaskResponse])
-async def get_tasks(user_id: int, db: AsyncSession = Depends(get_db)):
-    """Получает задачи пользователя по его ID."""
-    tasks_list = await TaskDAO.get_by_user_id(db, user_id)
+@router.get("/{user_id}", response_model=List[partial_model(tasks.TaskResponse)], response_model_exclude_unset=True)
+async def get_tasks(
+    user_id: int,
+    response: Response,
+    limit: int = Query(settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Колонки через запятую; id отдаётся всегда"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получает задачи пользователя по его ID постранично; курсор следующей страницы — в заголовке X-Next-Cursor."""
+    tasks_list, next_cursor = await TaskDAO.get_page(db, limit, after, fields=parse_fields(fields, tasks.TaskResponse), user_id=user_id)
     if not tasks_list:
         raise HTTPException(status_code=404, detail="Tasks not found")
+    set_next_cursor(response, next_cursor)
     return tasks_list
 
 @router.get("/task/{task_id}", response_model=tasks.TaskResponse)
@@ -31,30 +42,9 @@ async def get_task(task_id: int, db: AsyncSession = Depends(get_db)):
 @router.put("/{task_id}", response_model=tasks.TaskResponse)
 async def update_task(task_id: int, task_data: tasks.TaskUpdate, db: AsyncSession = Depends(get_db)):
     """Обновляет данные задачи."""
-    task = await TaskDAO.get_by_id(db, task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    update_data = task_data.dict(exclude_unset=True)
-    update_data["updated_at"] = datetime.datetime.utcnow()  # Обновляем поле updated_at
-    query = (
-        tasks.Task.__table__.update()
-        .where(tasks.Task.id == task_id)
-        .values(**update_data)
-        .returning(tasks.Task.__table__)
-    )
-    result = await db.execute(query)
-    await db.commit()
-    updated_task = result.first()
-    if not updated_task:
-        raise HTTPException(status_code=404, detail="Task not found after update")
-    return updated_task
+    return await TaskDAO.update(db, task_id, task_data.dict(exclude_unset=True))
 
 @router.delete("/{task_id}", status_code=204)
 async def delete_task(task_id: int, db: AsyncSession = Depends(get_db)):
     """Удаляет задачу по ID."""
-    task = await TaskDAO.get_by_id(db, task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    query = tasks.Task.__table__.delete().where(tasks.Task.id == task_id)
-    await db.execute(query)
-    await db.commit()
\ No newline at end of file
+    await TaskDAO.delete(db, task_id)
\ No newline at end of file
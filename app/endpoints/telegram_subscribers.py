@@ -27,11 +27,4 @@ async def get_telegram_subscriber(telegram_user_id: str, db: AsyncSession = Depe
 @router.delete("/{telegram_user_id}", status_code=204)
 async def delete_telegram_subscriber(telegram_user_id: str, db: AsyncSession = Depends(get_db)):
     """Удаляет подписчика Telegram по ID."""
-    query = (
-        telegram_subscribers.TelegramSubscriber.__table__.delete()
-        .where(telegram_subscribers.TelegramSubscriber.telegram_user_id == telegram_user_id)
-    )
-    result = await db.execute(query)
-    await db.commit()
-    if result.rowcount == 0:
-        raise HTTPException(status_code=404, detail="Telegram subscriber not found")
\ No newline at end of file
+    await TelegramSubscriberDAO.delete_where(db, telegram_user_id=telegram_user_id)
\ No newline at end of file
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import users
 from ..dao import UserDAO
-from typing import List
+from ..config import settings
+from ..dao.pagination import set_next_cursor
+from ..schemas.fields import parse_fields, partial_model
+from typing import List, Optional
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -20,37 +23,25 @@ async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
-@router.get("/", response_model=List[users.UserResponse])
-async def get_all_users(db: AsyncSession = Depends(get_db)):
-    """Получает всех пользователей."""
-    return await UserDAO.get_all(db)
+@router.get("/", response_model=List[partial_model(users.UserResponse)], response_model_exclude_unset=True)
+async def get_all_users(
+    response: Response,
+    limit: int = Query(settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Колонки через запятую; id отдаётся всегда"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получает всех пользователей постранично; курсор следующей страницы — в заголовке X-Next-Cursor."""
+    users_list, next_cursor = await UserDAO.get_page(db, limit, after, fields=parse_fields(fields, users.UserResponse))
+    set_next_cursor(response, next_cursor)
+    return users_list
 
 @router.put("/{user_id}", response_model=users.UserResponse)
 async def update_user(user_id: int, user_data: users.UserUpdate, db: AsyncSession = Depends(get_db)):
     """Обновляет данные пользователя."""
-    user = await UserDAO.get_by_id(db, user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    update_data = user_data.dict(exclude_unset=True)
-    query = (
-        users.User.__table__.update()
-        .where(users.User.id == user_id)
-        .values(**update_data)
-        .returning(users.User.__table__)
-    )
-    result = await db.execute(query)
-    await db.commit()
-    updated_user = result.first()
-    if not updated_user:
-        raise HTTPException(status_code=404, detail="User not found after update")
-    return updated_user
+    return await UserDAO.update(db, user_id, user_data.dict(exclude_unset=True))
 
 @router.delete("/{user_id}", status_code=204)
 async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
     """Удаляет пользователя по ID."""
-    user = await UserDAO.get_by_id(db, user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    query = users.User.__table__.delete().where(users.User.id == user_id)
-    await db.execute(query)
-    await db.commit()
\ No newline at end of file
+    await UserDAO.delete(db, user_id)
\ No newline at end of file
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas import work_experience
 from ..dao import WorkExperienceDAO
-from typing import List
+from ..config import settings
+from ..dao.pagination import set_next_cursor
+from ..schemas.fields import parse_fields, partial_model
+from typing import List, Optional
 
 router = APIRouter(prefix="/work_experience", tags=["work_experience"])
 
@@ -12,40 +15,28 @@ async def create_work_experience(work_data: work_experience.WorkExperienceCreate
     """Создает новую запись об опыте работы."""
     return await WorkExperienceDAO.create(db, work_data.dict())
 
-@router.get("/{user_id}", response_model=List[work_experience.WorkExperienceResponse])
-async def get_work_experience(user_id: int, db: AsyncSession = Depends(get_db)):
-    """Получает записи об опыте работы пользователя по его ID."""
-    work_experience_list = await WorkExperienceDAO.get_by_user_id(db, user_id)
+@router.get("/{user_id}", response_model=List[partial_model(work_experience.WorkExperienceResponse)], response_model_exclude_unset=True)
+async def get_work_experience(
+    user_id: int,
+    response: Response,
+    limit: int = Query(settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Колонки через запятую; id отдаётся всегда"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получает записи об опыте работы пользователя по его ID постранично; курсор следующей страницы — в заголовке X-Next-Cursor."""
+    work_experience_list, next_cursor = await WorkExperienceDAO.get_page(db, limit, after, fields=parse_fields(fields, work_experience.WorkExperienceResponse), user_id=user_id)
     if not work_experience_list:
         raise HTTPException(status_code=404, detail="Work experience records not found")
+    set_next_cursor(response, next_cursor)
     return work_experience_list
 
 @router.put("/{work_id}", response_model=work_experience.WorkExperienceResponse)
 async def update_work_experience(work_id: int, work_data: work_experience.WorkExperienceUpdate, db: AsyncSession = Depends(get_db)):
     """Обновляет данные записи об опыте работы."""
-    work_experience = await WorkExperienceDAO.get_by_id(db, work_id)
-    if not work_experience:
-        raise HTTPException(status_code=404, detail="Work experience record not found")
-    update_data = work_data.dict(exclude_unset=True)
-    query = (
-        work_experience.WorkExperience.__table__.update()
-        .where(work_experience.WorkExperience.id == work_id)
-        .values(**update_data)
-        .returning(work_experience.WorkExperience.__table__)
-    )
-    result = await db.execute(query)
-    await db.commit()
-    updated_work_experience = result.first()
-    if not updated_work_experience:
-        raise HTTPException(status_code=404, detail="Work experience record not found after update")
-    return updated_work_experience
+    return await WorkExperienceDAO.update(db, work_id, work_data.dict(exclude_unset=True))
 
 @router.delete("/{work_id}", status_code=204)
 async def delete_work_experience(work_id: int, db: AsyncSession = Depends(get_db)):
     """Удаляет запись об опыте работы по ID."""
-    work_experience = await WorkExperienceDAO.get_by_id(db, work_id)
-    if not work_experience:
-        raise HTTPException(status_code=404, detail="Work experience record not found")
-    query = work_experience.WorkExperience.__table__.delete().where(work_experience.WorkExperience.id == work_id)
-    await db.execute(query)
-    await db.commit()
\ No newline at end of file
+    await WorkExperienceDAO.delete(db, work_id)
\ No newline at end of file
@@ -3,9 +3,13 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from .database import engine, get_db, Base
 from .routers import router
-from .auth import hash_password
+from .auth import hash_password, get_current_user
 from .config import settings
 from .dao.models_dao import UserDAO
+from .services.interaction_log import interaction_log
+from .services.reindex_queue import reindex_queue
+from .dao.cache import dao_cache
+from .dao.uow import transaction
 import logging
 
 # Настройка логирования
@@ -38,8 +42,8 @@ async def startup_event():
                         "email": settings.ADMIN_EMAIL,
                         "role": "admin"
                     }
-                    await UserDAO.create(db, admin_data)
-                    await db.commit()
+                    async with transaction(db):
+                        await UserDAO.create(db, admin_data)
                     logger.info("Admin user created successfully.")
                 else:
                     logger.info("Admin user already exists.")
@@ -49,11 +53,23 @@ async def startup_event():
             finally:
                 await db.close()
             break
+    reindex_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await reindex_queue.stop()
+    await interaction_log.stop()
+    await dao_cache.close()
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Landing Page API"}
 
+@app.get("/cache/stats", dependencies=[Depends(get_current_user)])
+async def cache_stats():
+    """Hit ratio read-through кэша DAO по таблицам."""
+    return dao_cache.stats()
+
 @app.get("/health")
 async def health_check(db: AsyncSession = Depends(get_db)):
     try:
@@ -0,0 +1,40 @@
+"""add mlpredictions.timings
+
+Приложение при старте создаёт недостающие таблицы через Base.metadata.create_all,
+и в такой базе колонка уже есть. Поэтому колонка добавляется, только если её нет,
+а колонка типа JSON (так её создавали прежние версии модели) переводится в JSONB.
+
+Revision ID: 3f9a1c2b7d10
+Revises: 
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2b7d10'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if context.is_offline_mode():
+        op.add_column('mlpredictions', sa.Column('timings', JSONB(), nullable=True))
+        return
+    columns = {column['name']: column for column in sa.inspect(op.get_bind()).get_columns('mlpredictions')}
+    if 'timings' not in columns:
+        op.add_column('mlpredictions', sa.Column('timings', JSONB(), nullable=True))
+    elif not isinstance(columns['timings']['type'], JSONB):
+        op.alter_column('mlpredictions', 'timings', type_=JSONB(), postgresql_using='timings::jsonb')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('mlpredictions', 'timings')
@@ -0,0 +1,76 @@
+"""unique projects.project_url
+
+Старая синхронизация с GitHub могла завести несколько проектов с одним project_url.
+Перед созданием ограничения дубли схлопываются: остаётся проект с наименьшим id,
+теги удаляемых дублей переносятся на него, а id и URL удалённых проектов пишутся
+в лог alembic (logger alembic.runtime.migration), чтобы их можно было найти в бэкапе.
+Описания и прочие поля дублей не сливаются. downgrade удалённые строки не возвращает.
+
+В базе, созданной приложением через Base.metadata.create_all, ограничение уже есть
+(Project.project_url объявлен unique=True) — тогда оно не создаётся повторно.
+
+Revision ID: 8b2e4d6f1a3c
+Revises: 3f9a1c2b7d10
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f1a3c'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c2b7d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# Дубль -> проект с тем же project_url и наименьшим id, который остаётся
+DUPLICATES = """
+    SELECT p.id AS duplicate_id, p.project_url,
+           (SELECT min(o.id) FROM projects o WHERE o.project_url = p.project_url) AS kept_id
+    FROM projects p
+    WHERE EXISTS (SELECT 1 FROM projects o WHERE o.project_url = p.project_url AND o.id < p.id)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not context.is_offline_mode():
+        # В режиме --sql строк нет, дубли видны только при настоящем прогоне
+        for duplicate_id, project_url, kept_id in op.get_bind().execute(sa.text(DUPLICATES)):
+            logger.warning(f"Removing duplicate project {duplicate_id} ({project_url}), kept project {kept_id}")
+    # Теги дублей переносим на оставшийся проект
+    op.execute(f"""
+        INSERT INTO projecttags (project_id, tag_id)
+        SELECT DISTINCT d.kept_id, pt.tag_id
+        FROM ({DUPLICATES}) d
+        JOIN projecttags pt ON pt.project_id = d.duplicate_id
+        ON CONFLICT DO NOTHING
+    """)
+    op.execute(f"""
+        DELETE FROM projecttags
+        WHERE project_id IN (SELECT duplicate_id FROM ({DUPLICATES}) d)
+    """)
+    op.execute("""
+        DELETE FROM projects p
+        WHERE EXISTS (SELECT 1 FROM projects o WHERE o.project_url = p.project_url AND o.id < p.id)
+    """)
+    if context.is_offline_mode() or not _has_unique_project_url():
+        op.create_unique_constraint('projects_project_url_key', 'projects', ['project_url'])
+
+
+def _has_unique_project_url() -> bool:
+    inspector = sa.inspect(op.get_bind())
+    constraints = inspector.get_unique_constraints('projects')
+    indexes = [index for index in inspector.get_indexes('projects') if index['unique']]
+    return any(item['column_names'] == ['project_url'] for item in constraints + indexes)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('projects_project_url_key', 'projects', type_='unique')
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
 from ..database import Base
 from datetime import datetime
 
@@ -8,4 +9,5 @@ class MLPrediction(Base):
     message_id = Column(Integer, ForeignKey("messages.id"))
     input_text = Column(String, nullable=False)
     prediction = Column(String)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+    timings = Column(JSONB)  # Тайминги стадий RAG в мс, заполняются при RAG_STORE_TIMINGS
\ No newline at end of file
@@ -8,5 +8,5 @@ class Project(Base):
     title = Column(String(100), nullable=False)
     description = Column(String)
     image_url = Column(String(255))
-    project_url = Column(String(255))
+    project_url = Column(String(255), unique=True)  # ключ upsert при синхронизации с GitHub
     date_completed = Column(Date)
\ No newline at end of file
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends
 from .endpoints import (
     users, profiles, skills, projects, blog_posts, tags, post_tags, project_tags,
     messages, social_media, testimonials, telegram_subscribers, subscriber_preferences,
-    polls, education, work_experience, analytics, tasks, ml_predictions
+    polls, education, work_experience, analytics, tasks, ml_predictions, rag, exports
 )
 from app.auth import router as auth_router
 from app.auth import get_current_user
@@ -98,6 +98,18 @@ router.include_router(
     tags=["ml_predictions"],
     dependencies=[Depends(get_current_user)]
 )
+router.include_router(
+    exports.router,
+    prefix="/api",
+    tags=["export"],
+    dependencies=[Depends(get_current_user)]
+)
+router.include_router(
+    rag.router,
+    prefix="/api",
+    tags=["rag"],
+    dependencies=[Depends(get_current_user)]
+)
 
 # Подключение публичных роутеров без зависимостей
 router.include_router(messages.router, prefix="/api/messages", tags=["messages"])
@@ -32,7 +32,7 @@ CREATE TABLE projects (
     title VARCHAR(100) NOT NULL,
     description TEXT,
     image_url VARCHAR(255),
-    project_url VARCHAR(255),
+    project_url VARCHAR(255) UNIQUE,
     date_completed DATE
 );
 
@@ -152,7 +152,8 @@ CREATE TABLE mlpredictions (
     message_id INTEGER REFERENCES messages(id),
     input_text TEXT NOT NULL,
     prediction TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    timings JSONB
 );
 
 -- Индексы для оптимизации
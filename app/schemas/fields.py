@@ -0,0 +1,27 @@
+from functools import lru_cache
+from typing import List, Optional, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ConfigDict, create_model
+
+
+@lru_cache(maxsize=None)
+def partial_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """Облегчённая схема ответа для списков с fields=: те же поля, но все необязательные.
+
+    Используется вместе с response_model_exclude_unset=True, чтобы в ответ попадали
+    только выбранные колонки; без fields ответ совпадает с полной схемой.
+    """
+    fields = {name: (Optional[field.annotation], None) for name, field in model.model_fields.items()}
+    return create_model(f"Partial{model.__name__}", __config__=ConfigDict(from_attributes=True), **fields)
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[List[str]]:
+    """Разбирает fields=title,summary; разрешены только поля схемы ответа."""
+    if not fields:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return names or None
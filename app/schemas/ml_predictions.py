@@ -13,6 +13,7 @@ class MLPredictionResponse(BaseModel):
     input_text: str
     prediction: Optional[str]
     created_at: datetime.datetime
+    timings: Optional[dict] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
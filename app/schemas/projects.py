@@ -1,29 +1,32 @@
 from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date
 
 class ProjectCreate(BaseModel):
     user_id: int
     title: str
     description: Optional[str] = None
-    github_url: Optional[str] = None
-    live_url: Optional[str] = None
+    image_url: Optional[str] = None
+    project_url: Optional[str] = None
+    date_completed: Optional[date] = None
+    tag_ids: Optional[List[int]] = None  # Теги проекта; связи создаются в той же транзакции
 
 class ProjectUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
-    github_url: Optional[str] = None
-    live_url: Optional[str] = None
+    image_url: Optional[str] = None
+    project_url: Optional[str] = None
+    date_completed: Optional[date] = None
+    tag_ids: Optional[List[int]] = None  # Если передан — заменяет набор тегов проекта
 
 class ProjectResponse(BaseModel):
     id: int
     user_id: int
     title: str
     description: Optional[str] = None
-    github_url: Optional[str] = None
-    live_url: Optional[str] = None
-    created_at: datetime
-    updated_at: datetime
+    image_url: Optional[str] = None
+    project_url: Optional[str] = None
+    date_completed: Optional[date] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
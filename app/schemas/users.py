@@ -18,8 +18,8 @@ class UserUpdate(BaseModel):
         from_attributes = True
 
 class UserResponse(UserBase):
+    # Хэш пароля наружу не отдаём: по этой схеме проверяется и fields= в списке пользователей
     id: int
-    password_hash: str
 
     class Config:
         from_attributes = True
\ No newline at end of file
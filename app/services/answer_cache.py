@@ -0,0 +1,109 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticAnswerCache:
+    """LRU-кэш ответов с TTL, где ключом служит эмбеддинг вопроса.
+
+    Новый вопрос считается повтором, если косинусная близость его эмбеддинга
+    к одному из закэшированных не ниже threshold. Закреплённые (pinned) ответы —
+    прогретые FAQ — не истекают по TTL и не вытесняются, их сбрасывает только invalidate().
+
+    invalidate() увеличивает epoch. Ответ, посчитанный по старой базе знаний (эпоха
+    запомнена до ретривала и уже сменилась), put() молча отбрасывает.
+    """
+
+    def __init__(self, threshold: float = 0.92, ttl: int = 3600, max_size: int = 256):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_puts = 0
+        self.epoch = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _drop_expired(self) -> None:
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if not entry["pinned"] and now - entry["created_at"] > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        self.evictions += len(expired)
+
+    def get_exact(self, question: str) -> Optional[str]:
+        """Поиск по нормализованному тексту вопроса, без эмбеддинга."""
+        self._drop_expired()
+        entry = self._entries.get(question)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(question)
+        return entry["answer"]
+
+    def get(self, vector: List[float]) -> Optional[str]:
+        self._drop_expired()
+        keys = [key for key, entry in self._entries.items() if entry["vector"] is not None]
+        if not keys:
+            self.misses += 1
+            return None
+        matrix = np.stack([self._entries[key]["vector"] for key in keys])
+        scores = matrix @ self._normalize(vector)
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(keys[best])
+        logger.debug(f"Answer cache hit for '{keys[best]}' (similarity {scores[best]:.3f})")
+        return self._entries[keys[best]]["answer"]
+
+    def put(self, question: str, vector: Optional[List[float]], answer: str, pinned: bool = False,
+            epoch: Optional[int] = None) -> None:
+        if epoch is not None and epoch != self.epoch:
+            self.stale_puts += 1
+            logger.debug(f"Dropping answer for '{question}' computed before cache invalidation")
+            return
+        self._entries[question] = {
+            "vector": self._normalize(vector) if vector is not None else None,
+            "answer": answer,
+            "created_at": time.monotonic(),
+            "pinned": pinned
+        }
+        self._entries.move_to_end(question)
+        unpinned = [key for key, entry in self._entries.items() if not entry["pinned"]]
+        for key in unpinned[:max(0, len(self._entries) - self.max_size)]:
+            del self._entries[key]
+            self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Сбрасывает все ответы — вызывается при изменении базы знаний."""
+        self.epoch += 1
+        if self._entries:
+            logger.debug(f"Invalidating {len(self._entries)} cached answers")
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "pinned": sum(1 for entry in self._entries.values() if entry["pinned"]),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "stale_puts": self.stale_puts,
+            "hit_ratio": self.hits / total if total else 0.0
+        }
@@ -0,0 +1,74 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Set, Tuple
+
+from langchain.docstore.document import Document
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Инвертированный индекс BM25 в памяти поверх документов базы знаний.
+
+    Дополнительно хранит имена сущностей (названия проектов и постов, компании и т.п.)
+    из metadata["entities"], чтобы распознавать вопросы, явно их называющие.
+    """
+
+    def __init__(self, documents: List[Document], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.documents = documents
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths: List[int] = []
+        self.entities: Dict[str, Set[int]] = defaultdict(set)
+
+        for idx, doc in enumerate(documents):
+            tokens = tokenize(doc.page_content)
+            self.doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings[term].append((idx, tf))
+            for entity in doc.metadata.get("entities", []):
+                name = " ".join(tokenize(entity))
+                if len(name) >= 3:
+                    self.entities[name].add(idx)
+
+        self.avg_length = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.documents) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[Document, float]]:
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for idx, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[idx] / self.avg_length)
+                scores[idx] += idf * tf * (self.k1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.documents[idx], score) for idx, score in ranked]
+
+    def matched_entities(self, query: str) -> List[str]:
+        """Возвращает имена сущностей, которые целиком встречаются в вопросе."""
+        padded = f" {' '.join(tokenize(query))} "
+        return [name for name in self.entities if f" {name} " in padded]
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Document]], k: int = 60) -> List[Document]:
+    """Объединяет ранжированные списки документов методом RRF по doc_id."""
+    scores: Dict[str, float] = defaultdict(float)
+    documents: Dict[str, Document] = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results):
+            doc_id = doc.metadata.get("doc_id", doc.page_content)
+            scores[doc_id] += 1.0 / (k + rank + 1)
+            documents.setdefault(doc_id, doc)
+    return [documents[doc_id] for doc_id in sorted(scores, key=scores.get, reverse=True)]
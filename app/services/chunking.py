@@ -0,0 +1,81 @@
+import re
+from typing import List, Set
+
+from langchain.docstore.document import Document
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Грубая оценка числа токенов: ~4 символа на токен."""
+    return max(1, len(text) // 4)
+
+
+def split_documents(documents: List[Document], chunk_tokens: int, overlap_tokens: int) -> List[Document]:
+    """Режет длинные документы на перекрывающиеся чанки по границам слов.
+
+    Короткие документы проходят без изменений. У чанка doc_id вида
+    'blog_post:3#1', а в parent_id лежит doc_id исходного документа; первая
+    строка документа (заголовок) повторяется в каждом чанке, чтобы чанк был
+    понятен модели без соседей.
+    """
+    chunk_chars = chunk_tokens * 4
+    overlap_chars = min(overlap_tokens * 4, chunk_chars // 2)
+    result = []
+    for doc in documents:
+        doc_id = doc.metadata["doc_id"]
+        if estimate_tokens(doc.page_content) <= chunk_tokens:
+            result.append(Document(page_content=doc.page_content, metadata={**doc.metadata, "parent_id": doc_id}))
+            continue
+
+        header, _, body = doc.page_content.partition("\n")
+        start, index = 0, 0
+        while start < len(body):
+            end = min(len(body), start + chunk_chars)
+            if end < len(body):
+                # Не режем слово пополам: откатываемся к последнему пробелу в окне
+                space = body.rfind(" ", start + overlap_chars + 1, end)
+                if space != -1:
+                    end = space
+            result.append(Document(
+                page_content=f"{header}\n{body[start:end].strip()}",
+                metadata={**doc.metadata, "doc_id": f"{doc_id}#{index}", "parent_id": doc_id, "chunk": index}
+            ))
+            if end >= len(body):
+                break
+            start, index = end - overlap_chars, index + 1
+            # Перекрытие тоже начинаем с границы слова
+            space = body.find(" ", start, end)
+            if space != -1:
+                start = space + 1
+    return result
+
+
+def _shingles(text: str, size: int = 3) -> Set[tuple]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return {tuple(words)}
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def pack_context(documents: List[Document], token_budget: int, dedup_threshold: float = 0.8) -> List[Document]:
+    """Набирает контекст из документов в порядке релевантности в пределах бюджета токенов.
+
+    Почти дубликаты (сходство Жаккара по 3-словным шинглам не ниже dedup_threshold
+    с уже выбранным документом — например, одно и то же описание в проекте и в посте)
+    пропускаются. Документ, не влезающий в остаток бюджета, пропускается, но
+    более короткие документы за ним ещё могут попасть в контекст.
+    """
+    packed, packed_shingles = [], []
+    used = 0
+    for doc in documents:
+        tokens = estimate_tokens(doc.page_content)
+        if used + tokens > token_budget:
+            continue
+        shingles = _shingles(doc.page_content)
+        if any(len(shingles & other) / len(shingles | other) >= dedup_threshold for other in packed_shingles):
+            continue
+        packed.append(doc)
+        packed_shingles.append(shingles)
+        used += tokens
+    return packed
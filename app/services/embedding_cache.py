@@ -0,0 +1,147 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+class CachedEmbeddings(Embeddings):
+    """Обёртка над провайдером эмбеддингов с кэшем на диске.
+
+    Ключ кэша — sha256 от имени модели и текста документа. Векторы лежат в
+    memory-mapped матрице float32 (vectors.f32), а соответствие hash -> строка
+    хранится в index.json. В API уходят только новые или изменённые тексты.
+
+    У каждой модели свой подкаталог, а векторы другой размерности сбрасывают кэш,
+    чтобы строки не нарезались с неверной шириной. Дозапись идёт под файловой
+    блокировкой: API и бот делят один кэш и не затирают строки друг друга.
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    INDEX_FILE = "index.json"
+    LOCK_FILE = ".lock"
+
+    def __init__(self, embeddings: Embeddings, path: str, model_name: Optional[str] = None):
+        self.embeddings = embeddings
+        self.model_name = model_name or getattr(embeddings, "model", None) or type(embeddings).__name__
+        self.path = os.path.join(path, re.sub(r"[^\w.-]+", "_", self.model_name))
+        self.hits = 0
+        self.misses = 0
+        self._rows: Dict[str, int] = {}
+        self._dim: Optional[int] = None
+        self._matrix: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, self.VECTORS_FILE)
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.path, self.INDEX_FILE)
+
+    @contextmanager
+    def _file_lock(self):
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, self.LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_index(self) -> Optional[dict]:
+        if not os.path.exists(self._index_path) or not os.path.exists(self._vectors_path):
+            return None
+        with open(self._index_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _load(self) -> None:
+        try:
+            meta = self._read_index()
+            if meta is None:
+                return
+            self._dim = meta["dim"]
+            self._rows = meta["rows"]
+            self._open_matrix()
+            logger.debug(f"Loaded embedding cache with {len(self._rows)} vectors from {self.path}")
+        except Exception as e:
+            logger.error(f"Failed to load embedding cache from {self.path}: {str(e)}")
+            self._rows, self._dim, self._matrix = {}, None, None
+
+    def _open_matrix(self) -> None:
+        rows = os.path.getsize(self._vectors_path) // (self._dim * 4)
+        self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self._dim)) if rows else None
+
+    def _save_index(self) -> None:
+        tmp_path = f"{self._index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self._dim, "rows": self._rows}, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _reset(self) -> None:
+        for path in (self._vectors_path, self._index_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._rows, self._dim, self._matrix = {}, None, None
+
+    def _append(self, keys: List[str], vectors: List[List[float]]) -> None:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        with self._file_lock():
+            # Другой процесс мог дописать свои строки: перечитываем индекс под блокировкой
+            meta = self._read_index()
+            if meta is not None and meta["dim"] != matrix.shape[1]:
+                self._reset()
+            elif meta is not None:
+                self._rows = {**self._rows, **meta["rows"]} if meta["dim"] == self._dim else meta["rows"]
+                self._dim = meta["dim"]
+            if self._dim is None:
+                self._dim = matrix.shape[1]
+            row_bytes = self._dim * 4
+            # Строки считаем по размеру файла и отрезаем недописанный хвост после сбоя
+            start = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(start * row_bytes)
+                f.write(matrix.tobytes())
+            for offset, key in enumerate(keys):
+                self._rows[key] = start + offset
+            self._save_index()
+        self._open_matrix()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        with self._lock:
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in self._rows and key not in missing:
+                    missing[key] = text
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+            if missing:
+                logger.debug(f"Embedding cache miss for {len(missing)} of {len(texts)} documents")
+                vectors = self.embeddings.embed_documents(list(missing.values()))
+                if self._dim is not None and len(vectors[0]) != self._dim:
+                    # Модель стала отдавать другую размерность: старые строки уже не прочитать
+                    logger.warning(f"Embedding dimension changed from {self._dim} to {len(vectors[0])}, dropping cache at {self.path}")
+                    with self._file_lock():
+                        self._reset()
+                    missing = dict(zip(keys, texts))
+                    vectors = self.embeddings.embed_documents(list(missing.values()))
+                self._append(list(missing.keys()), vectors)
+            return [self._matrix[self._rows[key]].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
@@ -0,0 +1,73 @@
+import logging
+import math
+import re
+import zlib
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class LocalHashEmbeddings(Embeddings):
+    """Локальные эмбеддинги без сети: хэшированные n-граммы с TF-весами.
+
+    Слова и символьные n-граммы хэшируются (crc32) в вектор фиксированной
+    размерности со знаком, веса — сублинейный TF, результат L2-нормирован.
+    Эмбеддинг не зависит от корпуса, поэтому инкрементальное обновление
+    индекса не требует пересчёта старых векторов.
+    """
+
+    def __init__(self, dim: int = 512, ngram_range: tuple = (3, 5)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.model = f"local-hash-{dim}-{ngram_range[0]}-{ngram_range[1]}"
+
+    def _features(self, text: str) -> List[str]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        features = [f"w:{token}" for token in tokens]
+        low, high = self.ngram_range
+        for token in tokens:
+            padded = f" {token} "
+            for n in range(low, high + 1):
+                features.extend(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+        return features
+
+    def _embed(self, text: str) -> List[float]:
+        counts = {}
+        for feature in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            counts[h] = counts.get(h, 0) + 1
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for h, count in counts.items():
+            sign = 1.0 if h & 0x80000000 else -1.0
+            vector[h % self.dim] += sign * (1.0 + math.log(count))
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def get_embedding_provider() -> Embeddings:
+    """Возвращает провайдер эмбеддингов, выбранный в settings.RAG_EMBEDDING_PROVIDER."""
+    provider = settings.RAG_EMBEDDING_PROVIDER
+    if provider == "local":
+        return LocalHashEmbeddings(dim=settings.RAG_LOCAL_EMBEDDING_DIM)
+    if provider == "google":
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        return GoogleGenerativeAIEmbeddings(
+            model="models/embedding-001",
+            google_api_key=settings.GEMINI_API_KEY
+        )
+    raise ValueError(f"Unknown embedding provider: {provider}")
@@ -0,0 +1,110 @@
+import csv
+import datetime
+import decimal
+import io
+import json
+import zlib
+from typing import Any, AsyncIterator, List, Optional
+
+EXPORT_FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return str(value)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        # JSON-колонки (например, mlpredictions.timings) кладём в ячейку как JSON
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    return value
+
+
+class _CsvEncoder:
+    """Кодирует строки в CSV инкрементально: заголовок один раз, дальше только строки."""
+
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+        self.header_written = False
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _take(self) -> str:
+        text = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return text
+
+    def encode_header(self) -> str:
+        self.header_written = True
+        self._writer.writerow(self.columns)
+        return self._take()
+
+    def encode(self, row) -> str:
+        header = "" if self.header_written else self.encode_header()
+        self._writer.writerow([_csv_value(row.get(column)) for column in self.columns])
+        return header + self._take()
+
+
+async def encode_rows(
+    rows: AsyncIterator[Any],
+    fmt: str,
+    columns: List[str],
+    gzip: bool = False,
+    chunk_bytes: int = 65536
+) -> AsyncIterator[bytes]:
+    """Превращает асинхронный поток строк БД в поток байтов NDJSON или CSV.
+
+    Строки кодируются по одной и копятся в буфер до chunk_bytes, поэтому память
+    не зависит от размера таблицы. При gzip=True данные сжимаются потоково
+    (zlib с gzip-заголовком), клиент получает обычный .gz файл.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if gzip else None
+    csv_encoder = _CsvEncoder(columns) if fmt == "csv" else None
+    parts: List[bytes] = []
+    size = 0
+
+    def drain() -> Optional[bytes]:
+        nonlocal parts, size
+        data = b"".join(parts)
+        parts, size = [], 0
+        if compressor is not None:
+            data = compressor.compress(data)
+        return data or None
+
+    async for row in rows:
+        mapping = row._mapping if hasattr(row, "_mapping") else row
+        if csv_encoder is not None:
+            line = csv_encoder.encode(mapping)
+        else:
+            line = json.dumps({column: mapping.get(column) for column in columns}, ensure_ascii=False, default=_json_default) + "\n"
+        data = line.encode("utf-8")
+        parts.append(data)
+        size += len(data)
+        if size >= chunk_bytes:
+            chunk = drain()
+            if chunk:
+                yield chunk
+
+    if csv_encoder is not None and not csv_encoder.header_written:
+        # Пустая выборка: в CSV всё равно отдаём строку заголовков
+        parts.append(csv_encoder.encode_header().encode("utf-8"))
+    chunk = drain()
+    if chunk:
+        yield chunk
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def export_filename(name: str, fmt: str, gzip: bool, now: Optional[datetime.datetime] = None) -> str:
+    now = now or datetime.datetime.utcnow()
+    return f"{name}-{now:%Y%m%d-%H%M%S}.{fmt}" + (".gz" if gzip else "")
@@ -6,7 +6,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import logging
 from app.config import settings
-from app.models import Project, User
+from app.models import User
+from app.dao import ProjectDAO
+from app.dao.uow import transaction
 
 logger = logging.getLogger(__name__)
 
@@ -133,40 +135,26 @@ async def ensure_user_exists(session: AsyncSession, user_id: int, username: str)
         await session.flush()
         logger.info(f"Created user with id {user_id} and username {username}")
 
-async def upsert_project(session: AsyncSession, data: Dict) -> None:
-    """Обновляет или создаёт проект в БД."""
-    result = await session.execute(select(Project).filter_by(project_url=data["project_url"]))
-    project = result.scalars().first()
-    if project:
-        for key, value in data.items():
-            setattr(project, key, value)
-    else:
-        session.add(Project(**data))
-    await session.flush()
-
-async def sync_projects_with_github(session: AsyncSession) -> None:
-    """Синхронизирует проекты из GitHub с базой данных."""
+async def sync_projects_with_github(session: AsyncSession) -> Optional[Dict[str, int]]:
+    """Синхронизирует проекты из GitHub с базой данных одним upsert по project_url."""
     repos = await fetch_repos()
     if not repos:
         logger.warning("No repositories found to sync.")
-        return
-
-    await ensure_user_exists(session, FIXED_USER_ID, settings.GITHUB_USER)
+        return None
 
-    for repo in repos:
-        project_data = {
+    projects = [
+        {
             "user_id": FIXED_USER_ID,
             "title": repo["name"],
             "description": repo["description"] or "Крутой проект, но описания пока нет!",
             "image_url": None,
             "project_url": repo["html_url"],
-            "date_completed": datetime.strptime(repo["pushed_at"], "%Y-%m-%dT%H:%M:%SZ")
+            "date_completed": datetime.strptime(repo["pushed_at"], "%Y-%m-%dT%H:%M:%SZ").date()
         }
-        try:
-            await upsert_project(session, project_data)
-            logger.info(f"Synced project: {repo['name']}")
-        except Exception as e:
-            logger.error(f"Failed to sync project {repo['name']}: {str(e)}")
-            raise
-
-    logger.info("All projects synced successfully.")
\ No newline at end of file
+        for repo in repos
+    ]
+    async with transaction(session):
+        await ensure_user_exists(session, FIXED_USER_ID, settings.GITHUB_USER)
+        stats = await ProjectDAO.upsert_many(session, projects)
+    logger.info(f"Projects synced: {stats['inserted']} inserted, {stats['updated']} updated, {stats['unchanged']} unchanged.")
+    return stats
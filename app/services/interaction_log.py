@@ -0,0 +1,134 @@
+import asyncio
+import datetime
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Message, MLPrediction
+
+logger = logging.getLogger(__name__)
+
+
+class InteractionWriteBehind:
+    """Отложенная пакетная запись пар вопрос/ответ RAG в messages и mlpredictions.
+
+    log() только кладёт запись в буфер и не ждёт БД. Фоновая задача сбрасывает
+    буфер, когда в нём набралось batch_size записей или прошло flush_interval
+    секунд: две многострочные вставки в одной транзакции на весь пакет.
+    Пакет, который не удалось записать, возвращается в буфер, следующая попытка —
+    не раньше чем через flush_interval. Буфер ограничен max_pending записями: пока
+    БД недоступна, самые старые записи вытесняются и считаются в dropped.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.flushed = 0
+        self.failed = 0
+        self.dropped = 0
+        self._pending: List[Dict] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    def log(self, question: str, answer: str, **prediction_fields) -> None:
+        now = datetime.datetime.utcnow()
+        self._pending.append({
+            "message": {
+                "name": "RAG User",
+                "email": "bot@portfolio.com",
+                "message": question,
+                "source": "rag",
+                "date_sent": now
+            },
+            "prediction": {"input_text": question, "prediction": answer, "created_at": now, **prediction_fields}
+        })
+        self._trim()
+        if self._task is None:
+            self.start()
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _trim(self) -> None:
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped += overflow
+            logger.warning(f"Interaction log buffer is full, dropped {overflow} oldest records")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.debug("Interaction write-behind logger started")
+
+    async def stop(self) -> None:
+        """Останавливает фоновую задачу и дописывает всё, что осталось в буфере."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        logger.info("Interaction write-behind logger stopped")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if not await self.flush():
+                # БД недоступна: не повторяем на каждый новый вопрос
+                await asyncio.sleep(self.flush_interval)
+
+    async def flush(self) -> bool:
+        """Записывает буфер. False — запись не удалась, пакет снова в буфере."""
+        async with self._flush_lock:
+            if not self._pending:
+                return True
+            batch, self._pending = self._pending, []
+            try:
+                await self._write(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"Failed to flush {len(batch)} RAG interactions, will retry: {str(e)}")
+                self._pending = batch + self._pending
+                self._trim()
+                return False
+            self.flushed += len(batch)
+            logger.debug(f"Flushed {len(batch)} RAG interactions")
+            return True
+
+    async def _write(self, batch: List[Dict]) -> None:
+        async with SessionLocal() as db:
+            async with db.begin():
+                # sort_by_parameter_order: SQLAlchemy гарантирует, что id идут в порядке
+                # переданных строк, — иначе prediction мог бы попасть к чужому сообщению
+                result = await db.execute(
+                    insert(Message.__table__).returning(Message.id, sort_by_parameter_order=True),
+                    [item["message"] for item in batch]
+                )
+                message_ids = result.scalars().all()
+                await db.execute(
+                    insert(MLPrediction.__table__).values([
+                        {**item["prediction"], "message_id": message_id}
+                        for item, message_id in zip(batch, message_ids)
+                    ])
+                )
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": len(self._pending), "flushed": self.flushed, "failed": self.failed, "dropped": self.dropped}
+
+
+interaction_log = InteractionWriteBehind(
+    batch_size=settings.RAG_LOG_BATCH_SIZE,
+    flush_interval=settings.RAG_LOG_FLUSH_INTERVAL,
+    max_pending=settings.RAG_LOG_MAX_PENDING
+)
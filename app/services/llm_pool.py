@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBusyError(Exception):
+    """Все слоты LLM заняты и очередь переполнена (или ожидание истекло)."""
+
+
+class LLMDeadlineExceeded(Exception):
+    """LLM не ответила до дедлайна запроса."""
+
+
+class LLMPool:
+    """Ограничитель вызовов LLM с очередью ожидания и отказом при перегрузке.
+
+    Одновременно выполняется не больше max_concurrency вызовов, ещё не больше
+    max_queue ждут слота не дольше queue_timeout секунд; остальным сразу
+    отвечаем LLMBusyError. Место резервируется синхронно, до первого await,
+    поэтому пачка запросов, пришедших в одном тике цикла событий, не проскакивает
+    мимо лимита очереди.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+        self._active = 0
+        self._waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._active + self._waiting >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            logger.warning("LLM pool is saturated, rejecting request")
+            raise LLMBusyError("LLM pool queue is full")
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            logger.warning(f"LLM request waited more than {self.queue_timeout}s for a slot")
+            raise LLMBusyError("Timed out waiting for an LLM slot")
+        finally:
+            self._waiting -= 1
+        self._active += 1
+        try:
+            yield
+            self.completed += 1
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+    def has_free_slot(self) -> bool:
+        return self._active + self._waiting < self.max_concurrency
+
+    async def call(self, fn: Callable[[], Awaitable], deadline: float, hedge_delay: Optional[float] = None):
+        """Асинхронный вызов LLM с дедлайном и необязательным хеджированием.
+
+        Если за hedge_delay секунд ответа нет, параллельно уходит второй такой же
+        запрос (если есть свободный слот — под нагрузкой дубли только усугубят
+        очередь). Побеждает первый успешный ответ, остальные попытки отменяются.
+        Через deadline секунд все попытки отменяются и бросается LLMDeadlineExceeded.
+        """
+        loop = asyncio.get_event_loop()
+        expires_at = loop.time() + deadline
+        hedge_at = loop.time() + hedge_delay if hedge_delay is not None else None
+
+        async def attempt():
+            async with self.slot():
+                return await fn()
+
+        primary = asyncio.create_task(attempt())
+        pending = {primary}
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                now = loop.time()
+                if now >= expires_at:
+                    self.deadline_exceeded += 1
+                    raise LLMDeadlineExceeded(f"No LLM response within {deadline}s")
+                timeout = expires_at - now
+                if hedge_at is not None:
+                    timeout = min(timeout, max(0.0, hedge_at - now))
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    last_error = task.exception()
+                if hedge_at is not None and loop.time() >= hedge_at:
+                    hedge_at = None
+                    if pending and self.has_free_slot():
+                        logger.debug("LLM request is slow, sending a hedged duplicate")
+                        self.hedged += 1
+                        pending.add(asyncio.create_task(attempt()))
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def stream(self, fn: Callable[[], AsyncIterator[str]], deadline: Optional[float] = None) -> AsyncIterator[str]:
+        """Держит слот на всё время потоковой генерации.
+
+        deadline ограничивает ожидание первого чанка: начатый ответ пользователь уже
+        видит, поэтому дальше поток не обрывается.
+        """
+        async with self.slot():
+            chunks = fn().__aiter__()
+            if deadline is not None:
+                try:
+                    first = await asyncio.wait_for(chunks.__anext__(), timeout=deadline)
+                except asyncio.TimeoutError:
+                    self.deadline_exceeded += 1
+                    raise LLMDeadlineExceeded(f"No LLM output within {deadline}s")
+                except StopAsyncIteration:
+                    return
+                yield first
+            async for chunk in chunks:
+                yield chunk
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "waiting": self._waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "deadline_exceeded": self.deadline_exceeded
+        }
+
+
+llm_pool = LLMPool(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.LLM_MAX_QUEUE,
+    queue_timeout=settings.LLM_QUEUE_TIMEOUT
+)
@@ -0,0 +1,90 @@
+import math
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+# Тайминги текущего запроса: заполняются всеми span'ами внутри collect()
+_current_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("rag_timings", default=None)
+
+
+class LatencyHistogram:
+    """Скользящее окно последних замеров латентности с перцентилями."""
+
+    def __init__(self, max_samples: int = 2048):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        self.samples.append(ms)
+        self.count += 1
+        self.total_ms += ms
+
+    def _percentile(self, ordered: list, q: float) -> float:
+        # Nearest-rank: ceil(q * n); round() до 9 знаков убирает шум float вроде 0.07 * 100 = 7.000000000000001
+        index = min(len(ordered) - 1, max(0, math.ceil(round(q * len(ordered), 9)) - 1))
+        return round(ordered[index], 2)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        return self._percentile(sorted(self.samples), q)
+
+    def snapshot(self) -> Dict[str, float]:
+        if not self.samples:
+            return {"count": 0}
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2),
+            "p50_ms": self._percentile(ordered, 0.50),
+            "p95_ms": self._percentile(ordered, 0.95),
+            "p99_ms": self._percentile(ordered, 0.99),
+            "max_ms": round(ordered[-1], 2)
+        }
+
+
+class StageMetrics:
+    """Гистограммы латентности по стадиям пайплайна RAG."""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+
+    def record(self, name: str, ms: float) -> None:
+        self.histograms[name].record(ms)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings[name] = round(timings.get(name, 0.0) + ms, 2)
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    @contextmanager
+    def collect(self):
+        """Собирает тайминги всех стадий внутри блока в отдельный словарь (для записи в БД)."""
+        timings: Dict[str, float] = {}
+        token = _current_timings.set(timings)
+        try:
+            yield timings
+        finally:
+            _current_timings.reset(token)
+
+    def percentile(self, name: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """Перцентиль стадии в мс или None, если замеров меньше min_samples."""
+        histogram = self.histograms.get(name)
+        if histogram is None or len(histogram.samples) < min_samples:
+            return None
+        return histogram.percentile(q)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {name: histogram.snapshot() for name, histogram in sorted(self.histograms.items())}
+
+
+stage_metrics = StageMetrics()
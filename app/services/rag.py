@@ -1,18 +1,35 @@
-import datetime
 import asyncio
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.dao.models_dao import ProjectDAO, SkillDAO, WorkExperienceDAO, EducationDAO, BlogPostDAO, TestimonialDAO, SocialMediaDAO, ProfileDAO, ProjectTagDAO, MessageDAO, MLPredictionDAO
+from sqlalchemy import String, func, literal, literal_column, select, union_all
+from sqlalchemy.dialects.postgresql import JSONB
+from app.models import Project, Skill, WorkExperience, Education, BlogPost, Testimonial, SocialMedia, Profile, ProjectTag, Tag
 from langchain_community.vectorstores import FAISS
 from langchain.docstore.document import Document
 from langchain.prompts import PromptTemplate
 from google import genai
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from app.config import settings
+from app.database import SessionLocal
 import logging
 import re
 import aiohttp
-from typing import List
-from app.database import get_db
+from typing import AsyncIterator, Dict, List, Optional, Set
+from app.services.embedding_cache import CachedEmbeddings
+from app.services.embeddings import get_embedding_provider
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.bm25 import BM25Index, reciprocal_rank_fusion
+from app.services.single_flight import SingleFlight
+from app.services.llm_pool import LLMBusyError, LLMDeadlineExceeded, llm_pool
+from app.services.interaction_log import interaction_log
+from app.services.chunking import pack_context, split_documents
+from app.services.metrics import stage_metrics
+from app.services.vector_store import NumpyVectorStore
 
 logger = logging.getLogger(__name__)
 
@@ -22,135 +39,615 @@ def escape_markdown_v2(text: str) -> str:
     text = re.sub(reserved_chars, r'\\\g<1>', text)
     text = re.sub(r'([\\]{2,})', r'\\', text)
     text = text.replace('\n', '\n\n')
-    return text[:500]
+    text = text[:500]
+    if text.endswith('\\'):
+        text = text[:-1]  # Обрезка не должна оставлять висящий слеш от разорванной escape-последовательности
+    return text
 
-async def load_knowledge_base(db: AsyncSession) -> List[Document]:
+def _make_document(source: str, source_id: int, content: str, entities: Optional[List[str]] = None) -> Document:
+    """Создаёт документ базы знаний со стабильным doc_id вида 'project:12'.
+
+    entities — собственные имена документа (название проекта или поста, компания, вуз),
+    по которым вопрос идёт лексическим fast path. Теги и навыки сюда не входят: это
+    общие слова («python», «docker»), и по ним вопрос про содержание терял бы векторный поиск.
+    """
+    return Document(
+        page_content=content,
+        metadata={
+            "doc_id": f"{source}:{source_id}",
+            "source": source,
+            "source_id": source_id,
+            "entities": [entity for entity in entities or [] if entity]
+        }
+    )
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def _get_embeddings() -> CachedEmbeddings:
+    return CachedEmbeddings(get_embedding_provider(), settings.RAG_EMBEDDING_CACHE_PATH)
+
+class RAGIndex:
+    """Долгоживущий векторный индекс базы знаний, сохраняемый на диск.
+
+    Индекс загружается один раз при старте и досинхронизируется инкрементально:
+    эмбеддинги пересчитываются только для новых и изменившихся документов.
+    Хранилище — FAISS или NumpyVectorStore, выбирается настройкой RAG_VECTOR_STORE.
+
+    Ни FAISS, ни NumpyVectorStore не допускают чтения во время записи, поэтому поиск
+    и изменение хранилища (в потоках executor) идут под _store_lock; эмбеддинги новых
+    документов считаются до захвата блокировки. На диске каждая версия индекса пишется
+    в свой каталог, а файл CURRENT атомарно переключается на неё: API и бот, сохраняющие
+    один RAG_INDEX_PATH, не видят наполовину записанный индекс. Вместе с векторами
+    сохраняются сами документы: после load() BM25 и частичные обновления работают
+    без полного перечитывания базы.
+    """
+
+    HASHES_FILE = "doc_hashes.json"
+    DOCUMENTS_FILE = "kb_documents.json"
+    CURRENT_FILE = "CURRENT"
+    KEEP_VERSIONS = 2
+
+    def __init__(self, path: str, embeddings=None, store: Optional[str] = None, quantize: Optional[bool] = None,
+                 query_cache_size: Optional[int] = None):
+        self.path = path
+        self.store = store or settings.RAG_VECTOR_STORE
+        self.quantize = settings.RAG_VECTOR_QUANTIZE if quantize is None else quantize
+        self.vector_store = None
+        self.doc_hashes: Dict[str, str] = {}
+        self.documents: Dict[str, Document] = {}
+        self.bm25 = BM25Index([])
+        self._embeddings = embeddings
+        self._lock = asyncio.Lock()
+        self._store_lock = threading.Lock()
+        # LRU нормализованный вопрос -> эмбеддинг: повторные вопросы не ходят в API эмбеддингов
+        self.query_cache_size = settings.RAG_QUERY_EMBEDDING_CACHE_SIZE if query_cache_size is None else query_cache_size
+        self.query_cache_hits = 0
+        self.query_cache_misses = 0
+        self._query_vectors: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            self._embeddings = _get_embeddings()
+        return self._embeddings
+
+    @property
+    def embedding_model(self) -> str:
+        embeddings = self.embeddings
+        return getattr(embeddings, "model_name", None) or getattr(embeddings, "model", None) or type(embeddings).__name__
+
+    @property
+    def store_kind(self) -> str:
+        if self.store == "numpy" and self.quantize:
+            return "numpy-int8"
+        return self.store
+
+    def _create_store(self, documents: List[Document]):
+        ids = [doc.metadata["doc_id"] for doc in documents]
+        if self.store == "numpy":
+            return NumpyVectorStore.from_documents(documents, self.embeddings, ids=ids, quantize=self.quantize)
+        return FAISS.from_documents(documents, self.embeddings, ids=ids)
+
+    @property
+    def is_ready(self) -> bool:
+        return self.vector_store is not None
+
+    def _current_dir(self) -> Optional[str]:
+        """Каталог актуальной версии индекса или None, если индекс ещё не сохранялся."""
+        pointer = os.path.join(self.path, self.CURRENT_FILE)
+        if os.path.exists(pointer):
+            with open(pointer, encoding="utf-8") as f:
+                return os.path.join(self.path, f.read().strip())
+        # Индекс, сохранённый до появления версий, лежит прямо в каталоге
+        if os.path.exists(os.path.join(self.path, self.HASHES_FILE)):
+            return self.path
+        return None
+
+    def load(self) -> bool:
+        """Загружает индекс с диска. Возвращает False, если сохранённого индекса нет."""
+        directory = self._current_dir()
+        if directory is None:
+            logger.debug(f"No saved RAG index at {self.path}")
+            return False
+        hashes_path = os.path.join(directory, self.HASHES_FILE)
+        try:
+            with open(hashes_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("embedding_model") != self.embedding_model:
+                logger.info(f"RAG index at {self.path} was built with {meta.get('embedding_model')}, rebuilding")
+                return False
+            if meta.get("vector_store", "faiss") != self.store_kind:
+                logger.info(f"RAG index at {self.path} uses {meta.get('vector_store', 'faiss')} store, rebuilding as {self.store_kind}")
+                return False
+            store_class = NumpyVectorStore if self.store == "numpy" else FAISS
+            vector_store = store_class.load_local(
+                directory, self.embeddings, allow_dangerous_deserialization=True
+            )
+            documents = []
+            documents_path = os.path.join(directory, self.DOCUMENTS_FILE)
+            if os.path.exists(documents_path):
+                with open(documents_path, encoding="utf-8") as f:
+                    documents = [Document(page_content=doc["page_content"], metadata=doc["metadata"]) for doc in json.load(f)]
+            with self._store_lock:
+                self.vector_store = vector_store
+            self.doc_hashes = meta["doc_hashes"]
+            self.documents = {doc.metadata["doc_id"]: doc for doc in documents}
+            self.bm25 = BM25Index(documents)
+            logger.info(f"Loaded RAG index with {len(self.doc_hashes)} documents from {self.path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to load RAG index from {self.path}: {str(e)}")
+            self.vector_store = None
+            self.doc_hashes = {}
+            return False
+
+    def save(self) -> None:
+        if self.vector_store is None:
+            return
+        version = f"v{time.time_ns()}-{os.getpid()}"
+        directory = os.path.join(self.path, version)
+        with self._store_lock:
+            self.vector_store.save_local(directory)
+        with open(os.path.join(directory, self.HASHES_FILE), "w", encoding="utf-8") as f:
+            json.dump({"embedding_model": self.embedding_model, "vector_store": self.store_kind, "doc_hashes": self.doc_hashes}, f)
+        with open(os.path.join(directory, self.DOCUMENTS_FILE), "w", encoding="utf-8") as f:
+            json.dump([{"page_content": doc.page_content, "metadata": doc.metadata} for doc in self.documents.values()], f, ensure_ascii=False)
+        pointer_tmp = os.path.join(self.path, f"{self.CURRENT_FILE}.{version}.tmp")
+        with open(pointer_tmp, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(pointer_tmp, os.path.join(self.path, self.CURRENT_FILE))
+        self._remove_old_versions(version)
+
+    def _remove_old_versions(self, current: str) -> None:
+        # Предыдущую версию оставляем: другой процесс может как раз её загружать
+        versions = sorted(name for name in os.listdir(self.path) if name.startswith("v") and os.path.isdir(os.path.join(self.path, name)))
+        for name in versions[:-self.KEEP_VERSIONS]:
+            if name != current:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def _apply_changes(self, documents: List[Document], partial: bool = False, touched: Optional[Set[str]] = None) -> Dict[str, int]:
+        incoming = {doc.metadata["doc_id"]: doc for doc in documents}
+        if partial:
+            # Частичное обновление: пришли только изменившиеся документы, остальные остаются как есть.
+            # Старые чанки обновлённых документов выкидываем: их число могло уменьшиться.
+            # touched — документы, которые перечитывались из БД: отсутствующие среди пришедших удалены
+            parents = {doc.metadata["parent_id"] for doc in documents} | (touched or set())
+            kept = {doc_id: doc for doc_id, doc in self.documents.items() if doc.metadata["parent_id"] not in parents}
+            incoming = {**kept, **incoming}
+            documents = list(incoming.values())
+        self.documents = incoming
+        # Лексический индекс дешёвый, поэтому всегда перестраивается целиком
+        self.bm25 = BM25Index(documents)
+        new_hashes = {doc.metadata["doc_id"]: _content_hash(doc.page_content) for doc in documents}
+        removed = [doc_id for doc_id in self.doc_hashes if doc_id not in new_hashes]
+        changed = [doc for doc in documents if self.doc_hashes.get(doc.metadata["doc_id"]) != new_hashes[doc.metadata["doc_id"]]]
+        stale = removed + [doc.metadata["doc_id"] for doc in changed if doc.metadata["doc_id"] in self.doc_hashes]
+
+        if not stale and not changed and self.vector_store is not None:
+            return {"added": 0, "removed": 0}
+
+        if self.vector_store is None:
+            if not documents:
+                return {"added": 0, "removed": 0}
+            # Новое хранилище строится в стороне и подменяется одной операцией
+            vector_store = self._create_store(documents)
+            with self._store_lock:
+                self.vector_store = vector_store
+            changed, stale = documents, []
+        else:
+            vectors = self.embeddings.embed_documents([doc.page_content for doc in changed]) if changed else []
+            with self._store_lock:
+                if stale:
+                    self.vector_store.delete(stale)
+                if changed:
+                    self.vector_store.add_embeddings(
+                        zip([doc.page_content for doc in changed], vectors),
+                        metadatas=[doc.metadata for doc in changed],
+                        ids=[doc.metadata["doc_id"] for doc in changed]
+                    )
+
+        self.doc_hashes = new_hashes
+        self.save()
+        return {"added": len(changed), "removed": len(removed)}
+
+    async def refresh(self, documents: List[Document], partial: bool = False, touched: Optional[Set[str]] = None) -> Dict[str, int]:
+        """Приводит индекс в соответствие с переданным набором документов.
+
+        При partial=True документы считаются дельтой: отсутствующие в ней не удаляются,
+        кроме перечисленных в touched (их перечитали из БД и не нашли).
+        """
+        async with self._lock:
+            with stage_metrics.span("index.refresh"):
+                stats = await asyncio.get_event_loop().run_in_executor(None, self._apply_changes, documents, partial, touched)
+        logger.info(f"RAG index refreshed: {stats['added']} embedded, {stats['removed']} removed")
+        return stats
+
+    async def embed_query(self, question: str) -> List[float]:
+        key = normalize_question(question)
+        vector = self._query_vectors.get(key)
+        if vector is not None:
+            self.query_cache_hits += 1
+            self._query_vectors.move_to_end(key)
+            return vector
+        self.query_cache_misses += 1
+        vector = await asyncio.get_event_loop().run_in_executor(
+            None, self.embeddings.embed_query, question
+        )
+        if self.query_cache_size > 0:
+            self._query_vectors[key] = vector
+            while len(self._query_vectors) > self.query_cache_size:
+                self._query_vectors.popitem(last=False)
+        return vector
+
+    def query_cache_stats(self) -> Dict[str, float]:
+        total = self.query_cache_hits + self.query_cache_misses
+        return {
+            "size": len(self._query_vectors),
+            "hits": self.query_cache_hits,
+            "misses": self.query_cache_misses,
+            "hit_ratio": self.query_cache_hits / total if total else 0.0
+        }
+
+    def search_by_vector_sync(self, vector: List[float], k: int = 5) -> List[Document]:
+        with self._store_lock:
+            if self.vector_store is None:
+                return []
+            if settings.RAG_USE_MMR:
+                return self.vector_store.max_marginal_relevance_search_by_vector(vector, k=k, fetch_k=k * 4)
+            return self.vector_store.similarity_search_by_vector(vector, k=k)
+
+    async def search_by_vector(self, vector: List[float], k: int = 5) -> List[Document]:
+        if self.vector_store is None:
+            return []
+        return await asyncio.get_event_loop().run_in_executor(None, self.search_by_vector_sync, vector, k)
+
+    async def search(self, question: str, k: int = 5) -> List[Document]:
+        return await self.search_by_vector(await self.embed_query(question), k=k)
+
+    def lexical_search(self, question: str, k: int = 5) -> List[Document]:
+        return [doc for doc, _ in self.bm25.search(question, k=k)]
+
+    async def hybrid_search(self, question: str, vector: Optional[List[float]], k: int = 5) -> List[Document]:
+        """BM25 + векторный поиск, объединённые через reciprocal rank fusion.
+
+        Без вектора (вопрос явно называет сущность) используется только BM25.
+        """
+        lexical_docs = self.lexical_search(question, k=k)
+        if vector is None:
+            return lexical_docs
+        vector_docs = await self.search_by_vector(vector, k=k)
+        return reciprocal_rank_fusion([vector_docs, lexical_docs])[:k]
+
+rag_index = RAGIndex(settings.RAG_INDEX_PATH)
+answer_cache = SemanticAnswerCache(
+    threshold=settings.RAG_ANSWER_CACHE_THRESHOLD,
+    ttl=settings.RAG_ANSWER_CACHE_TTL,
+    max_size=settings.RAG_ANSWER_CACHE_SIZE
+)
+single_flight = SingleFlight()
+_llm_client = None
+
+def get_llm_client():
+    """Клиент Gemini создаётся один раз и переиспользуется между запросами."""
+    global _llm_client
+    if _llm_client is None:
+        logger.debug("Initializing LLM...")
+        http_options = genai.types.HttpOptions(base_url=settings.GEMINI_BASE_URL) if settings.GEMINI_BASE_URL else None
+        _llm_client = genai.Client(api_key=settings.GEMINI_API_KEY, http_options=http_options)
+    return _llm_client
+
+def set_llm_client(client) -> None:
+    """Подменяет клиент LLM (например, заглушкой в бенчмарке)."""
+    global _llm_client
+    _llm_client = client
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.lower().split())
+
+async def refresh_rag_index(db: AsyncSession, doc_ids: Optional[Set[str]] = None) -> Dict[str, int]:
+    """Перечитывает базу знаний и досинхронизирует индекс.
+
+    С doc_ids (вида 'project:12') перечитываются только эти документы; те, что не нашлись
+    в БД, удаляются из индекса.
+    """
+    if doc_ids is not None and not rag_index.documents:
+        # Документы в памяти неизвестны (индекс старого формата или пустой) — частичное обновление
+        # сочло бы все остальные документы удалёнными, поэтому перечитываем базу целиком
+        doc_ids = None
+    ids = _ids_by_source(doc_ids) if doc_ids is not None else None
+    documents = await load_knowledge_base(db, ids=ids)
+    with stage_metrics.span("kb.chunk"):
+        documents = split_documents(documents, settings.RAG_CHUNK_TOKENS, settings.RAG_CHUNK_OVERLAP_TOKENS)
+    stats = await rag_index.refresh(documents, partial=doc_ids is not None, touched=doc_ids)
+    if stats["added"] or stats["removed"]:
+        answer_cache.invalidate()
+        # Прогретые ответы FAQ сброшены вместе с кэшем — греем заново по новой базе знаний
+        schedule_faq_warm_up()
+    return stats
+
+def get_rag_stats() -> Dict[str, Dict]:
+    return {
+        "answer_cache": answer_cache.stats(),
+        "query_embeddings": rag_index.query_cache_stats(),
+        "single_flight": single_flight.stats(),
+        "llm_pool": llm_pool.stats(),
+        "interaction_log": interaction_log.stats()
+    }
+
+def get_rag_metrics() -> Dict[str, Dict[str, float]]:
+    return stage_metrics.snapshot()
+
+async def init_rag_index(db: AsyncSession) -> None:
+    """Загружает индекс с диска и догоняет его до текущего состояния БД."""
+    await asyncio.get_event_loop().run_in_executor(None, rag_index.load)
+    await refresh_rag_index(db)
+
+KNOWLEDGE_SOURCES = {
+    "project": Project,
+    "skill": Skill,
+    "work_experience": WorkExperience,
+    "education": Education,
+    "blog_post": BlogPost,
+    "testimonial": Testimonial,
+    "social_media": SocialMedia,
+    "profile": Profile,
+}
+
+def _ids_by_source(doc_ids: Set[str]) -> Dict[str, Set[int]]:
+    ids: Dict[str, Set[int]] = {}
+    for doc_id in doc_ids:
+        source, _, source_id = doc_id.partition(":")
+        ids.setdefault(source, set()).add(int(source_id))
+    return ids
+
+async def fetch_knowledge_rows(db: AsyncSession, ids: Optional[Dict[str, Set[int]]] = None) -> Dict[str, List[dict]]:
+    """Загружает все таблицы базы знаний одним UNION ALL-запросом.
+
+    Каждая строка приходит как JSONB (to_jsonb), теги проектов — отдельной веткой объединения.
+    С ids ({'project': {1, 2}}) читаются только перечисленные строки перечисленных таблиц.
+    """
+    rows: Dict[str, List[dict]] = {source: [] for source in [*KNOWLEDGE_SOURCES, "project_tag"]}
+    parts = []
+    for source, model in KNOWLEDGE_SOURCES.items():
+        table = model.__table__
+        if ids is not None and source not in ids:
+            continue
+        query = select(
+            literal(source, type_=String).label("source"),
+            func.to_jsonb(literal_column(table.name), type_=JSONB).label("data")
+        ).select_from(table)
+        if ids is not None:
+            query = query.where(table.c.id.in_(ids[source]))
+        parts.append(query)
+    if ids is None or "project" in ids:
+        tags_query = select(
+            literal("project_tag", type_=String).label("source"),
+            func.jsonb_build_object("project_id", ProjectTag.project_id, "tag_name", Tag.tag_name, type_=JSONB).label("data")
+        ).select_from(ProjectTag.__table__.join(Tag.__table__, ProjectTag.tag_id == Tag.id))
+        if ids is not None:
+            tags_query = tags_query.where(ProjectTag.project_id.in_(ids["project"]))
+        parts.append(tags_query)
+    if not parts:
+        return rows
+    result = await db.execute(union_all(*parts))
+    for source, data in result:
+        rows[source].append(data)
+    return rows
+
+def build_documents(rows: Dict[str, List[dict]]) -> List[Document]:
+    """Собирает документы базы знаний из строк fetch_knowledge_rows."""
+    tags_by_project: Dict[int, List[str]] = {}
+    for tag in rows["project_tag"]:
+        tags_by_project.setdefault(tag["project_id"], []).append(tag["tag_name"])
+
+    documents = []
+    for project in rows["project"]:
+        tags = tags_by_project.get(project['id'], [])
+        documents.append(_make_document("project", project['id'], (
+            f"Project: {project['title']}\n"
+            f"Description: {project['description'] or 'No description'}\n"
+            f"URL: {project['project_url'] or 'No URL'}\n"
+            f"Completed: {project['date_completed'] or 'Not completed'}\n"
+            f"Tags: {', '.join(tags) if tags else 'No tags'}"
+        ), entities=[project['title']]))
+
+    for skill in rows["skill"]:
+        documents.append(_make_document("skill", skill['id'], (
+            f"Skill: {skill['skill_name']}\n"
+            f"Description: {skill['description'] or 'No description'}\n"
+            f"Proficiency: {skill['proficiency_level'] or 'Not specified'}"
+        )))
+
+    for experience in rows["work_experience"]:
+        documents.append(_make_document("work_experience", experience['id'], (
+            f"Work Experience: {experience['position']} at {experience['company']}\n"
+            f"Description: {experience['description'] or 'No description'}\n"
+            f"Period: {experience['start_date']} to {experience['end_date'] or 'Present'}"
+        ), entities=[experience['company']]))
+
+    for education in rows["education"]:
+        documents.append(_make_document("education", education['id'], (
+            f"Education: {education['degree'] or 'No degree'} in {education['field_of_study'] or 'No field'}\n"
+            f"Institution: {education['institution'] or 'No institution'}\n"
+            f"Period: {education['start_date']} to {education['end_date'] or 'Present'}"
+        ), entities=[education['institution']]))
+
+    for blogpost in rows["blog_post"]:
+        documents.append(_make_document("blog_post", blogpost['id'], (
+            f"Blog Post: {blogpost['title']}\n"
+            f"Content: {blogpost['content'] or 'No content'}\n"
+            f"Summary: {blogpost['summary'] or 'No summary'}"
+        ), entities=[blogpost['title']]))
+
+    for testimonial in rows["testimonial"]:
+        documents.append(_make_document("testimonial", testimonial['id'], (
+            f"Testimonial: {testimonial['quote']}\n"
+            f"Author: {testimonial['author']}\n"
+            f"Date: {testimonial['date'] or 'No date'}"
+        ), entities=[testimonial['author']]))
+
+    for social in rows["social_media"]:
+        documents.append(_make_document("social_media", social['id'], (
+            f"Social Media: {social['platform_name']}\n"
+            f"Profile URL: {social['profile_url']}"
+        ), entities=[social['platform_name']]))
+
+    for profile in rows["profile"]:
+        documents.append(_make_document("profile", profile['id'], (
+            f"Profile: {profile['name']}\n"
+            f"Bio: {profile['bio'] or 'No bio'}\n"
+            f"Email: {profile['email'] or 'No email'}\n"
+            f"Phone: {profile['phone'] or 'No phone'}\n"
+            f"Address: {profile['address'] or 'No address'}\n"
+            f"Resume URL: {profile['resume_url'] or 'No resume'}"
+        ), entities=[profile['name']]))
+
+    return documents
+
+async def load_knowledge_base(db: AsyncSession, ids: Optional[Dict[str, Set[int]]] = None) -> List[Document]:
     logger.debug("Loading knowledge base...")
     try:
-        projects = await ProjectDAO.get_all(db)
-        skills = await SkillDAO.get_all(db)
-        work_experiences = await WorkExperienceDAO.get_all(db)
-        educations = await EducationDAO.get_all(db)
-        blogposts = await BlogPostDAO.get_all(db)
-        testimonials = await TestimonialDAO.get_all(db)
-        social_medias = await SocialMediaDAO.get_all(db)
-        profiles = await ProfileDAO.get_all(db)
-        project_tags = await ProjectTagDAO.get_all_with_tags(db)
-
-        logger.debug(f"Loaded {len(projects)} projects, {len(skills)} skills, {len(work_experiences)} experiences")
-
-        documents = []
-        for project in projects:
-            tags = [tag.tag_name for tag in project_tags if tag.project_id == project.id]
-            documents.append(Document(page_content=(
-                f"Project: {project.title}\n"
-                f"Description: {project.description or 'No description'}\n"
-                f"URL: {project.project_url or 'No URL'}\n"
-                f"Completed: {project.date_completed or 'Not completed'}\n"
-                f"Tags: {', '.join(tags) if tags else 'No tags'}"
-            )))
-
-        for skill in skills:
-            documents.append(Document(page_content=(
-                f"Skill: {skill.skill_name}\n"
-                f"Description: {skill.description or 'No description'}\n"
-                f"Proficiency: {skill.proficiency_level or 'Not specified'}"
-            )))
-
-        for experience in work_experiences:
-            documents.append(Document(page_content=(
-                f"Work Experience: {experience.position} at {experience.company}\n"
-                f"Description: {experience.description or 'No description'}\n"
-                f"Period: {experience.start_date} to {experience.end_date or 'Present'}"
-            )))
-
-        for education in educations:
-            documents.append(Document(page_content=(
-                f"Education: {education.degree or 'No degree'} in {education.field_of_study or 'No field'}\n"
-                f"Institution: {education.institution or 'No institution'}\n"
-                f"Period: {education.start_date} to {education.end_date or 'Present'}"
-            )))
-
-        for blogpost in blogposts:
-            documents.append(Document(page_content=(
-                f"Blog Post: {blogpost.title}\n"
-                f"Content: {blogpost.content or 'No content'}\n"
-                f"Summary: {blogpost.summary or 'No summary'}"
-            )))
-
-        for testimonial in testimonials:
-            documents.append(Document(page_content=(
-                f"Testimonial: {testimonial.quote}\n"
-                f"Author: {testimonial.author}\n"
-                f"Date: {testimonial.date or 'No date'}"
-            )))
-
-        for social in social_medias:
-            documents.append(Document(page_content=(
-                f"Social Media: {social.platform_name}\n"
-                f"Profile URL: {social.profile_url}"
-            )))
-
-        for profile in profiles:
-            documents.append(Document(page_content=(
-                f"Profile: {profile.name}\n"
-                f"Bio: {profile.bio or 'No bio'}\n"
-                f"Email: {profile.email or 'No email'}\n"
-                f"Phone: {profile.phone or 'No phone'}\n"
-                f"Address: {profile.address or 'No address'}\n"
-                f"Resume URL: {profile.resume_url or 'No resume'}"
-            )))
-
+        with stage_metrics.span("kb.fetch"):
+            rows = await fetch_knowledge_rows(db, ids=ids)
+        logger.debug(f"Loaded {len(rows['project'])} projects, {len(rows['skill'])} skills, {len(rows['work_experience'])} experiences")
+        with stage_metrics.span("kb.build"):
+            documents = build_documents(rows)
         logger.debug(f"Created {len(documents)} documents")
         return documents
     except Exception as e:
         logger.error(f"Error loading knowledge base: {str(e)}")
         raise
 
+RAG_PROMPT_TEMPLATE = "Ты ассистент для портфолио IT-специалиста. Отвечай профессионально, но доступно, без сленга. Максимум 7000 символов. Используй эмодзи (🔥🚀💻) для акцента. Контекст: {context}\n\nВопрос: {question}\n\nОтвет:"
+EMPTY_ANSWER_FALLBACK = "Баги? Это фичи! 😎 Но ответа пока нет, залетай позже! 🚀"
+ERROR_FALLBACK = "Баги? Это фичи! 😎 Но что-то пошло не так, залетай позже! 🚀"
+BUSY_FALLBACK = "Сейчас слишком много вопросов, я не успеваю! ⏳ Попробуй через минутку 🚀"
+RETRIEVAL_FALLBACK_HEADER = "Ответ готовится дольше обычного ⏳ Вот что нашлось в портфолио по твоему вопросу:"
+RETRIEVAL_FALLBACK_DOCS = 3
+RETRIEVAL_FALLBACK_SNIPPET = 300
+
+def _retrieval_fallback(context_docs: List[Document]) -> str:
+    """Быстрый ответ без LLM: заголовки и начало самых релевантных документов."""
+    if not context_docs:
+        return ERROR_FALLBACK
+    parts = [RETRIEVAL_FALLBACK_HEADER]
+    for doc in context_docs[:RETRIEVAL_FALLBACK_DOCS]:
+        header, _, body = doc.page_content.partition("\n")
+        body = " ".join(body.split())
+        if len(body) > RETRIEVAL_FALLBACK_SNIPPET:
+            body = body[:RETRIEVAL_FALLBACK_SNIPPET].rsplit(" ", 1)[0] + "…"
+        parts.append(f"🔹 {header}\n{body}" if body else f"🔹 {header}")
+    return "\n\n".join(parts)
+
+def _hedge_delay() -> Optional[float]:
+    """Задержка дубля запроса к LLM: p95 успешных попыток, пока замеров мало — LLM_HEDGE_DELAY."""
+    if not settings.LLM_HEDGE_ENABLED:
+        return None
+    p95_ms = stage_metrics.percentile("llm.attempt", 0.95, min_samples=settings.LLM_HEDGE_MIN_SAMPLES)
+    return p95_ms / 1000 if p95_ms is not None else settings.LLM_HEDGE_DELAY
+
+def _timings_field(timings: Dict[str, float]) -> Dict:
+    # Колонка mlpredictions.timings заполняется только по настройке, см. RAG_STORE_TIMINGS
+    return {"timings": dict(timings)} if settings.RAG_STORE_TIMINGS else {}
+
+async def _embed_question(question: str) -> Optional[List[float]]:
+    """Эмбеддинг вопроса; None — лексический fast path, когда вопрос явно называет сущность."""
+    matched_entities = rag_index.bm25.matched_entities(question)
+    if matched_entities:
+        # Вопрос явно называет проект/компанию/пост — хватает лексического поиска, эмбеддинг не нужен
+        logger.debug(f"Lexical fast path for entities: {matched_entities}")
+        return None
+    with stage_metrics.span("query.embed"):
+        return await rag_index.embed_query(question)
+
+async def _prepare_query(question: str, db: AsyncSession):
+    """Общая часть обычного и потокового ответа: индекс, кэш ответов, ретривал.
+
+    Возвращает (question_key, question_vector, cached_answer, prompt, context_docs);
+    prompt равен None, если ответ найден в кэше.
+    """
+    if not settings.GEMINI_API_KEY:
+        logger.error("GEMINI_API_KEY is not set in settings")
+        raise ValueError("GEMINI_API_KEY is missing")
+
+    logger.debug(f"GEMINI_API_KEY: {settings.GEMINI_API_KEY[:5]}... (masked)")
+    if not rag_index.is_ready:
+        logger.debug("RAG index is not initialized, building it...")
+        with stage_metrics.span("index.init"):
+            await init_rag_index(db)
+    question_key = normalize_question(question)
+    question_vector = await _embed_question(question)
+    if question_vector is None:
+        answer = answer_cache.get_exact(question_key)
+    else:
+        answer = answer_cache.get(question_vector)
+    if answer is not None:
+        return question_key, question_vector, answer, None, []
+
+    logger.debug("Retrieving relevant documents...")
+    with stage_metrics.span("query.retrieve"):
+        relevant_docs = await rag_index.hybrid_search(question, question_vector, k=settings.RAG_RETRIEVAL_K)
+    with stage_metrics.span("query.pack_context"):
+        context_docs = pack_context(relevant_docs, settings.RAG_CONTEXT_TOKEN_BUDGET)
+    context = "\n\n".join([doc.page_content for doc in context_docs])
+
+    prompt = PromptTemplate(
+        input_variables=["context", "question"],
+        template=RAG_PROMPT_TEMPLATE
+    ).format(context=context, question=question)
+    return question_key, question_vector, None, prompt, context_docs
+
 async def get_rag_response(question: str, db: AsyncSession) -> str:
-    logger.debug(f"Processing RAG query: {question}")
-    try:
-        if not settings.GEMINI_API_KEY:
-            logger.error("GEMINI_API_KEY is not set in settings")
-            raise ValueError("GEMINI_API_KEY is missing")
-
-        logger.debug(f"GEMINI_API_KEY: {settings.GEMINI_API_KEY[:5]}... (masked)")
-        documents = await load_knowledge_base(db)
-        logger.debug("Initializing embeddings...")
-        embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/embedding-001",
-            google_api_key=settings.GEMINI_API_KEY
-        )
-        logger.debug("Creating vector store...")
-        vector_store = FAISS.from_documents(documents, embeddings)
-        logger.debug("Initializing LLM...")
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
-
-        logger.debug("Retrieving relevant documents...")
-        retriever = vector_store.as_retriever(search_kwargs={"k": 5})
-        relevant_docs = retriever.get_relevant_documents(question)
-        context = "\n\n".join([doc.page_content for doc in relevant_docs])
-
-        prompt = PromptTemplate(
-            input_variables=["context", "question"],
-            template="Ты ассистент для портфолио IT-специалиста. Отвечай профессионально, но доступно, без сленга. Максимум 7000 символов. Используй эмодзи (🔥🚀💻) для акцента. Контекст: {context}\n\nВопрос: {question}\n\nОтвет:"
-        ).format(context=context, question=question)
-
-        logger.debug("Generating response with Gemini...")
-        response = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt
-            )
+    # Одинаковые вопросы, пришедшие одновременно, делят одно вычисление
+    return await single_flight.do(normalize_question(question), lambda: _get_rag_response(question, db))
+
+async def _get_rag_response(question: str, db: AsyncSession) -> str:
+    with stage_metrics.collect() as timings:
+        return await _answer_question(question, db, timings)
+
+async def _generate_answer(prompt: str) -> str:
+    """Генерирует ответ с дедлайном LLM_DEADLINE и хеджированием (см. LLMPool.call)."""
+    client = get_llm_client()
+
+    async def attempt():
+        attempt_started = time.perf_counter()
+        response = await client.aio.models.generate_content(
+            model="gemini-2.5-flash",
+            contents=prompt
         )
-        answer = response.text.strip()
-        answer = answer.encode('utf-8', errors='replace').decode('utf-8')
-        logger.debug(f"Raw Gemini response: {answer[:100]}...")
+        # Только успешные попытки: отменённые дубли исказили бы p95 для задержки хеджирования
+        stage_metrics.record("llm.attempt", (time.perf_counter() - attempt_started) * 1000)
+        return response
 
-        if not answer:
-            logger.warning("Gemini response is empty")
-            return escape_markdown_v2("Баги? Это фичи! 😎 Но ответа пока нет, залетай позже! 🚀")
+    logger.debug("Generating response with Gemini...")
+    with stage_metrics.span("llm.generate"):
+        response = await llm_pool.call(attempt, deadline=settings.LLM_DEADLINE, hedge_delay=_hedge_delay())
+    answer = response.text.strip()
+    answer = answer.encode('utf-8', errors='replace').decode('utf-8')
+    logger.debug(f"Raw Gemini response: {answer[:100]}...")
+    return answer
+
+async def _answer_question(question: str, db: AsyncSession, timings: Dict[str, float]) -> str:
+    logger.debug(f"Processing RAG query: {question}")
+    started = time.perf_counter()
+    # Эпоха кэша до ретривала: если база знаний сменится, пока идёт генерация, ответ не закэшируется
+    cache_epoch = answer_cache.epoch
+    try:
+        question_key, question_vector, answer, prompt, context_docs = await _prepare_query(question, db)
+        if answer is None:
+            try:
+                answer = await _generate_answer(prompt)
+            except LLMDeadlineExceeded:
+                logger.warning(f"Gemini missed the {settings.LLM_DEADLINE}s deadline, answering from retrieved documents")
+                answer = _retrieval_fallback(context_docs)
+                stage_metrics.record("rag.total", (time.perf_counter() - started) * 1000)
+                interaction_log.log(question, answer, **_timings_field(timings))
+                return escape_markdown_v2(answer)
+            if not answer:
+                logger.warning("Gemini response is empty")
+                return escape_markdown_v2(EMPTY_ANSWER_FALLBACK)
+            answer_cache.put(question_key, question_vector, answer, epoch=cache_epoch)
 
         # Закомментировано, так как API сайта не готов
         # try:
@@ -163,26 +660,150 @@ async def get_rag_response(question: str, db: AsyncSession) -> str:
         # except Exception as e:
         #     logger.error(f"API error: {str(e)}")
 
-        logger.debug("Saving message and prediction...")
-        async for db in get_db():
-            message = await MessageDAO.create(db, {
-                "name": "RAG User",
-                "email": "bot@portfolio.com",
-                "message": question,
-                "source": "rag",
-                "date_sent": datetime.datetime.utcnow()  # Исправлено на date_sent
-            })
-            await MLPredictionDAO.create(db, {
-                "message_id": message.id,  # Добавляем связь с messages
-                "input_text": question,
-                "prediction": answer,
-                "created_at": datetime.datetime.utcnow()
-            })
-            break
+        stage_metrics.record("rag.total", (time.perf_counter() - started) * 1000)
+        # Запись в БД уходит в фоновый пакетный логгер и не задерживает ответ
+        interaction_log.log(question, answer, **_timings_field(timings))
 
         logger.info(f"RAG response generated: {answer[:100]}...")
         return escape_markdown_v2(answer)
 
+    except LLMBusyError:
+        return escape_markdown_v2(BUSY_FALLBACK)
     except Exception as e:
         logger.error(f"Unexpected error processing RAG query: {str(e)}")
-        return escape_markdown_v2("Баги? Это фичи! 😎 Но что-то пошло не так, залетай позже! 🚀")
\ No newline at end of file
+        return escape_markdown_v2(ERROR_FALLBACK)
+
+async def warm_up_faq(db: AsyncSession, questions: Optional[List[str]] = None) -> int:
+    """Заранее считает эмбеддинги и ответы для частых вопросов (RAG_FAQ_QUESTIONS).
+
+    Ответы кладутся в кэш закреплёнными, так что сразу после деплоя типовые вопросы
+    из /help отвечаются из памяти. В лог взаимодействий прогрев не пишется.
+    Ответ, посчитанный до очередного invalidate(), в кэш не попадает.
+    """
+    questions = settings.RAG_FAQ_QUESTIONS if questions is None else questions
+    warmed = 0
+    for question in questions:
+        cache_epoch = answer_cache.epoch
+        try:
+            question_key, question_vector, answer, prompt, _ = await _prepare_query(question, db)
+            if answer is None:
+                answer = await _generate_answer(prompt)
+                if not answer:
+                    continue
+            answer_cache.put(question_key, question_vector, answer, pinned=True, epoch=cache_epoch)
+            if answer_cache.epoch != cache_epoch:
+                continue
+            warmed += 1
+        except Exception as e:
+            logger.warning(f"Failed to warm up FAQ answer for '{question}': {str(e)}")
+    logger.info(f"Warmed up {warmed} of {len(questions)} FAQ answers")
+    return warmed
+
+_faq_warm_up_task: Optional[asyncio.Task] = None
+_faq_warm_up_waiting = False
+
+def schedule_faq_warm_up(delay: Optional[float] = None) -> None:
+    """Запускает прогрев FAQ в фоне со своей сессией через delay секунд (RAG_FAQ_WARM_UP_DELAY).
+
+    Прогрев — это по вызову LLM на каждый вопрос, поэтому серия правок базы знаний
+    даёт один прогрев: пока он ждёт старта, новые вызовы ничего не добавляют, а он
+    прочитает базу уже после них. Идущий прогрев отменяется и ставится заново: он
+    считал ответы по старой базе знаний, и после invalidate() они в кэш не попадут.
+    """
+    global _faq_warm_up_task, _faq_warm_up_waiting
+    if not settings.RAG_FAQ_QUESTIONS:
+        return
+    if _faq_warm_up_task is not None and not _faq_warm_up_task.done():
+        if _faq_warm_up_waiting:
+            return
+        _faq_warm_up_task.cancel()
+    delay = settings.RAG_FAQ_WARM_UP_DELAY if delay is None else delay
+
+    async def run():
+        global _faq_warm_up_waiting
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            _faq_warm_up_waiting = False
+        async with SessionLocal() as db:
+            await warm_up_faq(db)
+
+    _faq_warm_up_waiting = True
+    _faq_warm_up_task = asyncio.create_task(run())
+
+async def stream_rag_response(question: str, db: AsyncSession) -> AsyncIterator[str]:
+    """Потоковый вариант get_rag_response: отдаёт сырой (неэкранированный) текст по частям.
+
+    Экранирование под MarkdownV2 остаётся за вызывающим кодом и должно применяться
+    к накопленному тексту целиком, а не к отдельным чанкам.
+    """
+    async for chunk in single_flight.stream(normalize_question(question), lambda: _stream_rag_response(question, db)):
+        yield chunk
+
+async def _stream_rag_response(question: str, db: AsyncSession) -> AsyncIterator[str]:
+    with stage_metrics.collect() as timings:
+        async for chunk in _stream_answer(question, db, timings):
+            yield chunk
+
+async def _stream_answer(question: str, db: AsyncSession, timings: Dict[str, float]) -> AsyncIterator[str]:
+    logger.debug(f"Processing streaming RAG query: {question}")
+    started = time.perf_counter()
+    cache_epoch = answer_cache.epoch
+    try:
+        question_key, question_vector, answer, prompt, context_docs = await _prepare_query(question, db)
+    except Exception as e:
+        logger.error(f"Unexpected error preparing streaming RAG query: {str(e)}")
+        yield ERROR_FALLBACK
+        return
+
+    if answer is not None:
+        yield answer
+        stage_metrics.record("rag.total", (time.perf_counter() - started) * 1000)
+        interaction_log.log(question, answer, **_timings_field(timings))
+        return
+
+    client = get_llm_client()
+
+    async def generate():
+        async for chunk in await client.aio.models.generate_content_stream(
+            model="gemini-2.5-flash",
+            contents=prompt
+        ):
+            if chunk.text:
+                yield chunk.text
+
+    parts = []
+    try:
+        logger.debug("Streaming response from Gemini...")
+        generation_started = time.perf_counter()
+        async for text in llm_pool.stream(generate, deadline=settings.LLM_DEADLINE):
+            if not parts:
+                stage_metrics.record("llm.first_token", (time.perf_counter() - generation_started) * 1000)
+            parts.append(text)
+            yield text
+        stage_metrics.record("llm.generate", (time.perf_counter() - generation_started) * 1000)
+    except LLMBusyError:
+        yield BUSY_FALLBACK
+        return
+    except LLMDeadlineExceeded:
+        logger.warning(f"Gemini stream missed the {settings.LLM_DEADLINE}s deadline, answering from retrieved documents")
+        answer = _retrieval_fallback(context_docs)
+        yield answer
+        stage_metrics.record("rag.total", (time.perf_counter() - started) * 1000)
+        interaction_log.log(question, answer, **_timings_field(timings))
+        return
+    except Exception as e:
+        logger.error(f"Gemini streaming error: {str(e)}")
+        if not parts:
+            yield ERROR_FALLBACK
+        return
+
+    answer = "".join(parts).strip()
+    if not answer:
+        logger.warning("Gemini streamed an empty response")
+        yield EMPTY_ANSWER_FALLBACK
+        return
+    answer_cache.put(question_key, question_vector, answer, epoch=cache_epoch)
+    stage_metrics.record("rag.total", (time.perf_counter() - started) * 1000)
+    interaction_log.log(question, answer, **_timings_field(timings))
+    logger.info(f"RAG streamed response generated: {answer[:100]}...")
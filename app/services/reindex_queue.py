@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Set
+
+from app.config import settings
+from app.dao.events import add_change_listener, remove_change_listener
+from app.database import SessionLocal
+from app.models import ProjectTag, Tag
+from app.services import rag
+
+logger = logging.getLogger(__name__)
+
+
+class ReindexQueue:
+    """Отложенная переиндексация RAG по событиям изменений из DAO.
+
+    Подписывается на app.dao.events и копит id затронутых документов базы знаний.
+    Фоновая задача ждёт, пока поток записей затихнет на debounce секунд (но не дольше
+    max_delay с первого события), и одним проходом перечитывает только эти документы.
+    Переименование тега задевает неизвестное число проектов, поэтому ведёт к полной
+    досинхронизации. Неудавшийся проход возвращает документы в очередь и повторяется
+    не раньше чем через max_delay. Пока индекс не загружен, документы остаются в очереди
+    и уходят в первый проход после загрузки.
+
+    События app.dao.events живут внутри процесса: очередь видит только записи своего
+    процесса. Портфолио правится через API, поэтому индекс бота события не обновляют —
+    его догоняет полная досинхронизация, которая ставится раз в refresh_interval секунд
+    (RAG_INDEX_REFRESH_INTERVAL) в каждом процессе и заодно замечает правки в обход DAO.
+    """
+
+    def __init__(self, debounce: float, max_delay: float, refresh_interval: float):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.refresh_interval = refresh_interval
+        self.reindexed = 0
+        self.failed = 0
+        self.retries = 0
+        self._pending: Set[str] = set()
+        self._full = False
+        self._first_event: Optional[float] = None
+        self._last_event = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._sources = {model.__tablename__: source for source, model in rag.KNOWLEDGE_SOURCES.items()}
+
+    def on_change(self, table: str, action: str, rows: List[dict]) -> None:
+        if table in self._sources:
+            source = self._sources[table]
+            self._pending.update(f"{source}:{row['id']}" for row in rows if row.get("id") is not None)
+        elif table == ProjectTag.__tablename__:
+            self._pending.update(f"project:{row['project_id']}" for row in rows if row.get("project_id") is not None)
+        elif table == Tag.__tablename__ and action != "create":
+            self._full = True
+        else:
+            return
+        self._touch()
+
+    def request_full_refresh(self) -> None:
+        self._full = True
+        self._touch()
+
+    def _touch(self) -> None:
+        now = time.monotonic()
+        self._last_event = now
+        if self._first_event is None:
+            self._first_event = now
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            add_change_listener(self.on_change)
+            self._task = asyncio.create_task(self._run())
+            self._refresh_task = asyncio.create_task(self._refresh_periodically())
+            logger.debug("RAG reindex queue started")
+
+    async def stop(self) -> None:
+        remove_change_listener(self.on_change)
+        for task in (self._task, self._refresh_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._refresh_task = None
+        logger.info("RAG reindex queue stopped")
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            self.request_full_refresh()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._first_event is None:
+                # События уже ушли в предыдущий проход
+                continue
+            # Дебаунс: серия записей (например, синхронизация с GitHub) даёт один проход переиндексации
+            while True:
+                now = time.monotonic()
+                wait = min(self._last_event + self.debounce, self._first_event + self.max_delay) - now
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if not await self.flush():
+                # БД или API эмбеддингов недоступны — не повторяем чаще, чем раз в max_delay
+                await asyncio.sleep(self.max_delay)
+
+    async def flush(self) -> bool:
+        """Переиндексирует накопленные документы. False — проход не удался, документы снова в очереди."""
+        if not self._pending and not self._full:
+            return True
+        doc_ids, full = self._pending, self._full
+        self._pending, self._full, self._first_event = set(), False, None
+        if not rag.rag_index.is_ready:
+            # Индекс подгружается лениво: держим документы до прохода после загрузки
+            logger.debug(f"RAG index is not loaded yet, keeping {len(doc_ids)} documents queued")
+            self._pending |= doc_ids
+            self._full = self._full or full
+            return True
+        try:
+            async with SessionLocal() as db:
+                stats = await rag.refresh_rag_index(db, doc_ids=None if full else doc_ids)
+            self.reindexed += len(doc_ids)
+            logger.debug(f"Reindexed {'all' if full else len(doc_ids)} RAG documents: {stats}")
+        except Exception as e:
+            self.failed += len(doc_ids)
+            self.retries += 1
+            logger.error(f"Failed to reindex {'all' if full else len(doc_ids)} RAG documents, will retry: {str(e)}")
+            self._pending |= doc_ids
+            self._full = self._full or full
+            self._touch()
+            return False
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "full_pending": self._full,
+            "reindexed": self.reindexed,
+            "failed": self.failed,
+            "retries": self.retries
+        }
+
+
+reindex_queue = ReindexQueue(
+    debounce=settings.RAG_REINDEX_DEBOUNCE,
+    max_delay=settings.RAG_REINDEX_MAX_DELAY,
+    refresh_interval=settings.RAG_INDEX_REFRESH_INTERVAL
+)
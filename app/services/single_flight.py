@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Set
+
+logger = logging.getLogger(__name__)
+
+
+class _SharedStream:
+    """Буфер чанков одного потока, который могут читать несколько подписчиков."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self._condition = asyncio.Condition()
+
+    async def publish(self, chunk: str) -> None:
+        async with self._condition:
+            self.chunks.append(chunk)
+            self._condition.notify_all()
+
+    async def close(self) -> None:
+        async with self._condition:
+            self.done = True
+            self._condition.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        position = 0
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: len(self.chunks) > position or self.done)
+                new_chunks = self.chunks[position:]
+                finished = self.done
+            position += len(new_chunks)
+            for chunk in new_chunks:
+                yield chunk
+            if finished and position == len(self.chunks):
+                return
+
+
+class SingleFlight:
+    """Склеивает одновременные одинаковые запросы в одно вычисление.
+
+    Пока вычисление по ключу в полёте, остальные вызовы с тем же ключом
+    не запускают своё, а ждут общий результат (или общий поток чанков).
+    Вычисление идёт в отдельной задаче, и все вызовы, включая первый, ждут её через
+    asyncio.shield: отмена одного вызывающего не отменяет ответ остальным.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._streams: Dict[str, _SharedStream] = {}
+        # Ссылки на фоновые задачи, чтобы их не собрал сборщик мусора
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        self.calls += 1
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.debug(f"Coalesced concurrent call for '{key}'")
+        else:
+            task = asyncio.get_running_loop().create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish_call(key, done))
+        return await asyncio.shield(task)
+
+    def _finish_call(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Если все ожидающие отменены, исключение никто не заберёт; помечаем его полученным
+            task.exception()
+
+    async def stream(self, key: str, fn: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        self.calls += 1
+        shared = self._streams.get(key)
+        if shared is not None:
+            self.coalesced += 1
+            logger.debug(f"Coalesced concurrent stream for '{key}'")
+        else:
+            shared = _SharedStream()
+            self._streams[key] = shared
+
+            async def pump():
+                # Поток читается в отдельной задаче, чтобы отключение первого
+                # подписчика не обрывало ответ остальным
+                try:
+                    async for chunk in fn():
+                        await shared.publish(chunk)
+                except Exception as e:
+                    logger.error(f"Shared stream for '{key}' failed: {str(e)}")
+                finally:
+                    del self._streams[key]
+                    await shared.close()
+
+            task = asyncio.get_running_loop().create_task(pump())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        async for chunk in shared.subscribe():
+            yield chunk
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls) + len(self._streams)
+        }
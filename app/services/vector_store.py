@@ -0,0 +1,196 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain.docstore.document import Document
+from langchain_core.embeddings import Embeddings
+
+
+class NumpyVectorStore:
+    """Компактное векторное хранилище для небольших корпусов на одной NumPy-матрице.
+
+    Векторы L2-нормированы и лежат подряд в float32 (или int8 с масштабом на строку
+    при quantize=True), поиск top-k — одно матричное умножение. Вместо docstore с
+    объектами Document хранятся параллельные массивы id, текстов и metadata.
+    Интерфейс повторяет используемую часть FAISS-обёртки LangChain.
+    """
+
+    VECTORS_FILE = "vectors.npz"
+    META_FILE = "documents.json"
+
+    def __init__(self, embeddings: Embeddings, quantize: bool = False):
+        self.embeddings = embeddings
+        self.quantize = quantize
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.metadatas: List[dict] = []
+        self._size = 0
+        self._vectors: Optional[np.ndarray] = None  # float32 или int8, shape (capacity, dim)
+        self._scales: Optional[np.ndarray] = None  # масштаб строк для int8
+        self._positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def from_documents(cls, documents: List[Document], embeddings: Embeddings, ids: Optional[List[str]] = None, quantize: bool = False) -> "NumpyVectorStore":
+        store = cls(embeddings, quantize=quantize)
+        store.add_documents(documents, ids=ids)
+        return store
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _encode(self, matrix: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        if not self.quantize:
+            return matrix.astype(np.float32), None
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        return np.round(matrix / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+    def _matrix(self, rows=slice(None)) -> np.ndarray:
+        vectors = self._vectors[:self._size][rows]
+        if not self.quantize:
+            return vectors
+        return vectors.astype(np.float32) * self._scales[:self._size][rows][..., None]
+
+    def _reserve(self, extra: int, dim: int) -> None:
+        needed = self._size + extra
+        if self._vectors is None:
+            capacity = max(needed, 16)
+            self._vectors = np.zeros((capacity, dim), dtype=np.int8 if self.quantize else np.float32)
+            self._scales = np.ones(capacity, dtype=np.float32) if self.quantize else None
+        elif needed > len(self._vectors):
+            # Удваиваем ёмкость, чтобы добавление по одному документу не копировало матрицу каждый раз
+            capacity = max(needed, len(self._vectors) * 2)
+            vectors = np.zeros((capacity, dim), dtype=self._vectors.dtype)
+            vectors[:self._size] = self._vectors[:self._size]
+            self._vectors = vectors
+            if self.quantize:
+                scales = np.ones(capacity, dtype=np.float32)
+                scales[:self._size] = self._scales[:self._size]
+                self._scales = scales
+
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None) -> List[str]:
+        if not documents:
+            return []
+        vectors = self.embeddings.embed_documents([doc.page_content for doc in documents])
+        return self.add_embeddings(
+            zip([doc.page_content for doc in documents], vectors),
+            metadatas=[doc.metadata for doc in documents],
+            ids=ids
+        )
+
+    def add_embeddings(self, text_embeddings: Iterable[Tuple[str, List[float]]], metadatas: Optional[List[dict]] = None,
+                       ids: Optional[List[str]] = None) -> List[str]:
+        """Добавляет уже посчитанные векторы (как FAISS.add_embeddings), без обращения к модели."""
+        text_embeddings = list(text_embeddings)
+        if not text_embeddings:
+            return []
+        metadatas = metadatas or [{} for _ in text_embeddings]
+        ids = ids or [metadata.get("doc_id", str(self._size + i)) for i, metadata in enumerate(metadatas)]
+        existing = [doc_id for doc_id in ids if doc_id in self._positions]
+        if existing:
+            self.delete(existing)
+        matrix = self._normalize(np.asarray([vector for _, vector in text_embeddings], dtype=np.float32))
+        vectors, scales = self._encode(matrix)
+        self._reserve(len(text_embeddings), matrix.shape[1])
+        end = self._size + len(text_embeddings)
+        self._vectors[self._size:end] = vectors
+        if self.quantize:
+            self._scales[self._size:end] = scales
+        for offset, (doc_id, (text, _), metadata) in enumerate(zip(ids, text_embeddings, metadatas)):
+            self._positions[doc_id] = self._size + offset
+            self.ids.append(doc_id)
+            self.texts.append(text)
+            self.metadatas.append(metadata)
+        self._size = end
+        return ids
+
+    def delete(self, ids: List[str]) -> bool:
+        drop = {self._positions[doc_id] for doc_id in ids if doc_id in self._positions}
+        if not drop:
+            return False
+        keep = np.array([i for i in range(self._size) if i not in drop], dtype=np.int64)
+        size = len(keep)
+        self._vectors[:size] = self._vectors[keep]
+        if self.quantize:
+            self._scales[:size] = self._scales[keep]
+        self.ids = [self.ids[i] for i in keep]
+        self.texts = [self.texts[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        self._positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        self._size = size
+        return True
+
+    def _document(self, position: int) -> Document:
+        return Document(page_content=self.texts[position], metadata=self.metadatas[position])
+
+    def _query(self, vector: List[float]) -> np.ndarray:
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        return query / norm if norm > 0 else query
+
+    def similarity_search_with_score_by_vector(self, vector: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        if not self._size:
+            return []
+        scores = self._matrix() @ self._query(vector)
+        k = min(k, self._size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._document(int(i)), float(scores[i])) for i in top]
+
+    def similarity_search_by_vector(self, vector: List[float], k: int = 4) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(vector, k=k)]
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k=k)
+
+    def max_marginal_relevance_search_by_vector(self, vector: List[float], k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5) -> List[Document]:
+        """MMR: баланс релевантности и разнообразия, посчитанный на матрице кандидатов целиком."""
+        if not self._size:
+            return []
+        query = self._query(vector)
+        scores = self._matrix() @ query
+        fetch_k = min(fetch_k, self._size)
+        candidates = np.argpartition(-scores, fetch_k - 1)[:fetch_k]
+        candidate_vectors = self._matrix(candidates)
+        relevance = scores[candidates]
+        pairwise = candidate_vectors @ candidate_vectors.T
+
+        selected = [int(np.argmax(relevance))]
+        max_similarity = pairwise[selected[0]].copy()
+        while len(selected) < min(k, fetch_k):
+            mmr = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+            mmr[selected] = -np.inf
+            best = int(np.argmax(mmr))
+            selected.append(best)
+            max_similarity = np.maximum(max_similarity, pairwise[best])
+        return [self._document(int(candidates[i])) for i in selected]
+
+    def save_local(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        arrays = {"vectors": self._vectors[:self._size] if self._size else np.zeros((0, 0), dtype=np.float32)}
+        if self.quantize and self._size:
+            arrays["scales"] = self._scales[:self._size]
+        np.savez(os.path.join(path, self.VECTORS_FILE), **arrays)
+        with open(os.path.join(path, self.META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"quantize": self.quantize, "ids": self.ids, "texts": self.texts, "metadatas": self.metadatas}, f, ensure_ascii=False)
+
+    @classmethod
+    def load_local(cls, path: str, embeddings: Embeddings, **kwargs) -> "NumpyVectorStore":
+        with open(os.path.join(path, cls.META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        store = cls(embeddings, quantize=meta["quantize"])
+        data = np.load(os.path.join(path, cls.VECTORS_FILE))
+        if meta["ids"]:
+            store._vectors = data["vectors"].copy()
+            store._scales = data["scales"].copy() if meta["quantize"] else None
+        store.ids, store.texts, store.metadatas = meta["ids"], meta["texts"], meta["metadatas"]
+        store._positions = {doc_id: i for i, doc_id in enumerate(store.ids)}
+        store._size = len(store.ids)
+        return store
@@ -7,6 +7,10 @@ from aiogram.client.default import DefaultBotProperties
 from app.config import settings
 from app.telegram_bot.handlers import start, rag, channel, projects, help, rag_query
 from app.services.github_service import sync_projects_with_github
+from app.services.rag import init_rag_index, schedule_faq_warm_up
+from app.services.interaction_log import interaction_log
+from app.services.reindex_queue import reindex_queue
+from app.dao.cache import dao_cache
 from app.database import get_db, shutdown_db
 
 logger = logging.getLogger(__name__)
@@ -27,10 +31,23 @@ async def on_startup(dispatcher: Dispatcher, bot: Bot):
             break
     except Exception as e:
         logger.error(f"Error during initial sync: {str(e)}")
+    try:
+        async for db in get_db():
+            await init_rag_index(db)
+            logger.info("RAG index loaded")
+            break
+    except Exception as e:
+        logger.error(f"Error loading RAG index: {str(e)}")
+    interaction_log.start()
+    reindex_queue.start()
+    schedule_faq_warm_up(delay=0)
     asyncio.create_task(schedule_sync_projects())
 
 async def on_shutdown(dispatcher: Dispatcher, bot: Bot):
     logger.info("Shutting down bot...")
+    await reindex_queue.stop()
+    await interaction_log.stop()
+    await dao_cache.close()
     await bot.session.close()
     await shutdown_db()
     logger.info("Database engine closed.")
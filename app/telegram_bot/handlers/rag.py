@@ -1,6 +1,7 @@
 from aiogram import Bot, Dispatcher
 from app.services.github_service import get_latest_commits, find_latest_active_repo
 from app.config import settings
+from app.services.llm_pool import llm_pool
 from langchain_google_genai import ChatGoogleGenerativeAI
 import logging
 import asyncio
@@ -25,7 +26,9 @@ async def format_post_with_gemini(repo_name: str, commits: list) -> str:
         f"URL репо: https://github.com/{settings.GITHUB_USER}/{repo_name}"
     )
     try:
-        response = llm.invoke(prompt)
+        # Асинхронный вызов через общий пул LLM: не блокирует event loop бота
+        async with llm_pool.slot():
+            response = await llm.ainvoke(prompt)
         if not response.content:
             logger.warning("Gemini response is empty")
             fallback = (
@@ -1,9 +1,11 @@
 from aiogram import Dispatcher, Bot, F
 from aiogram.types import Message
-from app.services.rag import get_rag_response
+from app.services.rag import stream_rag_response
+from app.config import settings
 from app.database import get_db
 import logging
 import re
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -12,21 +14,46 @@ def escape_markdown_v2(text: str) -> str:
     reserved_chars = r'([_\*[\]()~`>#\+-=|{}\.!])'
     text = re.sub(reserved_chars, r'\\\g<1>', text)
     text = re.sub(r'([\\]{2,})', r'\\', text)  # Удаляем дублирующиеся слеши
-    return text[:500]
+    text = text[:500]
+    if text.endswith('\\'):
+        text = text[:-1]  # Обрезка не должна оставлять висящий слеш от разорванной escape-последовательности
+    return text
+
+async def _edit_reply(reply: Message, text: str, shown: str) -> str:
+    """Редактирует сообщение-ответ, если экранированный текст изменился. Возвращает показанный текст."""
+    # Экранируем весь накопленный текст, а не чанк: так escape-последовательности не рвутся на границах
+    escaped = escape_markdown_v2(text)
+    if not escaped or escaped == shown:
+        return shown
+    await reply.edit_text(escaped, parse_mode="MarkdownV2")
+    return escaped
 
 async def process_text_query(message: Message):
-    query = f"Ты ассистент для портфолио IT-специалиста. Отвечай профессионально, но доступно, без сленга. Максимум 7000 символов. Используй эмодзи для акцента. Вопрос: '{message.text}'"
+    # Инструкции для модели уже есть в промпте get_rag_response, передаём только сам вопрос,
+    # чтобы эмбеддинг (и семантический кэш ответов) строился по смыслу вопроса
+    query = message.text
     logger.debug(f"Processing query: {query.encode('utf-8')}")
     async for db in get_db():
+        reply = None
         try:
-            response = await get_rag_response(query, db)
-            escaped_response = escape_markdown_v2(response)
-            await message.answer(escaped_response, parse_mode="MarkdownV2")
+            reply = await message.answer(escape_markdown_v2("Думаю... 🤔"), parse_mode="MarkdownV2")
+            text, shown = "", ""
+            last_edit = time.monotonic()
+            async for chunk in stream_rag_response(query, db):
+                text += chunk
+                # Telegram ограничивает частоту правок, поэтому редактируем не чаще раза в интервал
+                if time.monotonic() - last_edit >= settings.RAG_STREAM_EDIT_INTERVAL:
+                    shown = await _edit_reply(reply, text, shown)
+                    last_edit = time.monotonic()
+            await _edit_reply(reply, text, shown)
             logger.info(f"Replied to query: {message.text}")
         except Exception as e:
             logger.error(f"Error processing query '{message.text}': {str(e)}")
-            fallback = "Баги? Это фичи! 😎 Но что-то пошло не так, залетай позже! 🚀"
-            await message.answer(escape_markdown_v2(fallback), parse_mode="MarkdownV2")
+            fallback = escape_markdown_v2("Баги? Это фичи! 😎 Но что-то пошло не так, залетай позже! 🚀")
+            if reply is not None:
+                await reply.edit_text(fallback, parse_mode="MarkdownV2")
+            else:
+                await message.answer(fallback, parse_mode="MarkdownV2")
         break
 
 def register_rag_query_handlers(dp: Dispatcher, bot: Bot):
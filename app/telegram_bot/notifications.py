@@ -1,12 +1,12 @@
 from aiogram import Bot
-from app.database import get_db
+from app.database import SessionLocal
 from app.dao.models_dao import TelegramSubscriberDAO
 import logging
 
 logger = logging.getLogger(__name__)
 
 async def notify_subscribers_new_project(bot: Bot, project):
-    async with get_db() as db:
+    async with SessionLocal() as db:
         try:
             subscribers = await TelegramSubscriberDAO.get_all(db)
             for subscriber in subscribers:
@@ -0,0 +1,79 @@
+"""Локальный фейковый Gemini API для проверки дедлайнов и хеджирования без сети.
+
+Отвечает на generateContent и streamGenerateContent (SSE) в формате REST API Gemini.
+Латентность: обычная --latency, с вероятностью --tail-prob — медленная --tail-latency.
+
+    python benchmarks/fake_gemini_server.py --port 8090 --latency 0.3 --tail-prob 0.1 --tail-latency 10
+    GEMINI_BASE_URL=http://127.0.0.1:8090 python -m app.telegram_bot.bot
+"""
+import argparse
+import asyncio
+import json
+import random
+
+from aiohttp import web
+
+
+def make_app(latency: float, tail_prob: float, tail_latency: float, seed: int) -> web.Application:
+    rnd = random.Random(seed)
+    stats = {"requests": 0, "slow": 0, "cancelled": 0}
+
+    def delay() -> float:
+        if rnd.random() < tail_prob:
+            stats["slow"] += 1
+            return tail_latency
+        return latency
+
+    def answer(request_body: dict) -> str:
+        prompt = request_body["contents"][0]["parts"][0]["text"]
+        return f"Фейковый ответ на промпт из {len(prompt)} символов 🚀"
+
+    def candidate(text: str) -> dict:
+        return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP", "index": 0}]}
+
+    async def generate(request: web.Request) -> web.StreamResponse:
+        stats["requests"] += 1
+        body = await request.json()
+        model, _, method = request.match_info["action"].partition(":")
+        try:
+            if method == "generateContent":
+                await asyncio.sleep(delay())
+                return web.json_response(candidate(answer(body)))
+            if method == "streamGenerateContent":
+                response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+                await response.prepare(request)
+                first_delay = delay()
+                for i, word in enumerate(answer(body).split(" ")):
+                    await asyncio.sleep(first_delay if i == 0 else latency / 10)
+                    await response.write(f"data: {json.dumps(candidate(word + ' '), ensure_ascii=False)}\r\n\r\n".encode("utf-8"))
+                await response.write_eof()
+                return response
+        except asyncio.CancelledError:
+            # Клиент отменил запрос (например, победил хедж-дубль)
+            stats["cancelled"] += 1
+            raise
+        raise web.HTTPNotFound(text=f"Unsupported method {method} for {model}")
+
+    async def get_stats(request: web.Request) -> web.Response:
+        return web.json_response(stats)
+
+    app = web.Application()
+    app.router.add_post("/{version}/models/{action}", generate)
+    app.router.add_get("/stats", get_stats)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Gemini API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--tail-prob", type=float, default=0.1)
+    parser.add_argument("--tail-latency", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    web.run_app(make_app(args.latency, args.tail_prob, args.tail_latency, args.seed), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Офлайн-бенчмарк RAG: латентность по стадиям, пропускная способность, память и recall@k.
+
+Не ходит ни в Postgres, ни в Gemini: база знаний — синтетический портфолио-датасет
+с фиксированным seed, эмбеддинги и LLM — заглушки с настраиваемой задержкой.
+
+    python benchmarks/rag_benchmark.py --projects 200 --concurrency 16 --llm-latency 0.3
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Dict, List, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Настройки приложения обязательны при импорте; для бенчмарка хватает заглушек
+for name, value in {
+    "DB_HOST": "localhost", "DB_PORT": "5432", "DB_USER": "bench", "DB_PASS": "bench", "DB_NAME": "bench",
+    "ADMIN_USERNAME": "bench", "ADMIN_PASSWORD": "bench", "ADMIN_EMAIL": "bench@example.com",
+    "TELEGRAM_BOT_TOKEN": "123456:benchmark-token", "GEMINI_API_KEY": "benchmark", "CHANNEL_ID": "0",
+    "GITHUB_TOKEN": "benchmark", "GITHUB_USER": "benchmark", "ADMIN_TELEGRAM_ID": "0",
+    "RAG_FAQ_QUESTIONS": "[]",
+}.items():
+    os.environ.setdefault(name, value)
+
+from app.services import rag  # noqa: E402
+from app.services.embeddings import LocalHashEmbeddings  # noqa: E402
+from app.services.metrics import stage_metrics  # noqa: E402
+
+VOCABULARY = (
+    "fastapi django flask aiogram telegram bot parser scraper dashboard analytics pipeline etl "
+    "postgres redis kafka docker kubernetes terraform ansible grafana prometheus react vue svelte "
+    "typescript rust golang python pandas numpy pytorch tensorflow sklearn llm rag embeddings search "
+    "recommendation billing payments auth oauth jwt websocket realtime chat crm landing portfolio "
+    "compiler interpreter game engine physics shader audio video stream cache queue scheduler cron"
+).split()
+COMPANIES = ["Yandex", "Tinkoff", "Ozon", "Avito", "Kaspersky", "JetBrains", "Sber", "VK", "Wildberries", "Selectel"]
+
+
+def make_dataset(seed: int, projects: int, skills: int, posts: int, post_words: int) -> Dict[str, List[dict]]:
+    """Синтетический портфолио в формате fetch_knowledge_rows."""
+    rnd = random.Random(seed)
+
+    def words(n: int) -> str:
+        return " ".join(rnd.choice(VOCABULARY) for _ in range(n))
+
+    rows = {source: [] for source in [*rag.KNOWLEDGE_SOURCES, "project_tag"]}
+    for i in range(1, projects + 1):
+        rows["project"].append({
+            "id": i, "title": f"{rnd.choice(VOCABULARY)}-{rnd.choice(VOCABULARY)}-{i}",
+            "description": words(25), "project_url": f"https://github.com/bench/repo-{i}",
+            "date_completed": f"2024-{rnd.randint(1, 12):02d}-01"
+        })
+        for tag in rnd.sample(VOCABULARY, 3):
+            rows["project_tag"].append({"project_id": i, "tag_name": tag})
+    for i in range(1, skills + 1):
+        rows["skill"].append({"id": i, "skill_name": f"{rnd.choice(VOCABULARY)}{i}", "description": words(10), "proficiency_level": rnd.randint(1, 5)})
+    for i, company in enumerate(COMPANIES, start=1):
+        rows["work_experience"].append({
+            "id": i, "company": company, "position": "Backend developer", "description": words(30),
+            "start_date": "2020-01-01", "end_date": None
+        })
+    for i in range(1, posts + 1):
+        rows["blog_post"].append({"id": i, "title": f"Post {i}: {words(4)}", "content": words(post_words), "summary": words(15)})
+    rows["education"].append({"id": 1, "degree": "BSc", "field_of_study": "Computer Science", "institution": "MSU", "start_date": "2014-09-01", "end_date": "2018-06-30"})
+    rows["social_media"].append({"id": 1, "platform_name": "GitHub", "profile_url": "https://github.com/bench"})
+    rows["profile"].append({"id": 1, "name": "Bench User", "bio": words(20), "email": "bench@example.com", "phone": None, "address": None, "resume_url": None})
+    return rows
+
+
+def make_questions(rows: Dict[str, List[dict]], seed: int, count: int) -> List[Tuple[str, str]]:
+    """Вопросы с ожидаемым документом-источником: по имени сущности и по содержанию."""
+    rnd = random.Random(seed + 1)
+    questions = []
+    for _ in range(count):
+        kind = rnd.choice(["project_name", "project_content", "company", "skill"])
+        if kind == "project_name":
+            project = rnd.choice(rows["project"])
+            questions.append((f"Расскажи про проект {project['title']}", f"project:{project['id']}"))
+        elif kind == "project_content":
+            project = rnd.choice(rows["project"])
+            keywords = " ".join(rnd.sample(project["description"].split(), 5))
+            questions.append((f"Есть проект где {keywords}?", f"project:{project['id']}"))
+        elif kind == "company":
+            experience = rnd.choice(rows["work_experience"])
+            questions.append((f"Что делал в {experience['company']}?", f"work_experience:{experience['id']}"))
+        else:
+            skill = rnd.choice(rows["skill"])
+            questions.append((f"Насколько хорошо знаешь {skill['skill_name']}?", f"skill:{skill['id']}"))
+    return questions
+
+
+class FakeSession:
+    """Отдаёт строки датасета в формате UNION ALL-запроса fetch_knowledge_rows."""
+
+    def __init__(self, rows: Dict[str, List[dict]], latency: float):
+        self.rows = rows
+        self.latency = latency
+
+    async def execute(self, query):
+        await asyncio.sleep(self.latency)
+        return [(source, data) for source, items in self.rows.items() for data in items]
+
+
+class StubEmbeddings(LocalHashEmbeddings):
+    """Локальные эмбеддинги с искусственной сетевой задержкой на каждый вызов."""
+
+    def __init__(self, latency: float, dim: int = 512):
+        super().__init__(dim=dim)
+        self.latency = latency
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        time.sleep(self.latency)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.calls += 1
+        time.sleep(self.latency)
+        return super().embed_query(text)
+
+
+class StubLLMClient:
+    """Повторяет интерфейс genai.Client.aio.models, отвечая с заданной задержкой."""
+
+    def __init__(self, latency: float, chunks: int = 5):
+        self.latency = latency
+        self.chunks = chunks
+        self.calls = 0
+        self.aio = SimpleNamespace(models=SimpleNamespace(
+            generate_content=self._generate_content,
+            generate_content_stream=self._generate_content_stream
+        ))
+
+    def _answer(self, contents: str) -> str:
+        return f"Ответ на основе {len(contents)} символов контекста 🚀"
+
+    async def _generate_content(self, model: str, contents: str):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(text=self._answer(contents))
+
+    async def _generate_content_stream(self, model: str, contents: str):
+        self.calls += 1
+
+        async def stream():
+            for part in self._answer(contents).split(" "):
+                await asyncio.sleep(self.latency / self.chunks)
+                yield SimpleNamespace(text=part + " ")
+        return stream()
+
+
+class NullInteractionLog:
+    def log(self, question, answer, **fields):
+        pass
+
+    def stats(self):
+        return {}
+
+
+async def measure_recall(questions: List[Tuple[str, str]], k: int) -> Dict[str, float]:
+    hits = {"served": 0, "hybrid": 0, "vector": 0, "bm25": 0}
+    for question, expected in questions:
+        vector = await rag.rag_index.embed_query(question)
+        results = {
+            # То, что реально уходит в промпт: с лексическим fast path
+            "served": await rag.rag_index.hybrid_search(question, await rag._embed_question(question), k=k),
+            "hybrid": await rag.rag_index.hybrid_search(question, vector, k=k),
+            "vector": await rag.rag_index.search_by_vector(vector, k=k),
+            "bm25": rag.rag_index.lexical_search(question, k=k),
+        }
+        for name, docs in results.items():
+            if expected in {doc.metadata["parent_id"] for doc in docs}:
+                hits[name] += 1
+    return {f"{name}_recall@{k}": round(count / len(questions), 3) for name, count in hits.items()}
+
+
+async def measure_throughput(questions: List[Tuple[str, str]], session: FakeSession, concurrency: int, rounds: int) -> Dict[str, float]:
+    queue = [question for question, _ in questions] * rounds
+    latencies = []
+
+    async def asker():
+        while queue:
+            question = queue.pop()
+            started = time.perf_counter()
+            await rag.get_rag_response(question, session)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[asker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(latencies[len(latencies) // 2], 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+    }
+
+
+async def run(args) -> Dict:
+    rows = make_dataset(args.seed, args.projects, args.skills, args.posts, args.post_words)
+    questions = make_questions(rows, args.seed, args.questions)
+    session = FakeSession(rows, args.db_latency)
+    embeddings = StubEmbeddings(args.embed_latency)
+    llm = StubLLMClient(args.llm_latency)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        rag.rag_index = rag.RAGIndex(os.path.join(workdir, "index"), embeddings=embeddings, store=args.vector_store, quantize=args.quantize)
+        rag.set_llm_client(llm)
+        rag.interaction_log = NullInteractionLog()
+        if args.no_answer_cache:
+            rag.answer_cache.threshold = 2.0
+            rag.answer_cache.max_size = 0
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        await rag.init_rag_index(session)
+        build_s = time.perf_counter() - started
+        recall = await measure_recall(questions, args.k)
+        throughput = await measure_throughput(questions, session, args.concurrency, args.rounds)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "dataset": {name: len(items) for name, items in rows.items()},
+        "index_build_s": round(build_s, 3),
+        "retrieval": recall,
+        "throughput": throughput,
+        "memory_peak_mb": round(peak / 1024 / 1024, 2),
+        "calls": {"embedding": embeddings.calls, "llm": llm.calls},
+        "stages": stage_metrics.snapshot(),
+        "rag": rag.get_rag_stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline RAG benchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--skills", type=int, default=30)
+    parser.add_argument("--posts", type=int, default=20)
+    parser.add_argument("--post-words", type=int, default=800)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--db-latency", type=float, default=0.005)
+    parser.add_argument("--embed-latency", type=float, default=0.02)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--no-answer-cache", action="store_true")
+    parser.add_argument("--vector-store", choices=["faiss", "numpy"], default="faiss")
+    parser.add_argument("--quantize", action="store_true", help="int8-векторы для --vector-store numpy")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import os
+import sys
+
+# Settings требует обязательные переменные окружения; для тестов хватает заглушек
+_TEST_ENV = {
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_USER": "test",
+    "DB_PASS": "test",
+    "DB_NAME": "test",
+    "ADMIN_USERNAME": "admin",
+    "ADMIN_PASSWORD": "admin",
+    "ADMIN_EMAIL": "admin@example.com",
+    "TELEGRAM_BOT_TOKEN": "123456:ABCdefGHIjklMNOpqrSTUvwxYZ012345678",
+    "GEMINI_API_KEY": "test",
+    "CHANNEL_ID": "1",
+    "GITHUB_TOKEN": "test",
+    "GITHUB_USER": "test",
+    "ADMIN_TELEGRAM_ID": "1",
+    "RAG_EMBEDDING_PROVIDER": "local",
+    "RAG_FAQ_QUESTIONS": "[]",
+}
+for key, value in _TEST_ENV.items():
+    os.environ.setdefault(key, value)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
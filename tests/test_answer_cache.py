@@ -0,0 +1,86 @@
+from app.services.answer_cache import SemanticAnswerCache
+
+
+def test_put_after_invalidate_is_dropped():
+    cache = SemanticAnswerCache(threshold=0.9, ttl=60, max_size=10)
+    epoch = cache.epoch
+    # База знаний поменялась, пока ответ генерировался
+    cache.invalidate()
+    cache.put("what stack", [1.0, 0.0], "old answer", epoch=epoch)
+    assert cache.get([1.0, 0.0]) is None
+    assert cache.stats()["stale_puts"] == 1
+
+
+def test_put_in_current_epoch_is_kept():
+    cache = SemanticAnswerCache(threshold=0.9, ttl=60, max_size=10)
+    cache.invalidate()
+    cache.put("what stack", [1.0, 0.0], "fresh answer", epoch=cache.epoch)
+    assert cache.get([1.0, 0.0]) == "fresh answer"
+    assert cache.get_exact("what stack") == "fresh answer"
+
+
+def test_pinned_entries_survive_eviction_but_not_invalidate():
+    cache = SemanticAnswerCache(threshold=0.9, ttl=60, max_size=1)
+    cache.put("faq", [1.0, 0.0], "pinned", pinned=True)
+    cache.put("a", [0.0, 1.0], "first")
+    cache.put("b", [0.6, 0.8], "second")
+    assert cache.get_exact("faq") == "pinned"
+    cache.invalidate()
+    assert cache.get_exact("faq") is None
+
+
+def test_warm_up_does_not_pin_answers_from_before_invalidate(monkeypatch):
+    import asyncio
+
+    from app.services import rag
+
+    cache = SemanticAnswerCache(threshold=0.9, ttl=60, max_size=10)
+    monkeypatch.setattr(rag, "answer_cache", cache)
+
+    async def prepare_query(question, db):
+        return question, [1.0, 0.0], None, "prompt", []
+
+    async def generate_answer(prompt):
+        # Пока LLM отвечает, база знаний обновилась
+        cache.invalidate()
+        return "stale"
+
+    monkeypatch.setattr(rag, "_prepare_query", prepare_query)
+    monkeypatch.setattr(rag, "_generate_answer", generate_answer)
+
+    warmed = asyncio.run(rag.warm_up_faq(None, ["faq"]))
+    assert warmed == 0
+    assert cache.get_exact("faq") is None
+
+
+def test_faq_warm_up_is_debounced(monkeypatch):
+    import asyncio
+
+    from app.services import rag
+
+    class DummySession:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *exc):
+            return False
+
+    calls = []
+
+    async def warm_up_faq(db):
+        calls.append(db)
+
+    monkeypatch.setattr(rag.settings, "RAG_FAQ_QUESTIONS", ["faq"])
+    monkeypatch.setattr(rag, "SessionLocal", DummySession)
+    monkeypatch.setattr(rag, "warm_up_faq", warm_up_faq)
+
+    async def run():
+        # Серия правок базы знаний подряд
+        for _ in range(5):
+            rag.schedule_faq_warm_up(delay=0.01)
+        await rag._faq_warm_up_task
+        rag.schedule_faq_warm_up(delay=0)
+        await rag._faq_warm_up_task
+
+    asyncio.run(run())
+    assert len(calls) == 2
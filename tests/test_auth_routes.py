@@ -0,0 +1,10 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def test_rag_and_cache_stats_require_auth():
+    client = TestClient(app)
+    for method, path in [("post", "/api/rag/ask"), ("post", "/api/rag/ask/stream"), ("get", "/api/rag/stats"), ("get", "/api/rag/metrics"), ("get", "/cache/stats")]:
+        response = client.request(method, path, json={"question": "hi"})
+        assert response.status_code == 401, path
@@ -0,0 +1,59 @@
+from langchain.docstore.document import Document
+
+from app.services.chunking import estimate_tokens, pack_context, split_documents
+
+
+def _doc(doc_id: str, text: str) -> Document:
+    return Document(page_content=text, metadata={"doc_id": doc_id})
+
+
+def test_short_document_is_kept_whole():
+    chunks = split_documents([_doc("skill:1", "Python\nУверенно пишу на Python")], chunk_tokens=50, overlap_tokens=10)
+    assert len(chunks) == 1
+    assert chunks[0].page_content == "Python\nУверенно пишу на Python"
+    assert chunks[0].metadata == {"doc_id": "skill:1", "parent_id": "skill:1"}
+
+
+def test_long_document_is_split_with_header_and_overlap():
+    words = [f"word{i}" for i in range(200)]
+    doc = _doc("blog_post:3", "Заголовок поста\n" + " ".join(words))
+    chunks = split_documents([doc], chunk_tokens=50, overlap_tokens=10)
+
+    assert len(chunks) > 1
+    assert [c.metadata["doc_id"] for c in chunks] == [f"blog_post:3#{i}" for i in range(len(chunks))]
+    assert all(c.metadata["parent_id"] == "blog_post:3" for c in chunks)
+    bodies = []
+    for chunk in chunks:
+        header, _, body = chunk.page_content.partition("\n")
+        assert header == "Заголовок поста"
+        # Слова не режутся пополам, а тело влезает в окно чанка
+        assert all(word in words for word in body.split())
+        assert len(body) <= 50 * 4
+        bodies.append(body.split())
+    # Соседние чанки перекрываются, и вместе покрывают весь текст по порядку
+    for prev, cur in zip(bodies, bodies[1:]):
+        assert cur[0] in prev
+    covered = []
+    for body in bodies:
+        covered.extend(w for w in body if w not in covered)
+    assert covered == words
+
+
+def test_pack_context_skips_near_duplicates():
+    text = "Сервис для учёта заказов на FastAPI с PostgreSQL и очередью задач на Celery"
+    docs = [
+        _doc("project:1", text),
+        _doc("blog_post:1", text + " подробнее"),
+        _doc("skill:1", "Docker и Kubernetes в продакшене"),
+    ]
+    packed = pack_context(docs, token_budget=1000)
+    assert [d.metadata["doc_id"] for d in packed] == ["project:1", "skill:1"]
+
+
+def test_pack_context_respects_budget_but_keeps_shorter_documents():
+    big = _doc("project:1", "x " * 400)
+    small = _doc("skill:1", "Python и FastAPI")
+    first = _doc("skill:2", "Опыт работы с PostgreSQL")
+    budget = estimate_tokens(first.page_content) + estimate_tokens(small.page_content)
+    packed = pack_context([first, big, small], token_budget=budget)
+    assert [d.metadata["doc_id"] for d in packed] == ["skill:2", "skill:1"]
@@ -0,0 +1,52 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.dao import base_dao
+from app.dao.events import add_change_listener, remove_change_listener
+from app.dao.models_dao import TagDAO
+
+
+class FakeSession:
+    """Выполняет INSERT ... RETURNING: отдаёт вставленные строки с новыми id."""
+
+    def __init__(self):
+        self.batches = []
+        self.commits = 0
+
+    async def execute(self, query):
+        params = query.compile().params
+        batch = [params[f"tag_name_m{i}"] for i in range(len(params))]
+        self.batches.append(batch)
+        start = sum(len(b) for b in self.batches[:-1])
+        rows = [{"id": start + i + 1, "tag_name": name} for i, name in enumerate(batch)]
+        items = [SimpleNamespace(**row, _mapping=row) for row in rows]
+        return SimpleNamespace(fetchall=lambda: items)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def test_create_many_batches_by_parameter_limit(monkeypatch):
+    monkeypatch.setattr(base_dao, "MAX_INSERT_PARAMS", 4)
+    db = FakeSession()
+    events = []
+    listener = lambda table, action, rows: events.append((table, action, [row["id"] for row in rows]))
+    add_change_listener(listener)
+    try:
+        names = [f"tag{i}" for i in range(10)]
+        created = asyncio.run(TagDAO.create_many(db, [{"tag_name": name} for name in names]))
+    finally:
+        remove_change_listener(listener)
+
+    # 10 строк по одному параметру при лимите 4 — три INSERT, но один commit и одно событие
+    assert [len(batch) for batch in db.batches] == [4, 4, 2]
+    assert [row.tag_name for row in created] == names
+    assert [row.id for row in created] == list(range(1, 11))
+    assert db.commits == 1
+    assert events == [("tags", "create", list(range(1, 11)))]
+
+
+def test_create_many_of_nothing_does_not_touch_db():
+    db = FakeSession()
+    assert asyncio.run(TagDAO.create_many(db, [])) == []
+    assert db.batches == [] and db.commits == 0
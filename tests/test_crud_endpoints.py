@@ -0,0 +1,81 @@
+import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import get_current_user
+from app.database import get_db
+from app.main import app
+
+
+class FakeSession:
+    """Отдаёт одну и ту же строку (или None) на любой запрос и считает запросы и commit."""
+
+    def __init__(self, row):
+        self.row = row
+        self.queries = []
+        self.commits = 0
+
+    async def execute(self, query):
+        self.queries.append(query)
+        rows = [self.row] if self.row is not None else []
+        return SimpleNamespace(first=lambda: self.row, fetchall=lambda: rows)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _post(**values):
+    now = datetime.datetime(2026, 1, 1)
+    data = {"id": 1, "user_id": 1, "title": "Title", "content": "Text", "summary": None,
+            "created_at": now, "updated_at": now, **values}
+    # Как у Row: атрибуты для схемы ответа и _mapping для событий изменений
+    return SimpleNamespace(**data, _mapping=data)
+
+
+@pytest.fixture
+def client_with():
+    def make(row):
+        db = FakeSession(row)
+
+        async def override_db():
+            yield db
+
+        app.dependency_overrides[get_db] = override_db
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(username="admin")
+        return TestClient(app), db
+
+    yield make
+    app.dependency_overrides.clear()
+
+
+def test_update_with_empty_body_of_missing_post_is_404(client_with):
+    client, db = client_with(None)
+    response = client.put("/api/blog_posts/999", json={})
+    assert response.status_code == 404
+    assert len(db.queries) == 1 and db.commits == 0
+
+
+def test_update_of_missing_post_is_404(client_with):
+    client, db = client_with(None)
+    response = client.put("/api/blog_posts/999", json={"title": "New"})
+    assert response.status_code == 404
+    assert db.commits == 0
+
+
+def test_update_returns_row_from_returning(client_with):
+    client, db = client_with(_post(title="New"))
+    response = client.put("/api/blog_posts/1", json={"title": "New"})
+    assert response.status_code == 200
+    assert response.json()["title"] == "New" and response.json()["id"] == 1
+    # UPDATE ... RETURNING одним запросом, без повторного SELECT
+    assert len(db.queries) == 1 and db.queries[0].is_update and db.commits == 1
+
+
+def test_delete_missing_and_existing_post(client_with):
+    client, db = client_with(None)
+    assert client.delete("/api/blog_posts/999").status_code == 404
+    client, db = client_with(_post())
+    assert client.delete("/api/blog_posts/1").status_code == 204
+    assert len(db.queries) == 1 and db.queries[0].is_delete and db.commits == 1
@@ -0,0 +1,151 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.dao import base_dao
+from app.dao.cache import DAOCache, MemoryCacheBackend
+from app.dao.models_dao import SkillDAO
+
+
+class FakeSession:
+    """Считает запросы и отдаёт строки с id 1..rows."""
+
+    def __init__(self, rows: int):
+        self.rows = rows
+        self.queries = 0
+
+    async def execute(self, query):
+        self.queries += 1
+        items = [SimpleNamespace(id=i) for i in range(1, self.rows + 1)]
+        return SimpleNamespace(fetchall=lambda: items, first=lambda: items[0] if items else None)
+
+
+def test_first_page_is_cached_and_invalidated_on_change(monkeypatch):
+    cache = DAOCache(MemoryCacheBackend(ttl=60, max_size=100))
+    monkeypatch.setattr(base_dao, "dao_cache", cache)
+    db = FakeSession(rows=3)
+
+    async def main():
+        first = await SkillDAO.get_page(db, 2, user_id=1)
+        again = await SkillDAO.get_page(db, 2, user_id=1)
+        assert [item.id for item in again[0]] == [1, 2] and again[1] == first[1]
+        assert db.queries == 1
+
+        # Другие limit/fields/фильтры — другие ключи
+        await SkillDAO.get_page(db, 2, fields=["skill_name"], user_id=1)
+        await SkillDAO.get_page(db, 2, user_id=2)
+        assert db.queries == 3
+
+        # Следующие страницы не кэшируются
+        await SkillDAO.get_page(db, 2, after=first[1], user_id=1)
+        await SkillDAO.get_page(db, 2, after=first[1], user_id=1)
+        assert db.queries == 5
+
+        cache.on_change(SkillDAO.model.__tablename__, "create", [{"id": 4}])
+        await SkillDAO.get_page(db, 2, user_id=1)
+        await SkillDAO.get_page(db, 2, user_id=2)
+        assert db.queries == 7
+
+    asyncio.run(main())
+    assert cache.stats()["hits"] == 1
+
+
+def test_changes_in_other_tables_keep_pages():
+    cache = DAOCache(MemoryCacheBackend(ttl=60, max_size=100))
+    backend = cache.backend
+
+    async def main():
+        await backend.set("skills:page:20:*:user_id=1", ([], None))
+        cache.on_change("projects", "update", [{"id": 1}])
+        return await cache.get_or_load("skills", "page:20:*:user_id=1", lambda: None)
+
+    assert asyncio.run(main()) == ([], None)
+
+
+def test_write_through_dao_invalidates_cached_reads(monkeypatch):
+    from app.dao.events import add_change_listener, remove_change_listener
+
+    cache = DAOCache(MemoryCacheBackend(ttl=60, max_size=100))
+    monkeypatch.setattr(base_dao, "dao_cache", cache)
+    add_change_listener(cache.on_change)
+    db = FakeSession(rows=2)
+
+    async def main():
+        await SkillDAO.get_page(db, 10, user_id=1)
+        await SkillDAO.get_by_id(db, 1)
+        assert db.queries == 2
+        # Событие об изменении строки, как после commit в DAO.update
+        SkillDAO.notify_change("update", [{"id": 1, "user_id": 1}])
+        await SkillDAO.get_page(db, 10, user_id=1)
+        await SkillDAO.get_by_id(db, 1)
+        assert db.queries == 4
+
+    try:
+        asyncio.run(main())
+    finally:
+        remove_change_listener(cache.on_change)
+
+
+def test_read_racing_a_write_is_not_cached():
+    cache = DAOCache(MemoryCacheBackend(ttl=60, max_size=100))
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        # Пока читали старую строку, другой запрос записал новую
+        cache.on_change("skills", "update", [{"id": 1}])
+        return "stale"
+
+    async def main():
+        await cache.get_or_load("skills", "id:1", load)
+        await cache.get_or_load("skills", "id:1", load)
+
+    asyncio.run(main())
+    assert loads == 2
+
+
+def test_reads_inside_transaction_bypass_cache(monkeypatch):
+    from app.dao.uow import transaction
+
+    cache = DAOCache(MemoryCacheBackend(ttl=60, max_size=100))
+    monkeypatch.setattr(base_dao, "dao_cache", cache)
+    db = FakeSession(rows=2)
+
+    async def rollback():
+        pass
+
+    db.commit = db.rollback = rollback
+
+    async def main():
+        try:
+            async with transaction(db):
+                await SkillDAO.get_by_id(db, 1)
+                raise RuntimeError("sync failed")
+        except RuntimeError:
+            pass
+        # Строка, прочитанная в откатанной транзакции, в кэш не попала
+        assert cache.backend.stats()["size"] == 0
+        await SkillDAO.get_by_id(db, 1)
+        await SkillDAO.get_by_id(db, 1)
+        assert db.queries == 2
+
+    asyncio.run(main())
+
+
+def test_missing_rows_are_not_cached(monkeypatch):
+    import pytest
+    from fastapi import HTTPException
+
+    cache = DAOCache(MemoryCacheBackend(ttl=60, max_size=100))
+    monkeypatch.setattr(base_dao, "dao_cache", cache)
+    db = FakeSession(rows=0)
+
+    async def main():
+        with pytest.raises(HTTPException):
+            await SkillDAO.get_by_id(db, 5)
+        # Строку создали в другом процессе — второе чтение должно дойти до БД
+        db.rows = 5
+        return await SkillDAO.get_by_id(db, 5)
+
+    assert asyncio.run(main()) is not None
+    assert db.queries == 2
@@ -0,0 +1,39 @@
+import numpy as np
+
+from app.services.embedding_cache import CachedEmbeddings
+from app.services.embeddings import LocalHashEmbeddings
+
+
+def test_two_writers_share_cache_without_mixing_rows(tmp_path):
+    provider = LocalHashEmbeddings(dim=16)
+    # Два экземпляра на одном каталоге — как API и бот
+    api = CachedEmbeddings(provider, str(tmp_path))
+    bot = CachedEmbeddings(provider, str(tmp_path))
+
+    api.embed_documents(["alpha", "beta"])
+    bot.embed_documents(["gamma", "delta"])
+    api.embed_documents(["epsilon"])
+
+    fresh = CachedEmbeddings(provider, str(tmp_path))
+    texts = ["alpha", "beta", "gamma", "delta", "epsilon"]
+    assert np.allclose(fresh.embed_documents(texts), provider.embed_documents(texts))
+    assert fresh.misses == 0
+
+
+def test_dimension_change_drops_cache(tmp_path):
+    narrow = CachedEmbeddings(LocalHashEmbeddings(dim=8), str(tmp_path), model_name="same-model")
+    narrow.embed_documents(["alpha"])
+
+    wide_provider = LocalHashEmbeddings(dim=16)
+    wide = CachedEmbeddings(wide_provider, str(tmp_path), model_name="same-model")
+    vectors = wide.embed_documents(["alpha", "beta"])
+    assert [len(vector) for vector in vectors] == [16, 16]
+    assert np.allclose(vectors, wide_provider.embed_documents(["alpha", "beta"]))
+
+
+def test_models_use_separate_directories(tmp_path):
+    CachedEmbeddings(LocalHashEmbeddings(dim=8), str(tmp_path)).embed_documents(["alpha"])
+    wide_provider = LocalHashEmbeddings(dim=16)
+    vectors = CachedEmbeddings(wide_provider, str(tmp_path)).embed_documents(["alpha"])
+    assert len(vectors[0]) == 16
+    assert len(list(tmp_path.iterdir())) == 2
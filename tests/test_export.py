@@ -0,0 +1,104 @@
+import asyncio
+import csv
+import datetime
+import gzip
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import get_current_user
+from app.endpoints import exports
+from app.main import app
+from app.services.export import encode_rows
+
+ROWS = [
+    {"id": 1, "input_text": "привет", "timings": {"llm": 1.5}, "created_at": datetime.datetime(2026, 1, 1, 12, 0)},
+    {"id": 2, "input_text": "a,b", "timings": None, "created_at": datetime.datetime(2026, 1, 2, 12, 0)},
+]
+COLUMNS = ["id", "input_text", "timings", "created_at"]
+
+
+async def _aiter(rows):
+    for row in rows:
+        yield row
+
+
+def _collect(fmt, rows=ROWS, **kwargs) -> bytes:
+    async def main():
+        return [chunk async for chunk in encode_rows(_aiter(rows), fmt, COLUMNS, **kwargs)]
+
+    return b"".join(asyncio.run(main()))
+
+
+def test_ndjson_rows():
+    lines = _collect("ndjson").decode("utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"id": 1, "input_text": "привет", "timings": {"llm": 1.5}, "created_at": "2026-01-01T12:00:00"},
+        {"id": 2, "input_text": "a,b", "timings": None, "created_at": "2026-01-02T12:00:00"},
+    ]
+
+
+def test_csv_rows_and_empty_header():
+    rows = list(csv.reader(io.StringIO(_collect("csv").decode("utf-8"))))
+    assert rows == [COLUMNS, ["1", "привет", '{"llm": 1.5}', "2026-01-01T12:00:00"], ["2", "a,b", "", "2026-01-02T12:00:00"]]
+    assert _collect("csv", rows=[]).decode("utf-8").strip() == ",".join(COLUMNS)
+
+
+def test_gzip_and_chunking_keep_content():
+    many = [{**ROWS[0], "id": i} for i in range(500)]
+
+    async def main():
+        return [chunk async for chunk in encode_rows(_aiter(many), "ndjson", COLUMNS, chunk_bytes=1024)]
+
+    chunks = asyncio.run(main())
+    assert len(chunks) > 10 and all(len(chunk) < 2048 for chunk in chunks)
+    assert gzip.decompress(_collect("ndjson", rows=many, gzip=True, chunk_bytes=1024)) == b"".join(chunks)
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+    async def stream(self, query):
+        self.queries.append(query)
+        return _aiter(self.rows)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    session = FakeSession([SimpleNamespace(_mapping={"id": 1, "input_text": "q", "prediction": "a", "message_id": None, "created_at": None, "timings": None})])
+    monkeypatch.setattr(exports, "SessionLocal", lambda: session)
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(username="admin")
+    yield TestClient(app), session
+    app.dependency_overrides.clear()
+
+
+def test_export_endpoint_streams_gzip_with_yield_per(client):
+    client, session = client
+    response = client.get("/api/export/ml_predictions", params={"format": "ndjson", "gzip": "true", "since": "2026-01-01T00:00:00"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"].endswith('.ndjson.gz"')
+    body = response.content
+    assert json.loads(gzip.decompress(body))["input_text"] == "q"
+    (query,) = session.queries
+    assert query.get_execution_options()["yield_per"] == exports.settings.EXPORT_BATCH_SIZE
+    assert "mlpredictions.created_at >=" in str(query)
+    assert session.closed
+
+
+def test_export_endpoint_rejects_unknown_dataset_and_format(client):
+    client, _ = client
+    assert client.get("/api/export/users").status_code == 404
+    assert client.get("/api/export/messages", params={"format": "xml"}).status_code == 400
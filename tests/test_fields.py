@@ -0,0 +1,96 @@
+import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.auth import get_current_user
+from app.dao import base_dao
+from app.dao.cache import DAOCache, MemoryCacheBackend
+from app.database import get_db
+from app.main import app
+from app.schemas.fields import parse_fields
+from app.schemas.users import UserResponse
+
+
+def test_parse_fields_keeps_order_and_drops_duplicates():
+    assert parse_fields("email, username,email", UserResponse) == ["email", "username"]
+    assert parse_fields(None, UserResponse) is None
+
+
+def test_password_hash_cannot_be_requested():
+    with pytest.raises(HTTPException) as error:
+        parse_fields("username,password_hash", UserResponse)
+    assert error.value.status_code == 400
+    assert "password_hash" not in UserResponse.model_fields
+
+
+class FakeSession:
+    """Запоминает запросы и отдаёт строки, обрезанные до выбранных в SELECT колонок."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def execute(self, query):
+        self.queries.append(query)
+        columns = [column.name for column in query.selected_columns]
+        items = [SimpleNamespace(**{name: row[name] for name in columns}) for row in self.rows]
+        return SimpleNamespace(fetchall=lambda: items)
+
+
+@pytest.fixture
+def client_with(monkeypatch):
+    monkeypatch.setattr(base_dao, "dao_cache", DAOCache(MemoryCacheBackend(ttl=60, max_size=100)))
+
+    def make(rows):
+        db = FakeSession(rows)
+
+        async def override_db():
+            yield db
+
+        app.dependency_overrides[get_db] = override_db
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(username="admin")
+        return TestClient(app), db
+
+    yield make
+    app.dependency_overrides.clear()
+
+
+_PROJECT = {"id": 1, "user_id": 1, "title": "Portfolio", "description": "Длинное описание " * 50,
+            "image_url": None, "project_url": "https://example.com", "date_completed": datetime.date(2026, 1, 1)}
+_POST = {"id": 2, "user_id": 1, "title": "Заметка", "content": "Текст " * 200, "summary": "Кратко",
+         "created_at": datetime.datetime(2026, 1, 1), "updated_at": datetime.datetime(2026, 1, 1)}
+
+
+@pytest.mark.parametrize("path, row, fields", [
+    ("/api/projects/1", _PROJECT, ["title", "project_url"]),
+    ("/api/blog_posts/1", _POST, ["title", "summary"]),
+])
+def test_list_endpoint_selects_only_requested_columns(client_with, path, row, fields):
+    client, db = client_with([row])
+    response = client.get(path, params={"fields": ",".join(fields)})
+    assert response.status_code == 200
+    # id отдаётся всегда: он нужен курсору
+    assert response.json() == [{name: row[name] for name in ["id", *fields]}]
+    assert [column.name for column in db.queries[0].selected_columns] == ["id", *fields]
+
+
+def test_list_endpoint_without_fields_returns_full_rows(client_with):
+    client, db = client_with([_PROJECT])
+    response = client.get("/api/projects/1")
+    assert response.status_code == 200
+    assert set(response.json()[0]) == set(_PROJECT)
+
+
+@pytest.mark.parametrize("path, fields", [
+    ("/api/projects/1", "title,secret"),
+    # name есть в SkillResponse, но колонка в таблице называется skill_name
+    ("/api/skills/1", "name"),
+])
+def test_unknown_fields_are_400_without_query(client_with, path, fields):
+    client, db = client_with([])
+    response = client.get(path, params={"fields": fields})
+    assert response.status_code == 400
+    assert db.queries == []
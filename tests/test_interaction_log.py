@@ -0,0 +1,81 @@
+import asyncio
+
+from app.services.interaction_log import InteractionWriteBehind
+
+
+def _log(**kwargs):
+    log = InteractionWriteBehind(**{"batch_size": 100, "flush_interval": 10.0, "max_pending": 100, **kwargs})
+    log.batches = []
+
+    async def write(batch):
+        log.batches.append([item["message"]["message"] for item in batch])
+
+    log._write = write
+    return log
+
+
+def test_flush_when_batch_is_full():
+    log = _log(batch_size=3)
+
+    async def main():
+        for i in range(3):
+            log.log(f"q{i}", "a")
+        await asyncio.sleep(0.01)
+        assert log.batches == [["q0", "q1", "q2"]]
+        await log.stop()
+
+    asyncio.run(main())
+    assert log.stats()["flushed"] == 3
+
+
+def test_flush_after_interval():
+    log = _log(flush_interval=0.02)
+
+    async def main():
+        log.log("q", "a")
+        await asyncio.sleep(0.005)
+        assert log.batches == []
+        await asyncio.sleep(0.05)
+        assert log.batches == [["q"]]
+        await log.stop()
+
+    asyncio.run(main())
+
+
+def test_stop_flushes_remaining_records():
+    log = _log()
+
+    async def main():
+        log.log("q1", "a")
+        log.log("q2", "a")
+        await log.stop()
+
+    asyncio.run(main())
+    assert log.batches == [["q1", "q2"]]
+    assert log.stats()["pending"] == 0
+
+
+def test_failed_batch_is_requeued_and_buffer_is_capped():
+    log = _log(max_pending=3)
+    attempts = []
+
+    async def failing_write(batch):
+        attempts.append(len(batch))
+        raise ConnectionError("database is down")
+
+    log._write = failing_write
+
+    async def main():
+        log.log("q1", "a")
+        log.log("q2", "a")
+        assert await log.flush() is False
+        # Пакет вернулся в буфер, новые записи вытесняют самые старые
+        log.log("q3", "a")
+        log.log("q4", "a")
+        assert [item["message"]["message"] for item in log._pending] == ["q2", "q3", "q4"]
+        log._task.cancel()
+
+    asyncio.run(main())
+    stats = log.stats()
+    assert attempts == [2]
+    assert stats["pending"] == 3 and stats["dropped"] == 1 and stats["failed"] == 2
@@ -0,0 +1,55 @@
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+from app.services import rag
+
+
+class FakeSession:
+    """Запоминает запросы и отдаёт пары (source, data), как UNION ALL-запрос базы знаний."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def execute(self, query):
+        self.queries.append(str(query.compile(dialect=postgresql.dialect())))
+        return iter(self.rows)
+
+
+def test_knowledge_base_is_loaded_in_one_query():
+    db = FakeSession([
+        ("project", {"id": 1, "title": "Portfolio", "description": None, "project_url": None, "date_completed": None}),
+        ("project", {"id": 2, "title": "Bot", "description": "Telegram", "project_url": None, "date_completed": None}),
+        ("project_tag", {"project_id": 1, "tag_name": "python"}),
+        ("project_tag", {"project_id": 1, "tag_name": "fastapi"}),
+        ("skill", {"id": 5, "skill_name": "Python", "description": None, "proficiency_level": 5}),
+    ])
+    documents = asyncio.run(rag.load_knowledge_base(db))
+
+    assert len(db.queries) == 1
+    assert db.queries[0].count("UNION ALL") == len(rag.KNOWLEDGE_SOURCES)
+    by_id = {doc.metadata["doc_id"]: doc.page_content for doc in documents}
+    assert list(by_id) == ["project:1", "project:2", "skill:5"]
+    # Теги собираются по project_id, проекту без тегов достаётся заглушка
+    assert by_id["project:1"].endswith("Tags: python, fastapi")
+    assert by_id["project:2"].endswith("Tags: No tags")
+
+
+def test_partial_load_reads_only_requested_rows():
+    db = FakeSession([])
+    rows = asyncio.run(rag.fetch_knowledge_rows(db, ids={"skill": {5, 7}}))
+    query = db.queries[0]
+    assert "FROM skills" in query and "projecttags" not in query and "UNION ALL" not in query
+    assert "skills.id IN" in query
+    assert set(rows) == {*rag.KNOWLEDGE_SOURCES, "project_tag"} and not any(rows.values())
+
+    db = FakeSession([])
+    asyncio.run(rag.fetch_knowledge_rows(db, ids={"project": {1}}))
+    # Вместе с проектами подгружаются только их теги
+    assert db.queries[0].count("UNION ALL") == 1
+    assert "projecttags.project_id IN" in db.queries[0]
+
+
+def test_ids_by_source_groups_doc_ids():
+    assert rag._ids_by_source({"project:1", "project:3", "skill:2"}) == {"project": {1, 3}, "skill": {2}}
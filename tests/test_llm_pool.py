@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from app.services.llm_pool import LLMBusyError, LLMDeadlineExceeded, LLMPool
+
+
+def test_burst_in_one_tick_is_shed():
+    pool = LLMPool(max_concurrency=2, max_queue=1, queue_timeout=1.0)
+
+    async def call():
+        async with pool.slot():
+            await asyncio.sleep(0.01)
+
+    async def main():
+        # Все десять вызовов стартуют в одном тике цикла событий
+        return await asyncio.gather(*[call() for _ in range(10)], return_exceptions=True)
+
+    results = asyncio.run(main())
+    rejected = [result for result in results if isinstance(result, LLMBusyError)]
+    assert len(rejected) == 7
+    assert pool.stats()["completed"] == 3
+    assert pool.stats()["active"] == 0 and pool.stats()["waiting"] == 0
+
+
+def test_queue_timeout_rejects_waiter():
+    pool = LLMPool(max_concurrency=1, max_queue=1, queue_timeout=0.01)
+
+    async def call(duration):
+        async with pool.slot():
+            await asyncio.sleep(duration)
+
+    async def main():
+        return await asyncio.gather(call(0.1), call(0), return_exceptions=True)
+
+    first, second = asyncio.run(main())
+    assert first is None
+    assert isinstance(second, LLMBusyError)
+    assert pool.stats()["timed_out"] == 1
+
+
+def test_deadline_cancels_attempts_and_frees_slots():
+    pool = LLMPool(max_concurrency=2, max_queue=0, queue_timeout=1.0)
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def main():
+        with pytest.raises(LLMDeadlineExceeded):
+            await pool.call(slow, deadline=0.05, hedge_delay=0.01)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    stats = pool.stats()
+    assert stats["hedged"] == 1 and stats["deadline_exceeded"] == 1
+    assert stats["active"] == 0
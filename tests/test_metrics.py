@@ -0,0 +1,46 @@
+import random
+
+from app.services.metrics import LatencyHistogram, StageMetrics
+
+
+def test_nearest_rank_percentiles():
+    histogram = LatencyHistogram()
+    values = list(range(1, 101))
+    random.Random(0).shuffle(values)
+    for value in values:
+        histogram.record(float(value))
+    assert histogram.percentile(0.5) == 50
+    assert histogram.percentile(0.95) == 95
+    assert histogram.percentile(0.07) == 7
+    assert histogram.snapshot() == {
+        "count": 100, "mean_ms": 50.5, "p50_ms": 50, "p95_ms": 95, "p99_ms": 99, "max_ms": 100
+    }
+
+
+def test_window_keeps_latest_samples_but_counts_all():
+    histogram = LatencyHistogram(max_samples=10)
+    for value in range(1, 21):
+        histogram.record(float(value))
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 20
+    assert snapshot["mean_ms"] == 10.5
+    # Перцентили считаются по последним 10 замерам (11..20)
+    assert snapshot["p50_ms"] == 15
+    assert LatencyHistogram().snapshot() == {"count": 0}
+
+
+def test_stage_percentile_and_collect():
+    metrics = StageMetrics()
+    assert metrics.percentile("llm.attempt", 0.95) is None
+    with metrics.collect() as timings:
+        metrics.record("llm.attempt", 100.0)
+        metrics.record("llm.attempt", 300.0)
+        metrics.record("query.embed", 5.0)
+    metrics.record("llm.attempt", 200.0)
+
+    # В тайминги запроса попадают только замеры внутри collect(), повторы стадии суммируются
+    assert timings == {"llm.attempt": 400.0, "query.embed": 5.0}
+    assert metrics.percentile("llm.attempt", 0.95, min_samples=4) is None
+    assert metrics.percentile("llm.attempt", 0.95, min_samples=3) == 300
+    assert metrics.percentile("llm.attempt", 0.5) == 200
+    assert list(metrics.snapshot()) == ["llm.attempt", "query.embed"]
@@ -0,0 +1,91 @@
+import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.dao import base_dao
+from app.dao.cache import DAOCache, MemoryCacheBackend
+from app.dao.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.auth import get_current_user
+from app.database import get_db
+from app.main import app
+
+
+class FakeTable:
+    """Выполняет keyset-запрос get_page над списком строк: фильтр, id > курсора, ORDER BY id, LIMIT."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def execute(self, query):
+        self.queries.append(query)
+        params = query.compile().params
+        columns = [column.name for column in query.selected_columns]
+        items = sorted(
+            (row for row in self.rows
+             if row["user_id"] == params["user_id_1"] and row["id"] > params.get("id_1", 0)),
+            key=lambda row: row["id"]
+        )[:params["param_1"]]
+        items = [SimpleNamespace(**{name: row[name] for name in columns}) for row in items]
+        return SimpleNamespace(fetchall=lambda: items)
+
+
+def _education(id_, user_id):
+    return {"id": id_, "user_id": user_id, "institution": "МГУ", "degree": f"degree {id_}",
+            "field_of_study": None, "start_date": datetime.datetime(2020, 9, 1), "end_date": None}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(base_dao, "dao_cache", DAOCache(MemoryCacheBackend(ttl=60, max_size=100)))
+    db = FakeTable([_education(i, user_id=1 if i % 3 else 2) for i in range(1, 13)])
+
+    async def override_db():
+        yield db
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(username="admin")
+    yield TestClient(app), db
+    app.dependency_overrides.clear()
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+    assert "=" not in encode_cursor(1)
+
+
+def test_pages_follow_next_cursor_header(client):
+    client, db = client
+    ids, after, pages = [], None, 0
+    while True:
+        params = {"limit": 3, **({"after": after} if after else {})}
+        response = client.get("/api/education/1", params=params)
+        assert response.status_code == 200
+        ids.extend(item["id"] for item in response.json())
+        pages += 1
+        after = response.headers.get(NEXT_CURSOR_HEADER)
+        if after is None:
+            break
+        assert decode_cursor(after) == ids[-1]
+    # Все записи пользователя 1 по порядку, без пропусков и повторов
+    assert ids == [1, 2, 4, 5, 7, 8, 10, 11]
+    assert pages == 3
+    # На каждую страницу один запрос, без COUNT
+    assert len(db.queries) == 3
+
+
+def test_exact_last_page_has_no_cursor(client):
+    client, _ = client
+    response = client.get("/api/education/1", params={"limit": 8})
+    assert len(response.json()) == 8
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor("7")])
+def test_invalid_cursor_is_400(client, cursor):
+    client, db = client
+    response = client.get("/api/education/1", params={"after": cursor})
+    assert response.status_code == 400
+    assert db.queries == []
@@ -0,0 +1,72 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.dao.events import add_change_listener, remove_change_listener
+from app.dao.models_dao import ProjectDAO
+
+
+class FakeSession:
+    """Запоминает запросы и отдаёт заранее заданные строки RETURNING."""
+
+    def __init__(self, returned):
+        self.returned = returned
+        self.queries = []
+        self.commits = 0
+
+    async def execute(self, query):
+        self.queries.append(query)
+        return SimpleNamespace(fetchall=lambda: self.returned)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _project(url: str, title: str) -> dict:
+    return {"user_id": 1, "title": title, "description": None, "project_url": url}
+
+
+def test_upsert_splits_inserted_updated_and_unchanged():
+    # Из трёх проектов PostgreSQL вернул два: вставленный (xmax = 0) и обновлённый;
+    # третий не изменился, WHERE IS DISTINCT FROM его отфильтровал
+    db = FakeSession([SimpleNamespace(id=10, inserted=True), SimpleNamespace(id=11, inserted=False)])
+    events = []
+    listener = lambda table, action, rows: events.append((table, action, [row["id"] for row in rows]))
+    add_change_listener(listener)
+    try:
+        stats = asyncio.run(ProjectDAO.upsert_many(db, [
+            _project("https://github.com/u/a", "a"),
+            _project("https://github.com/u/b", "b"),
+            _project("https://github.com/u/c", "c"),
+        ]))
+    finally:
+        remove_change_listener(listener)
+
+    assert stats == {"inserted": 1, "updated": 1, "unchanged": 1}
+    assert events == [("projects", "create", [10]), ("projects", "update", [11])]
+    assert db.commits == 1
+
+
+def test_upsert_statement_skips_unchanged_rows_and_reports_inserts():
+    db = FakeSession([])
+    asyncio.run(ProjectDAO.upsert_many(db, [
+        _project("https://github.com/u/a", "old"),
+        _project("https://github.com/u/a", "new"),
+    ]))
+    (query,) = db.queries
+    compiled = query.compile(dialect=postgresql.dialect())
+    sql = " ".join(str(compiled).split())
+
+    assert "ON CONFLICT (project_url) DO UPDATE SET" in sql
+    assert "projects.title IS DISTINCT FROM excluded.title" in sql
+    assert "project_url IS DISTINCT FROM" not in sql
+    assert "RETURNING projects.id, xmax = 0 AS inserted" in sql
+    # Дубль project_url в пачке схлопнут до последнего варианта
+    assert [value for key, value in compiled.params.items() if key.startswith("title")] == ["new"]
+
+
+def test_upsert_of_nothing_does_not_touch_database():
+    db = FakeSession([])
+    assert asyncio.run(ProjectDAO.upsert_many(db, [])) == {"inserted": 0, "updated": 0, "unchanged": 0}
+    assert db.queries == [] and db.commits == 0
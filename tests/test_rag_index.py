@@ -0,0 +1,94 @@
+import asyncio
+import os
+import threading
+
+from langchain.docstore.document import Document
+
+from app.services.embeddings import LocalHashEmbeddings
+from app.services.rag import RAGIndex
+
+
+def _doc(doc_id: str, text: str) -> Document:
+    return Document(page_content=text, metadata={"doc_id": doc_id, "parent_id": doc_id, "entities": []})
+
+
+def _corpus(prefix: str, count: int):
+    return [_doc(f"{prefix}:{i}", f"{prefix} document number {i} about python and fastapi") for i in range(count)]
+
+
+def test_search_is_safe_during_changes(tmp_path):
+    index = RAGIndex(str(tmp_path), embeddings=LocalHashEmbeddings(dim=64), store="numpy")
+    base = _corpus("skill", 200)
+    index._apply_changes(base)
+    query = index.embeddings.embed_query("python document")
+    errors = []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            try:
+                assert len(index.search_by_vector_sync(query, k=5)) > 0
+            except Exception as e:
+                errors.append(e)
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    try:
+        for round_ in range(20):
+            # Половину документов удаляем и возвращаем обратно, пока читатели ищут
+            index._apply_changes(base[round_ % 2::2])
+            index._apply_changes(base)
+    finally:
+        stop.set()
+        for thread in readers:
+            thread.join()
+    assert errors == []
+
+
+def test_save_switches_versions_atomically(tmp_path):
+    embeddings = LocalHashEmbeddings(dim=32)
+    index = RAGIndex(str(tmp_path), embeddings=embeddings, store="numpy")
+    index._apply_changes(_corpus("project", 3))
+    index._apply_changes(_corpus("project", 5))
+    index._apply_changes(_corpus("project", 7))
+
+    versions = [name for name in os.listdir(tmp_path) if name.startswith("v")]
+    assert len(versions) == RAGIndex.KEEP_VERSIONS
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+    loaded = RAGIndex(str(tmp_path), embeddings=embeddings, store="numpy")
+    assert loaded.load()
+    assert len(loaded.doc_hashes) == 7
+    assert len(asyncio.run(loaded.search("project document", k=10))) == 7
+
+
+def test_only_entity_names_take_lexical_fast_path():
+    from app.services.bm25 import BM25Index
+    from app.services.rag import build_documents
+
+    rows = {source: [] for source in ["project", "project_tag", "skill", "work_experience", "education", "blog_post", "testimonial", "social_media", "profile"]}
+    rows["project"].append({"id": 1, "title": "Portfolio Bot", "description": "Telegram bot", "project_url": None, "date_completed": None})
+    rows["project_tag"].append({"project_id": 1, "tag_name": "python"})
+    rows["skill"].append({"id": 1, "skill_name": "Docker", "description": None, "proficiency_level": 4})
+    bm25 = BM25Index(build_documents(rows))
+
+    assert bm25.matched_entities("Расскажи про Portfolio Bot") == ["portfolio bot"]
+    # Тег и навык — общие слова, такой вопрос идёт через векторный поиск
+    assert bm25.matched_entities("Какие проекты на python и docker?") == []
+
+
+def test_partial_refresh_after_load_keeps_other_documents(tmp_path):
+    embeddings = LocalHashEmbeddings(dim=64)
+    index = RAGIndex(str(tmp_path), embeddings=embeddings, store="numpy")
+    index._apply_changes(_corpus("skill", 5))
+
+    # Другой процесс поднимает индекс с диска и получает событие об одном документе
+    restored = RAGIndex(str(tmp_path), embeddings=embeddings, store="numpy")
+    assert restored.load()
+    assert set(restored.documents) == set(index.documents)
+    assert restored.lexical_search("number 3", k=1)[0].metadata["doc_id"] == "skill:3"
+
+    stats = restored._apply_changes([_doc("skill:1", "skill document rewritten")], partial=True, touched={"skill:1"})
+    assert stats == {"added": 1, "removed": 0}
+    assert len(restored.doc_hashes) == 5
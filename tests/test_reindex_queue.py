@@ -0,0 +1,80 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services import rag
+from app.services.reindex_queue import ReindexQueue
+
+
+def _queue(**kwargs):
+    return ReindexQueue(**{"debounce": 0.0, "max_delay": 0.0, "refresh_interval": 3600, **kwargs})
+
+
+def test_failed_flush_requeues_documents(monkeypatch):
+    monkeypatch.setattr(rag, "rag_index", SimpleNamespace(is_ready=True))
+    calls = []
+
+    async def refresh(db, doc_ids=None):
+        calls.append(doc_ids)
+        if len(calls) == 1:
+            raise ConnectionError("database is down")
+        return {"added": len(doc_ids), "removed": 0}
+
+    monkeypatch.setattr(rag, "refresh_rag_index", refresh)
+    queue = _queue()
+    queue.on_change("projects", "update", [{"id": 1}, {"id": 2}])
+
+    assert asyncio.run(queue.flush()) is False
+    assert queue.stats()["pending"] == 2 and queue.stats()["failed"] == 2
+
+    assert asyncio.run(queue.flush()) is True
+    assert calls == [{"project:1", "project:2"}, {"project:1", "project:2"}]
+    assert queue.stats()["pending"] == 0 and queue.stats()["reindexed"] == 2
+
+
+def test_periodic_full_refresh(monkeypatch):
+    monkeypatch.setattr(rag, "rag_index", SimpleNamespace(is_ready=True))
+    calls = []
+
+    async def refresh(db, doc_ids=None):
+        calls.append(doc_ids)
+        return {"added": 0, "removed": 0}
+
+    monkeypatch.setattr(rag, "refresh_rag_index", refresh)
+
+    async def main():
+        queue = _queue(refresh_interval=0.01)
+        queue.start()
+        await asyncio.sleep(0.05)
+        await queue.stop()
+
+    asyncio.run(main())
+    assert calls and all(doc_ids is None for doc_ids in calls)
+
+
+def test_events_for_other_tables_are_ignored():
+    queue = _queue()
+    queue.on_change("users", "update", [{"id": 1}])
+    queue.on_change("projecttags", "create", [{"project_id": 7, "tag_id": 1}])
+    assert queue._pending == {"project:7"}
+    assert not queue._full
+
+
+def test_documents_wait_for_index_to_load(monkeypatch):
+    index = SimpleNamespace(is_ready=False)
+    monkeypatch.setattr(rag, "rag_index", index)
+    calls = []
+
+    async def refresh(db, doc_ids=None):
+        calls.append(doc_ids)
+        return {"added": 0, "removed": 0}
+
+    monkeypatch.setattr(rag, "refresh_rag_index", refresh)
+    queue = _queue()
+    queue.on_change("skills", "update", [{"id": 3}])
+
+    assert asyncio.run(queue.flush()) is True
+    assert calls == [] and queue.stats()["pending"] == 1
+
+    index.is_ready = True
+    asyncio.run(queue.flush())
+    assert calls == [{"skill:3"}] and queue.stats()["pending"] == 0
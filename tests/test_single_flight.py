@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*[flight.do("q", compute) for _ in range(5)])
+
+    assert asyncio.run(main()) == ["answer"] * 5
+    assert calls == 1
+    assert flight.stats() == {"calls": 5, "coalesced": 4, "in_flight": 0}
+
+
+def test_leader_cancellation_does_not_cancel_waiters():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return "answer"
+
+    async def main():
+        leader = asyncio.create_task(flight.do("q", compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("q", compute))
+        await asyncio.sleep(0)
+        # Клиент первого запроса отключился
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(main()) == "answer"
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("LLM is down")
+
+    async def main():
+        return await asyncio.gather(*[flight.do("q", compute) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_stream_keeps_pump_task_and_survives_first_subscriber():
+    flight = SingleFlight()
+
+    async def produce():
+        for chunk in ["a", "b", "c"]:
+            await asyncio.sleep(0.01)
+            yield chunk
+
+    async def read(limit=None):
+        chunks = []
+        async for chunk in flight.stream("q", produce):
+            chunks.append(chunk)
+            if limit is not None and len(chunks) == limit:
+                break
+        return chunks
+
+    async def main():
+        first = asyncio.create_task(read(limit=1))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(read())
+        await asyncio.sleep(0)
+        assert len(flight._tasks) == 1
+        results = await asyncio.gather(first, second)
+        await asyncio.sleep(0)
+        assert not flight._tasks
+        return results
+
+    assert asyncio.run(main()) == [["a"], ["a", "b", "c"]]
@@ -0,0 +1,146 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import get_current_user
+from app.dao.events import add_change_listener, remove_change_listener
+from app.dao.models_dao import ProjectTagDAO
+from app.dao.uow import transaction
+from app.database import get_db
+from app.endpoints import projects
+from app.main import app
+
+
+def _rows(params: dict) -> list:
+    """Параметры многострочного INSERT (tag_id_m0, tag_id_m1, ...) по строкам."""
+    rows = {}
+    for key, value in params.items():
+        name, _, index = key.rpartition("_m")
+        if name and index.isdigit():
+            rows.setdefault(int(index), {})[name] = value
+        else:
+            rows.setdefault(0, {})[key] = value
+    return [rows[index] for index in sorted(rows)]
+
+
+class _Savepoint:
+    def __init__(self, db):
+        self.db = db
+
+    async def __aenter__(self):
+        self.mark = len(self.db.writes)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            del self.db.writes[self.mark:]
+        return False
+
+
+class FakeSession:
+    """Копит вставки как незакоммиченные записи; SAVEPOINT и ROLLBACK отбрасывают свою часть."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.writes = []
+        self.committed = []
+        self.commits = 0
+
+    async def execute(self, query):
+        table = query.table.name
+        if table == self.fail_on:
+            raise RuntimeError(f"insert into {table} failed")
+        rows = []
+        for values in _rows(query.compile().params):
+            row = {"id": len(self.writes) + 1, **values}
+            self.writes.append((table, row))
+            rows.append(SimpleNamespace(**row, _mapping=row))
+        return SimpleNamespace(first=lambda: rows[0], fetchall=lambda: rows)
+
+    def begin_nested(self):
+        return _Savepoint(self)
+
+    async def commit(self):
+        self.commits += 1
+        self.committed.extend(self.writes)
+        self.writes = []
+
+    async def rollback(self):
+        self.writes = []
+
+
+@pytest.fixture
+def events():
+    received = []
+    listener = lambda table, action, rows: received.append((table, action, [row["tag_id"] for row in rows]))
+    add_change_listener(listener)
+    yield received
+    remove_change_listener(listener)
+
+
+def test_failed_savepoint_rolls_back_only_its_writes_and_events(events):
+    db = FakeSession()
+
+    async def main():
+        async with transaction(db):
+            await ProjectTagDAO.create(db, {"project_id": 1, "tag_id": 1})
+            with pytest.raises(RuntimeError):
+                async with transaction(db):
+                    await ProjectTagDAO.create(db, {"project_id": 1, "tag_id": 2})
+                    raise RuntimeError("tag 2 is invalid")
+            await ProjectTagDAO.create(db, {"project_id": 1, "tag_id": 3})
+            # До общего commit DAO не коммитят и событий не шлют
+            assert db.commits == 0 and events == []
+
+    asyncio.run(main())
+    assert db.commits == 1
+    assert [row["tag_id"] for _, row in db.committed] == [1, 3]
+    assert events == [("projecttags", "create", [1]), ("projecttags", "create", [3])]
+
+
+def test_failed_outer_transaction_publishes_nothing(events):
+    db = FakeSession()
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            async with transaction(db):
+                await ProjectTagDAO.create(db, {"project_id": 1, "tag_id": 1})
+                raise RuntimeError("job failed")
+
+    asyncio.run(main())
+    assert db.commits == 0 and db.committed == [] and events == []
+
+
+@pytest.fixture
+def client_with(monkeypatch):
+    async def notify(bot, project):
+        pass
+
+    monkeypatch.setattr(projects, "notify_subscribers_new_project", notify)
+
+    def make(db):
+        async def override_db():
+            yield db
+
+        app.dependency_overrides[get_db] = override_db
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(username="admin")
+        return TestClient(app, raise_server_exceptions=False)
+
+    yield make
+    app.dependency_overrides.clear()
+
+
+def test_project_with_tags_is_one_commit(client_with):
+    db = FakeSession()
+    response = client_with(db).post("/api/projects/", json={"user_id": 1, "title": "Bot", "tag_ids": [5, 6, 5]})
+    assert response.status_code == 200 and response.json()["title"] == "Bot"
+    assert db.commits == 1
+    assert [(table, row.get("tag_id")) for table, row in db.committed] == [("projects", None), ("projecttags", 5), ("projecttags", 6)]
+
+
+def test_failed_tag_link_rolls_back_project(client_with):
+    db = FakeSession(fail_on="projecttags")
+    response = client_with(db).post("/api/projects/", json={"user_id": 1, "title": "Bot", "tag_ids": [5]})
+    assert response.status_code == 500
+    assert db.commits == 0 and db.committed == []
@@ -0,0 +1,59 @@
+import numpy as np
+from langchain.docstore.document import Document
+
+from app.services.embeddings import LocalHashEmbeddings
+from app.services.vector_store import NumpyVectorStore
+
+
+def _store(vectors, quantize=False):
+    store = NumpyVectorStore(LocalHashEmbeddings(dim=4), quantize=quantize)
+    store.add_embeddings(
+        [(doc_id, vector) for doc_id, vector in vectors.items()],
+        metadatas=[{"doc_id": doc_id} for doc_id in vectors]
+    )
+    return store
+
+
+def _ids(docs):
+    return [doc.metadata["doc_id"] for doc in docs]
+
+
+def test_int8_search_matches_float32():
+    rng = np.random.default_rng(0)
+    vectors = {f"doc:{i}": rng.normal(size=32).tolist() for i in range(100)}
+    exact, quantized = _store(vectors), _store(vectors, quantize=True)
+    assert quantized._vectors.dtype == np.int8
+
+    for query in rng.normal(size=(10, 32)).tolist():
+        expected = exact.similarity_search_with_score_by_vector(query, k=5)
+        found = quantized.similarity_search_with_score_by_vector(query, k=5)
+        assert _ids(d for d, _ in found)[0] == _ids(d for d, _ in expected)[0]
+        assert len(set(_ids(d for d, _ in found)) & set(_ids(d for d, _ in expected))) >= 4
+        assert np.allclose([s for _, s in found], [s for _, s in expected], atol=0.02)
+
+
+def test_mmr_prefers_diverse_documents():
+    store = _store({
+        "project:1": [1.0, 0.0, 0.0, 0.0],
+        "blog_post:1": [0.995, -0.1, 0.0, 0.0],  # почти копия project:1
+        "skill:1": [0.6, 0.8, 0.0, 0.0],
+        "skill:2": [0.0, 0.0, 1.0, 0.0],
+    }, quantize=True)
+    query = [1.0, 0.3, 0.0, 0.0]
+    assert _ids(store.similarity_search_by_vector(query, k=2)) == ["project:1", "blog_post:1"]
+    assert _ids(store.max_marginal_relevance_search_by_vector(query, k=2, fetch_k=4)) == ["project:1", "skill:1"]
+
+
+def test_replace_delete_and_reload(tmp_path):
+    store = _store({"a": [1.0, 0.0, 0.0, 0.0], "b": [0.0, 1.0, 0.0, 0.0]}, quantize=True)
+    # Повторный id заменяет вектор, а не дублирует документ
+    store.add_embeddings([("a2", [0.0, 0.0, 1.0, 0.0])], metadatas=[{"doc_id": "a"}])
+    assert len(store) == 2
+    assert store.delete(["b"]) and not store.delete(["missing"])
+    store.add_documents([Document(page_content="c", metadata={"doc_id": "c"})])
+
+    store.save_local(str(tmp_path))
+    loaded = NumpyVectorStore.load_local(str(tmp_path), store.embeddings)
+    assert loaded.quantize and loaded.ids == ["a", "c"]
+    doc, score = loaded.similarity_search_with_score_by_vector([0.0, 0.0, 1.0, 0.0], k=1)[0]
+    assert doc.page_content == "a2" and score > 0.99